@@ -6,12 +6,55 @@
 
 import streamlit as st
 from typing import List, Dict, Any, Optional
+import bisect
+import functools
 import logging
+from collections import defaultdict
+from statistics import fmean
 from dataclasses import dataclass
 from models.chat import DocumentReference
 
 logger = logging.getLogger(__name__)
 
+# 類似度スコアの色分け境界と各帯の色（境界値は上の帯に含む）
+SCORE_COLOR_THRESHOLDS = (0.6, 0.7, 0.8, 0.9)
+SCORE_COLORS = (
+    "#FF4444",  # 赤
+    "#FF8800",  # オレンジ
+    "#FFBB33",  # 黄
+    "#33B679",  # 薄緑
+    "#00C851",  # 緑
+)
+
+# 類似度ヒストグラムのビン境界と表示ラベル（ラベルは高スコア帯から順に並べる）
+HISTOGRAM_THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.9)
+HISTOGRAM_LABELS = ("0.9-1.0", "0.8-0.9", "0.7-0.8", "0.6-0.7", "0.5-0.6", "0.4-0.5")
+
+# 抜粋切り詰め結果のキャッシュ件数（Streamlitの再実行ごとに同じ抜粋を描画し直すため）
+TRUNCATE_CACHE_SIZE = 512
+
+
+@functools.lru_cache(maxsize=TRUNCATE_CACHE_SIZE)
+def _truncate_text_cached(text: str, max_length: int) -> str:
+    """
+    テキストと最大文字数をキーに切り詰め結果をキャッシュ
+
+    Args:
+        text: 対象テキスト
+        max_length: 最大文字数
+
+    Returns:
+        str: 切り詰められたテキスト
+    """
+    if len(text) <= max_length:
+        return text
+    
+    # 単語境界で切り詰め（80%を超える位置の空白のみ採用するため、その範囲だけを探索）
+    last_space = text.rfind(' ', int(max_length * 0.8) + 1, max_length)
+    cut = last_space if last_space != -1 else max_length
+    
+    return text[:cut] + "..."
+
 
 @dataclass
 class CitationGroup:
@@ -85,23 +128,16 @@ class CitationDisplay:
             return
         
         try:
-            # ファイル名とページ番号のリストを作成
-            file_info = {}
+            # ファイル名ごとにページ番号を集約（ファイルは初出順、重複・並び替えは範囲整形側で処理）
+            file_pages: Dict[str, List[int]] = {}
             for ref in references:
-                if ref.filename not in file_info:
-                    file_info[ref.filename] = []
-                if ref.page_number not in file_info[ref.filename]:
-                    file_info[ref.filename].append(ref.page_number)
+                file_pages.setdefault(ref.filename, []).append(ref.page_number)
             
             # コンパクト表示
-            citation_text = []
-            for filename, pages in file_info.items():
-                pages.sort()
-                if len(pages) == 1:
-                    citation_text.append(f"📄 {filename} (p.{pages[0]})")
-                else:
-                    page_ranges = self._format_page_ranges(pages)
-                    citation_text.append(f"📄 {filename} ({page_ranges})")
+            citation_text = [
+                f"📄 {filename} ({self._format_page_ranges(pages)})"
+                for filename, pages in file_pages.items()
+            ]
             
             st.markdown("**参照文書:** " + " | ".join(citation_text))
             
@@ -122,30 +158,16 @@ class CitationDisplay:
             return
         
         try:
-            scores = [ref.similarity_score for ref in references]
-            
-            # ヒストグラム用のデータ準備
-            score_ranges = ["0.9-1.0", "0.8-0.9", "0.7-0.8", "0.6-0.7", "0.5-0.6", "0.4-0.5"]
-            counts = [0] * 6
+            # ヒストグラム用のデータ準備（0.5未満は最下位の帯に含める）
+            counts = [0] * len(HISTOGRAM_LABELS)
             
-            for score in scores:
-                if score >= 0.9:
-                    counts[0] += 1
-                elif score >= 0.8:
-                    counts[1] += 1
-                elif score >= 0.7:
-                    counts[2] += 1
-                elif score >= 0.6:
-                    counts[3] += 1
-                elif score >= 0.5:
-                    counts[4] += 1
-                else:
-                    counts[5] += 1
+            for ref in references:
+                counts[bisect.bisect_right(HISTOGRAM_THRESHOLDS, ref.similarity_score)] += 1
             
             # Streamlitのバーチャート表示
             chart_data = {
-                "類似度範囲": score_ranges,
-                "文書数": counts
+                "類似度範囲": list(HISTOGRAM_LABELS),
+                "文書数": counts[::-1]
             }
             
             st.subheader("類似度分布")
@@ -167,11 +189,9 @@ class CitationDisplay:
         Returns:
             List[CitationGroup]: グループ化された引用
         """
-        file_groups = {}
+        file_groups: Dict[str, List[DocumentReference]] = defaultdict(list)
         
         for ref in references:
-            if ref.filename not in file_groups:
-                file_groups[ref.filename] = []
             file_groups[ref.filename].append(ref)
         
         citation_groups = []
@@ -179,15 +199,11 @@ class CitationDisplay:
             # スコア順でソート
             refs.sort(key=lambda x: x.similarity_score, reverse=True)
             
-            # グループ情報を計算
-            total_score = sum(ref.similarity_score for ref in refs) / len(refs)
-            page_numbers = sorted(list(set(ref.page_number for ref in refs)))
-            
             citation_groups.append(CitationGroup(
                 filename=filename,
                 references=refs,
-                total_score=total_score,
-                page_numbers=page_numbers
+                total_score=fmean(ref.similarity_score for ref in refs),
+                page_numbers=sorted({ref.page_number for ref in refs})
             ))
         
         # 平均スコア順でソート
@@ -255,32 +271,17 @@ class CitationDisplay:
         if not pages:
             return ""
         
-        # 重複を除去してソート
-        unique_pages = sorted(list(set(pages)))
-        
-        if len(unique_pages) == 1:
-            return f"p.{unique_pages[0]}"
+        # 重複を除去してソートし、1回の走査で連続ページを [開始, 終了] にまとめる
+        unique_pages = sorted(set(pages))
+        runs = [[unique_pages[0], unique_pages[0]]]
         
-        # 連続するページをグループ化
-        ranges = []
-        start = unique_pages[0]
-        end = unique_pages[0]
-        
-        for i in range(1, len(unique_pages)):
-            if unique_pages[i] == end + 1:
-                end = unique_pages[i]
+        for page in unique_pages[1:]:
+            if page == runs[-1][1] + 1:
+                runs[-1][1] = page
             else:
-                if start == end:
-                    ranges.append(f"p.{start}")
-                else:
-                    ranges.append(f"p.{start}-{end}")
-                start = end = unique_pages[i]
+                runs.append([page, page])
         
-        # 最後の範囲を追加
-        if start == end:
-            ranges.append(f"p.{start}")
-        else:
-            ranges.append(f"p.{start}-{end}")
+        ranges = [f"p.{start}" if start == end else f"p.{start}-{end}" for start, end in runs]
         
         return ", ".join(ranges)
     
@@ -294,16 +295,7 @@ class CitationDisplay:
         Returns:
             str: CSSカラーコード
         """
-        if score >= 0.9:
-            return "#00C851"  # 緑
-        elif score >= 0.8:
-            return "#33B679"  # 薄緑
-        elif score >= 0.7:
-            return "#FFBB33"  # 黄
-        elif score >= 0.6:
-            return "#FF8800"  # オレンジ
-        else:
-            return "#FF4444"  # 赤
+        return SCORE_COLORS[bisect.bisect_right(SCORE_COLOR_THRESHOLDS, score)]
     
     def _truncate_text(self, text: str, max_length: int) -> str:
         """
@@ -316,17 +308,7 @@ class CitationDisplay:
         Returns:
             str: 切り詰められたテキスト
         """
-        if len(text) <= max_length:
-            return text
-        
-        # 単語境界で切り詰め
-        truncated = text[:max_length]
-        last_space = truncated.rfind(' ')
-        
-        if last_space > max_length * 0.8:  # 80%以上の位置に空白がある場合
-            truncated = truncated[:last_space]
-        
-        return truncated + "..."
+        return _truncate_text_cached(text, max_length)
 
 
 class StreamlitCitationWidget:
@@ -132,16 +132,22 @@ def process_uploaded_pdfs(uploaded_files: List, chunk_size: int, overlap_ratio:
                     )
                     chunks.extend(page_chunks)
                 
-                # チャンクごとに埋め込み生成と保存
+                # 埋め込みは全チャンク分をバッチAPIでまとめて生成し、チャンクごとに保存
+                # （サービスにEmbeddingCacheが設定されていればキャッシュ済みチャンクは再計算しない。
+                #  近似重複排除はChunkDeduplicatorを渡した場合のみ有効）
                 chunk_progress = st.progress(0)
                 chunk_status = st.empty()
                 
-                for j, chunk in enumerate(chunks):
+                embedding_results = []
+                if chunks:
+                    chunk_status.text(f"埋め込み生成中: {len(chunks)}チャンク")
+                    embedding_results = embedding_service.create_batch_embeddings(
+                        [chunk.content for chunk in chunks]
+                    ).results
+                
+                for j, (chunk, embedding_result) in enumerate(zip(chunks, embedding_results, strict=True)):
                     chunk_progress.progress(j / len(chunks))
-                    chunk_status.text(f"埋め込み生成中: チャンク {j+1}/{len(chunks)}")
-                    
-                    # 埋め込み生成
-                    embedding_result = embedding_service.generate_embedding(chunk.content)
+                    chunk_status.text(f"保存中: チャンク {j+1}/{len(chunks)}")
                     
                     # ベクターストアに保存
                     vector_store.add_chunk(
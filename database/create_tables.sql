@@ -4,6 +4,9 @@
 -- pgvector拡張を有効化（ベクトル検索用）
 CREATE EXTENSION IF NOT EXISTS vector;
 
+-- pg_trgm拡張を有効化（キーワード検索用）
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- 文書管理テーブル
 CREATE TABLE IF NOT EXISTS documents (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
@@ -34,9 +37,21 @@ CREATE TABLE IF NOT EXISTS document_chunks (
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
 );
 
--- ベクトル検索用インデックス
+-- ベクトル検索用インデックス（HNSW: 空テーブルでも作成でき、検索はO(log N)）
+-- 半精度(halfvec)で索引し、インデックスのメモリ・帯域を半減（列はfloat32のまま保持）
 CREATE INDEX IF NOT EXISTS document_chunks_embedding_idx 
-ON document_chunks USING ivfflat (embedding vector_cosine_ops);
+ON document_chunks USING hnsw ((embedding::halfvec(1536)) halfvec_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- 代替: IVFFlat（パーティション型）インデックス
+-- 数千件規模を一括投入し直す運用ではHNSWより構築が速い。データ投入後に作成し、
+-- lists は概ね sqrt(行数)、検索時は ivfflat.probes で精度と速度を調整する。
+-- 切り替える場合は上記HNSWインデックスを削除してから作成すること。
+-- DROP INDEX IF EXISTS document_chunks_embedding_idx;
+-- CREATE INDEX document_chunks_embedding_idx
+-- ON document_chunks USING ivfflat ((embedding::halfvec(1536)) halfvec_cosine_ops)
+-- WITH (lists = 64);
+-- ALTER FUNCTION match_documents(vector, float, int) SET ivfflat.probes = 8;
 
 -- 一般的な検索用インデックス
 CREATE INDEX IF NOT EXISTS documents_filename_idx ON documents(filename);
@@ -44,6 +59,8 @@ CREATE INDEX IF NOT EXISTS documents_processing_status_idx ON documents(processi
 CREATE INDEX IF NOT EXISTS document_chunks_document_id_idx ON document_chunks(document_id);
 CREATE INDEX IF NOT EXISTS document_chunks_filename_idx ON document_chunks(filename);
 CREATE INDEX IF NOT EXISTS document_chunks_page_number_idx ON document_chunks(page_number);
+CREATE INDEX IF NOT EXISTS document_chunks_content_trgm_idx
+ON document_chunks USING gin (content gin_trgm_ops);
 
 -- Row Level Security (RLS) 設定
 ALTER TABLE documents ENABLE ROW LEVEL SECURITY;
@@ -93,6 +110,8 @@ RETURNS TABLE (
     distance float
 )
 LANGUAGE sql STABLE
+-- HNSW探索幅は最大取得件数（100件）以上にし、閾値フィルタ後も件数を確保
+SET hnsw.ef_search = 100
 AS $$
     -- 入力検証
     SELECT CASE 
@@ -124,7 +143,60 @@ AS $$
             WHERE documents.id = document_chunks.document_id 
             AND documents.processing_status = 'completed'
         )
-    ORDER BY document_chunks.embedding <=> query_embedding
+    -- 半精度インデックスで候補を順位付け（返す距離は単精度で計算）
+    ORDER BY document_chunks.embedding::halfvec(1536) <=> query_embedding::halfvec(1536)
+    LIMIT match_count;
+$$;
+
+-- キーワード検索用RPC関数（ハイブリッド検索用、トライグラム類似度でランキング）
+CREATE OR REPLACE FUNCTION match_documents_keyword (
+    query_text text,
+    match_count int DEFAULT 5
+)
+RETURNS TABLE (
+    id uuid,
+    content text,
+    filename text,
+    page_number int,
+    chapter_number int,
+    section_name text,
+    start_pos jsonb,
+    end_pos jsonb,
+    token_count int,
+    rank float
+)
+LANGUAGE sql STABLE
+AS $$
+    -- 入力検証
+    SELECT CASE 
+        WHEN query_text IS NULL OR length(trim(query_text)) = 0 THEN
+            (SELECT ERROR('query_text must not be empty'))
+        WHEN match_count <= 0 OR match_count > 100 THEN
+            (SELECT ERROR('match_count must be between 1 and 100'))
+        ELSE NULL
+    END;
+
+    -- メインクエリ
+    SELECT
+        document_chunks.id,
+        document_chunks.content,
+        document_chunks.filename,
+        document_chunks.page_number,
+        document_chunks.chapter_number,
+        document_chunks.section_name,
+        document_chunks.start_pos,
+        document_chunks.end_pos,
+        document_chunks.token_count,
+        word_similarity(query_text, document_chunks.content)::float AS rank
+    FROM document_chunks
+    WHERE 
+        query_text <% document_chunks.content
+        AND EXISTS (
+            SELECT 1 FROM documents 
+            WHERE documents.id = document_chunks.document_id 
+            AND documents.processing_status = 'completed'
+        )
+    ORDER BY rank DESC
     LIMIT match_count;
 $$;
 
@@ -156,6 +228,57 @@ AS $$
     );
 $$;
 
+-- 文書・チャンク一括保存RPC関数（1トランザクションで親文書とチャンクを挿入）
+-- idが既存の行は挿入しないため、応答が失われた呼び出しを同じIDで再実行しても重複しない
+-- 全チャンクの挿入後に同じトランザクション内で文書をcompletedとし、検索対象にする
+CREATE OR REPLACE FUNCTION insert_document_with_chunks(
+    document jsonb,
+    chunks jsonb
+)
+RETURNS uuid
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    new_document_id uuid := (document->>'id')::uuid;
+BEGIN
+    INSERT INTO documents (id, filename, original_filename, file_size, total_pages, processing_status)
+    VALUES (
+        new_document_id,
+        document->>'filename',
+        document->>'original_filename',
+        (document->>'file_size')::bigint,
+        (document->>'total_pages')::int,
+        COALESCE(document->>'processing_status', 'processing')
+    )
+    ON CONFLICT (id) DO NOTHING;
+
+    INSERT INTO document_chunks (
+        id, document_id, content, filename, page_number, chapter_number,
+        section_name, start_pos, end_pos, embedding, token_count
+    )
+    SELECT
+        (chunk->>'id')::uuid,
+        new_document_id,
+        chunk->>'content',
+        chunk->>'filename',
+        (chunk->>'page_number')::int,
+        (chunk->>'chapter_number')::int,
+        chunk->>'section_name',
+        NULLIF(chunk->'start_pos', 'null'::jsonb),
+        NULLIF(chunk->'end_pos', 'null'::jsonb),
+        NULLIF(chunk->'embedding', 'null'::jsonb)::text::vector(1536),
+        (chunk->>'token_count')::int
+    FROM jsonb_array_elements(chunks) AS chunk
+    ON CONFLICT (id) DO NOTHING;
+
+    UPDATE documents
+    SET processing_status = 'completed'
+    WHERE id = new_document_id;
+
+    RETURN new_document_id;
+END;
+$$;
+
 -- 埋め込みベクトル検証関数
 CREATE OR REPLACE FUNCTION validate_embedding(embedding_vector vector(1536))
 RETURNS boolean
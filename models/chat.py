@@ -5,7 +5,7 @@
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable
 from datetime import datetime
 import uuid
 from enum import Enum
@@ -63,6 +63,21 @@ class ChatSession:
             if message.role == MessageRole.USER and message.content:
                 self.title = message.content[:50] + ("..." if len(message.content) > 50 else "")
     
+    def add_messages(self, messages: Iterable[ChatMessage]) -> None:
+        """メッセージを一括追加（更新日時・タイトル設定は1回のみ）"""
+        start = len(self.messages)
+        self.messages.extend(messages)
+        if len(self.messages) == start:
+            return
+        self.updated_at = datetime.now()
+        
+        # 最初のユーザーメッセージでタイトルを設定
+        if not self.title or self.title == "新しいチャット":
+            for message in self.messages[start:]:
+                if message.role == MessageRole.USER and message.content:
+                    self.title = message.content[:50] + ("..." if len(message.content) > 50 else "")
+                    break
+    
     def get_message_count(self) -> int:
         """メッセージ数を取得"""
         return len(self.messages)
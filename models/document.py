@@ -5,11 +5,58 @@
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable
 from datetime import datetime
+import functools
+import os
+import threading
 import uuid
 
-@dataclass
+import numpy as np
+
+# UUID生成用乱数のバッファ件数（os.urandom呼び出しをこの件数ごとに1回へ集約）
+UUID_POOL_SIZE = 4096
+
+
+class _UUIDPool:
+    """
+    まとめて生成したUUID4文字列を払い出すプール
+    
+    uuid.uuid4() と同じく os.urandom 由来の乱数を使用し、バージョン・バリアントの
+    ビット設定と16進文字列化を配列演算で一括処理します。
+    fork後の子プロセスでは親と同じIDを払い出さないよう生成し直します。
+    """
+    
+    def __init__(self, size: int = UUID_POOL_SIZE) -> None:
+        self._size = size
+        self._lock = threading.Lock()
+        self._ids: List[str] = []
+        self._pid: Optional[int] = None
+    
+    def _refill(self) -> None:
+        """UUID4文字列を一括生成"""
+        raw = np.frombuffer(os.urandom(16 * self._size), dtype=np.uint8).reshape(self._size, 16).copy()
+        raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # バージョン4
+        raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 バリアント
+        hex_digits = raw.tobytes().hex()
+        self._ids = [
+            f"{hex_digits[i:i + 8]}-{hex_digits[i + 8:i + 12]}-{hex_digits[i + 12:i + 16]}-"
+            f"{hex_digits[i + 16:i + 20]}-{hex_digits[i + 20:i + 32]}"
+            for i in range(0, len(hex_digits), 32)
+        ]
+        self._pid = os.getpid()
+    
+    def next(self) -> str:
+        """次のUUID4文字列を取得"""
+        with self._lock:
+            if not self._ids or self._pid != os.getpid():
+                self._refill()
+            return self._ids.pop()
+
+
+_uuid_pool = _UUIDPool()
+
+@dataclass(slots=True)
 class DocumentMetadata:
     """文書メタデータ"""
     filename: str
@@ -20,7 +67,7 @@ class DocumentMetadata:
     processing_status: str = "pending"  # pending, processing, completed, failed
     error_message: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class ChunkPosition:
     """チャンク位置情報"""
     x: float
@@ -28,10 +75,10 @@ class ChunkPosition:
     width: float
     height: float
 
-@dataclass
+@dataclass(slots=True)
 class DocumentChunk:
     """文書チャンク"""
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = field(default_factory=_uuid_pool.next)
     document_id: str = ""
     content: str = ""
     filename: str = ""
@@ -44,30 +91,122 @@ class DocumentChunk:
     token_count: int = 0
     created_at: datetime = field(default_factory=datetime.now)
 
+class _ChunkList(list):
+    """
+    Document.chunks用のリスト
+    
+    要素の追加・削除・置換・並べ替え時に所有Documentの集計インデックスを無効化します
+    """
+    __slots__ = ("_owner",)
+    
+    def __init__(self, iterable: Iterable[DocumentChunk] = (), owner: Optional["Document"] = None) -> None:
+        super().__init__(iterable)
+        self._owner = owner
+    
+    def _invalidate(self) -> None:
+        """所有Documentの集計インデックスを無効化"""
+        # 復元（pickle・deepcopy）中は要素の追加が所有者の設定より先に行われる
+        owner = getattr(self, "_owner", None)
+        if owner is not None:
+            owner._index_valid = False
+
+
+def _invalidating(name: str):
+    """listの変更メソッドを、実行前にインデックスを無効化するメソッドで包む"""
+    method = getattr(list, name)
+    
+    @functools.wraps(method)
+    def wrapper(self: _ChunkList, *args: Any, **kwargs: Any) -> Any:
+        self._invalidate()
+        return method(self, *args, **kwargs)
+    
+    return wrapper
+
+
+for _name in (
+    "__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend",
+    "insert", "pop", "remove", "clear", "sort", "reverse",
+):
+    setattr(_ChunkList, _name, _invalidating(_name))
+
+
 @dataclass
 class Document:
-    """文書モデル"""
+    """
+    文書モデル
+    
+    総トークン数・ページ別チャンクはadd_chunk/extend_chunksで増分更新し、取得はO(1)です。
+    chunksの差し替えやリスト操作は集計インデックスを無効化し、次回取得時に1回だけ再構築します。
+    追加済みチャンクのtoken_count・page_numberを直接変更した場合は追従しません。
+    """
     id: str = field(default_factory=lambda: str(uuid.uuid4()))
     metadata: Optional[DocumentMetadata] = None
     chunks: List[DocumentChunk] = field(default_factory=list)
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
+    # 集計インデックス（add_chunkで増分更新）
+    _total_tokens: int = field(default=0, init=False, repr=False, compare=False)
+    _chunks_by_page: Dict[int, List[DocumentChunk]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _index_valid: bool = field(default=False, init=False, repr=False, compare=False)
+    
+    def __setattr__(self, name: str, value: Any) -> None:
+        """chunksの差し替え時は変更を検知できるリストへ変換し、インデックスを無効化"""
+        if name == "chunks":
+            value = _ChunkList(value, owner=self)
+            object.__setattr__(self, "_index_valid", False)
+        object.__setattr__(self, name, value)
+    
+    def _index_chunk(self, chunk: DocumentChunk) -> None:
+        """1チャンクを集計インデックスに反映"""
+        self._total_tokens += chunk.token_count
+        self._chunks_by_page.setdefault(chunk.page_number, []).append(chunk)
+    
+    def _ensure_index(self) -> None:
+        """無効化されている場合のみ集計インデックスを再構築"""
+        if self._index_valid:
+            return
+        self._total_tokens = 0
+        self._chunks_by_page = {}
+        for chunk in self.chunks:
+            self._index_chunk(chunk)
+        self._index_valid = True
     
     def add_chunk(self, chunk: DocumentChunk) -> None:
         """チャンクを追加"""
-        chunk.document_id = self.id
-        self.chunks.append(chunk)
+        self.extend_chunks((chunk,))
+    
+    def extend_chunks(self, chunks: Iterable[DocumentChunk]) -> None:
+        """
+        複数チャンクを一括追加
+        
+        更新日時は追加ごとではなく一括追加の最後に1回だけ更新します。
+        集計インデックスは追加分のみで増分更新します
+        
+        Args:
+            chunks: 追加するチャンク
+        """
+        new_chunks = list(chunks)
+        # _ChunkList.extendはインデックスを無効化するため、listの実装を直接呼ぶ
+        list.extend(self.chunks, new_chunks)
+        for chunk in new_chunks:
+            chunk.document_id = self.id
+            if self._index_valid:
+                self._index_chunk(chunk)
         self.updated_at = datetime.now()
     
     def get_total_tokens(self) -> int:
         """総トークン数を取得"""
-        return sum(chunk.token_count for chunk in self.chunks)
+        self._ensure_index()
+        return self._total_tokens
     
     def get_chunks_by_page(self, page_number: int) -> List[DocumentChunk]:
         """指定ページのチャンクを取得"""
-        return [chunk for chunk in self.chunks if chunk.page_number == page_number]
+        self._ensure_index()
+        return list(self._chunks_by_page.get(page_number, ()))
 
-@dataclass
+@dataclass(slots=True)
 class SearchQuery:
     """検索クエリ"""
     query: str
@@ -76,14 +215,14 @@ class SearchQuery:
     filter_by_filename: Optional[str] = None
     filter_by_page: Optional[int] = None
 
-@dataclass
+@dataclass(slots=True)
 class SearchResult:
     """検索結果"""
     chunk: DocumentChunk
     similarity_score: float
     rank: int
 
-@dataclass
+@dataclass(slots=True)
 class SearchResponse:
     """検索レスポンス"""
     query: str
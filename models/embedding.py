@@ -13,15 +13,24 @@ OpenAI Embeddings API向けの効率的なデータモデル実装
 - 型安全性とPythonic性能
 """
 
-import math
-import statistics
+import json
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 import logging
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
+# orjson がインストールされていない場合は標準jsonで直列化
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    logger.warning("orjson not installed. Using standard json serialization.")
+
 # OpenAI Embedding API 定数
 OPENAI_EMBEDDING_DIMENSION = 1536
 OPENAI_EMBEDDING_MODELS = {
@@ -61,56 +70,86 @@ class EmbeddingValidationError(ValueError):
         super().__init__(message)
 
 
-def validate_embedding_vector(embedding: List[float], expected_dimension: int = OPENAI_EMBEDDING_DIMENSION) -> bool:
+def _as_embedding_array(embedding: Union[List[float], np.ndarray]) -> np.ndarray:
     """
-    埋め込みベクトルの検証
+    埋め込みベクトルをfloat32配列に変換
     
     Args:
-        embedding: 検証対象の埋め込みベクトル
-        expected_dimension: 期待される次元数
+        embedding: 変換対象の埋め込みベクトル（リストまたはndarray）
         
     Returns:
-        bool: 検証成功時True
+        np.ndarray: float32の埋め込み配列
         
     Raises:
-        EmbeddingDimensionError: 次元数が不正な場合
-        EmbeddingValidationError: ベクトル値が不正な場合
+        EmbeddingValidationError: 数値以外の値が含まれる場合
     """
-    if not isinstance(embedding, list):
+    if not isinstance(embedding, (list, np.ndarray)):
         raise EmbeddingValidationError(
             "埋め込みベクトルはリスト形式である必要があります",
             field="embedding",
             value=type(embedding)
         )
     
-    if len(embedding) != expected_dimension:
-        raise EmbeddingDimensionError(
-            f"埋め込みベクトルは{expected_dimension}次元である必要があります。現在: {len(embedding)}次元",
-            expected_dim=expected_dimension,
-            actual_dim=len(embedding)
+    try:
+        array = np.asarray(embedding)
+    except ValueError:
+        array = np.asarray(embedding, dtype=object)
+    
+    if array.dtype.kind not in "biuf":
+        # エラー位置の特定（異常系のみPythonループ）
+        for i, value in enumerate(embedding):
+            if not isinstance(value, (int, float, np.number)):
+                raise EmbeddingValidationError(
+                    f"インデックス {i} の値は数値である必要があります",
+                    field=f"embedding[{i}]",
+                    value=value
+                )
+        raise EmbeddingValidationError(
+            "埋め込みベクトルは数値である必要があります",
+            field="embedding",
+            value=array.dtype
         )
     
-    for i, value in enumerate(embedding):
-        if not isinstance(value, (int, float)):
-            raise EmbeddingValidationError(
-                f"インデックス {i} の値は数値である必要があります",
-                field=f"embedding[{i}]",
-                value=value
-            )
+    return array.astype(np.float32, copy=False)
+
+
+def validate_embedding_vector(
+    embedding: Union[List[float], np.ndarray],
+    expected_dimension: int = OPENAI_EMBEDDING_DIMENSION
+) -> bool:
+    """
+    埋め込みベクトルの検証
+    
+    Args:
+        embedding: 検証対象の埋め込みベクトル（リストまたはndarray）
+        expected_dimension: 期待される次元数
         
-        if math.isnan(value):
-            raise EmbeddingValidationError(
-                f"インデックス {i} にNaNまたは無限大値が含まれています",
-                field=f"embedding[{i}]",
-                value=value
-            )
+    Returns:
+        bool: 検証成功時True
         
-        if math.isinf(value):
-            raise EmbeddingValidationError(
-                f"インデックス {i} にNaNまたは無限大値が含まれています",
-                field=f"embedding[{i}]",
-                value=value
-            )
+    Raises:
+        EmbeddingDimensionError: 次元数が不正な場合
+        EmbeddingValidationError: ベクトル値が不正な場合
+    """
+    array = _as_embedding_array(embedding)
+    
+    actual_dimension = array.shape[0] if array.ndim == 1 else array.size
+    if array.ndim != 1 or actual_dimension != expected_dimension:
+        raise EmbeddingDimensionError(
+            f"埋め込みベクトルは{expected_dimension}次元である必要があります。現在: {actual_dimension}次元",
+            expected_dim=expected_dimension,
+            actual_dim=actual_dimension
+        )
+    
+    # NaN・無限大値の一括検出
+    finite_mask = np.isfinite(array)
+    if not finite_mask.all():
+        i = int(np.flatnonzero(~finite_mask)[0])
+        raise EmbeddingValidationError(
+            f"インデックス {i} にNaNまたは無限大値が含まれています",
+            field=f"embedding[{i}]",
+            value=float(array[i])
+        )
     
     return True
 
@@ -182,24 +221,56 @@ def validate_embedding_model(model: str) -> bool:
     return True
 
 
-@dataclass
+# EmbeddingResult.calculate_costの計算結果に影響するフィールド
+_COST_INPUT_FIELDS = frozenset({"token_count", "model"})
+
+
+@dataclass(slots=True)
 class EmbeddingResult:
     """
     埋め込み結果データクラス
     
     OpenAI Embeddings APIからの単一結果を表現します。
+    埋め込みベクトルはfloat32のndarrayとして保持します。
+    大量生成されるため__slots__でインスタンスごとの__dict__を持ちません。
     """
     text: str
-    embedding: List[float]
+    embedding: np.ndarray
     token_count: int
     model: str = "text-embedding-3-small"
     created_at: datetime = field(default_factory=datetime.now)
     response_time: Optional[float] = None
+    _cost_cache: Optional[float] = field(default=None, init=False, repr=False, compare=False)
     
     def __post_init__(self) -> None:
-        """初期化後の検証"""
+        """初期化後の変換と検証"""
+        self.embedding = _as_embedding_array(self.embedding)
         self.validate()
     
+    def __setattr__(self, name: str, value: Any) -> None:
+        """token_count・modelの更新時はコスト計算結果を破棄"""
+        object.__setattr__(self, name, value)
+        if name in _COST_INPUT_FIELDS:
+            object.__setattr__(self, "_cost_cache", None)
+    
+    def __eq__(self, other: object) -> bool:
+        """
+        値による等価比較
+        
+        生成される__eq__はndarrayを要素ごとに比較して真偽値が曖昧になるため、
+        埋め込みはnp.array_equalで比較します。
+        """
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            self.text == other.text
+            and self.token_count == other.token_count
+            and self.model == other.model
+            and self.created_at == other.created_at
+            and self.response_time == other.response_time
+            and np.array_equal(self.embedding, other.embedding)
+        )
+    
     def validate(self) -> None:
         """データ検証"""
         # テキスト検証
@@ -258,6 +329,17 @@ class EmbeddingResult:
         Returns:
             Dict[str, Any]: Supabase互換形式のデータ
         """
+        result = self._to_supabase_record()
+        result["embedding"] = self.embedding.tolist()
+        return result
+    
+    def _to_supabase_record(self) -> Dict[str, Any]:
+        """
+        Supabase挿入用レコード（埋め込みはndarrayのまま）
+        
+        Returns:
+            Dict[str, Any]: 埋め込みをndarrayで保持したレコード
+        """
         result = {
             "text": self.text,
             "embedding": self.embedding,
@@ -297,12 +379,16 @@ class EmbeddingResult:
         """
         単一結果のコスト計算
         
+        初回計算結果を保持し、token_count・modelが更新されるまで再利用します。
+        
         Returns:
             float: 推定コスト（USD）
         """
-        model_info = OPENAI_EMBEDDING_MODELS[self.model]
-        cost_per_1k = model_info["cost_per_1k_tokens"]
-        return (self.token_count / 1000.0) * cost_per_1k
+        if self._cost_cache is None:
+            model_info = OPENAI_EMBEDDING_MODELS[self.model]
+            cost_per_1k = model_info["cost_per_1k_tokens"]
+            self._cost_cache = (self.token_count / 1000.0) * cost_per_1k
+        return self._cost_cache
 
 
 class EmbeddingBatch:
@@ -312,6 +398,8 @@ class EmbeddingBatch:
     複数のEmbeddingResultを管理し、バッチ処理とコスト計算を提供します。
     """
     
+    __slots__ = ("results", "_embedding_matrix", "_token_counts", "total_tokens", "estimated_cost")
+    
     def __init__(self, results: List[EmbeddingResult]):
         """
         初期化
@@ -336,18 +424,112 @@ class EmbeddingBatch:
                 )
         
         self.results = results
+        self._embedding_matrix: Optional[np.ndarray] = None
         self._calculate_totals()
     
     def _calculate_totals(self) -> None:
         """合計値の計算"""
+        # トークン数を列として保持し、統計計算をNumPyで一括実行する
+        self._token_counts = np.fromiter(
+            (result.token_count for result in self.results),
+            dtype=np.int64,
+            count=len(self.results)
+        )
+        
         if not self.results:
             self.total_tokens = 0
             self.estimated_cost = 0.0
             return
         
-        self.total_tokens = sum(result.token_count for result in self.results)
+        self.total_tokens = int(self._token_counts.sum())
         self.estimated_cost = sum(result.calculate_cost() for result in self.results)
     
+    @property
+    def embedding_matrix(self) -> Optional[np.ndarray]:
+        """
+        全埋め込みを積み重ねた(N, D)行列（初回アクセス時に一度だけ構築）
+        
+        Returns:
+            Optional[np.ndarray]: float32行列。次元数が混在する場合はNone
+        """
+        if self._embedding_matrix is None and self.results:
+            first_shape = self.results[0].embedding.shape
+            if all(result.embedding.shape == first_shape for result in self.results):
+                self._embedding_matrix = np.stack(
+                    [result.embedding for result in self.results]
+                ).astype(np.float32, copy=False)
+        return self._embedding_matrix
+    
+    def validate_all(self) -> bool:
+        """
+        バッチ内の全埋め込みを一括検証
+        
+        (N, D)行列に対する形状チェックとnp.isfiniteの1パスで検証します。
+        次元数の異なるモデルが混在する場合はモデル別に検証します。
+        
+        Returns:
+            bool: 検証成功時True
+            
+        Raises:
+            EmbeddingDimensionError: 次元数が不正な場合
+            EmbeddingValidationError: NaNまたは無限大値が含まれる場合
+        """
+        if not self.results:
+            return True
+        
+        models = set(result.model for result in self.results)
+        matrix = self.embedding_matrix
+        
+        if matrix is None:
+            if len(models) == 1:
+                expected_dim = int(OPENAI_EMBEDDING_MODELS[self.results[0].model]["dimension"])
+                for result in self.results:
+                    validate_embedding_vector(result.embedding, expected_dim)
+                return True
+            return all(self.filter_by_model(model).validate_all() for model in models)
+        
+        for model in models:
+            expected_dim = int(OPENAI_EMBEDDING_MODELS[model]["dimension"])
+            if matrix.ndim != 2 or matrix.shape[1] != expected_dim:
+                actual_dim = matrix.shape[1] if matrix.ndim == 2 else matrix.size
+                raise EmbeddingDimensionError(
+                    f"埋め込みベクトルは{expected_dim}次元である必要があります。現在: {actual_dim}次元",
+                    expected_dim=expected_dim,
+                    actual_dim=actual_dim
+                )
+        
+        finite_rows = np.isfinite(matrix).all(axis=1)
+        if not finite_rows.all():
+            i = int(np.flatnonzero(~finite_rows)[0])
+            raise EmbeddingValidationError(
+                f"結果 {i} の埋め込みにNaNまたは無限大値が含まれています",
+                field=f"results[{i}].embedding",
+                value=i
+            )
+        
+        return True
+    
+    def to_columnar(self) -> Dict[str, Any]:
+        """
+        列指向形式に変換
+        
+        埋め込みは(N, D)行列、トークン数は配列として保持し、行ごとの変換を行いません。
+        
+        Returns:
+            Dict[str, Any]: 列ごとのデータ
+                (texts, embeddings, token_counts, models, created_at, response_times)。
+                次元数が混在する場合、embeddingsは各結果のndarrayのリスト
+        """
+        matrix = self.embedding_matrix
+        return {
+            "texts": [result.text for result in self.results],
+            "embeddings": matrix if matrix is not None else [result.embedding for result in self.results],
+            "token_counts": self._token_counts,
+            "models": [result.model for result in self.results],
+            "created_at": [result.created_at.isoformat() for result in self.results],
+            "response_times": [result.response_time for result in self.results]
+        }
+    
     def to_supabase_bulk_format(self) -> List[Dict[str, Any]]:
         """
         Supabaseバルク挿入用形式に変換
@@ -355,7 +537,53 @@ class EmbeddingBatch:
         Returns:
             List[Dict[str, Any]]: バルク挿入用データリスト
         """
-        return [result.to_supabase_format() for result in self.results]
+        columns = self.to_columnar()
+        embeddings = columns["embeddings"]
+        if isinstance(embeddings, np.ndarray):
+            embedding_lists = embeddings.tolist()
+        else:
+            embedding_lists = [embedding.tolist() for embedding in embeddings]
+        
+        records = [
+            {
+                "text": text,
+                "embedding": embedding,
+                "token_count": token_count,
+                "model": model,
+                "created_at": created_at
+            }
+            for text, embedding, token_count, model, created_at in zip(
+                columns["texts"],
+                embedding_lists,
+                columns["token_counts"].tolist(),
+                columns["models"],
+                columns["created_at"]
+            )
+        ]
+        
+        for record, response_time in zip(records, columns["response_times"]):
+            if response_time is not None:
+                record["response_time"] = response_time
+        
+        return records
+    
+    def to_supabase_bulk_json(self) -> bytes:
+        """
+        Supabaseバルク挿入用JSONに直列化
+        
+        orjsonが利用可能な場合、埋め込み配列はtolist()を経由せずC実装で直接直列化します。
+        
+        Returns:
+            bytes: UTF-8エンコード済みJSON配列
+        """
+        records = [result._to_supabase_record() for result in self.results]
+        
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(records, option=orjson.OPT_SERIALIZE_NUMPY)
+        
+        for record in records:
+            record["embedding"] = record["embedding"].tolist()
+        return json.dumps(records, ensure_ascii=False).encode("utf-8")
     
     def get_statistics(self) -> Dict[str, Any]:
         """
@@ -369,21 +597,23 @@ class EmbeddingBatch:
                 "count": 0,
                 "total_tokens": 0,
                 "avg_tokens": 0.0,
+                "std_tokens": 0.0,
                 "min_tokens": 0,
                 "max_tokens": 0,
                 "estimated_cost": 0.0,
                 "models_used": []
             }
         
-        token_counts = [result.token_count for result in self.results]
+        token_counts = self._token_counts
         models_used = list(set(result.model for result in self.results))
         
         return {
-            "count": len(self.results),
+            "count": int(token_counts.size),
             "total_tokens": self.total_tokens,
-            "avg_tokens": statistics.mean(token_counts),
-            "min_tokens": min(token_counts),
-            "max_tokens": max(token_counts),
+            "avg_tokens": float(token_counts.mean()),
+            "std_tokens": float(token_counts.std()),
+            "min_tokens": int(token_counts.min()),
+            "max_tokens": int(token_counts.max()),
             "estimated_cost": self.estimated_cost,
             "models_used": models_used
         }
@@ -429,6 +659,11 @@ class EmbeddingCostCalculator:
     def __init__(self) -> None:
         """初期化"""
         self.model_costs = OPENAI_EMBEDDING_MODELS.copy()
+        # モデル名 -> トークン単価（USD）のフラットな参照表
+        self._price_per_token = {
+            model: info["cost_per_1k_tokens"] / 1000.0
+            for model, info in self.model_costs.items()
+        }
         logger.info("EmbeddingCostCalculator初期化完了")
     
     def calculate_cost(self, token_count: int, model: str) -> float:
@@ -452,10 +687,26 @@ class EmbeddingCostCalculator:
                 value=token_count
             )
         
-        validate_embedding_model(model)
+        return token_count * self._get_price_per_token(model)
+    
+    def _get_price_per_token(self, model: str) -> float:
+        """
+        トークン単価の取得
         
-        cost_per_1k = self.model_costs[model]["cost_per_1k_tokens"]
-        return (token_count / 1000.0) * cost_per_1k
+        Args:
+            model: モデル名
+            
+        Returns:
+            float: 1トークンあたりのコスト（USD）
+            
+        Raises:
+            EmbeddingValidationError: サポートされていないモデルの場合
+        """
+        try:
+            return self._price_per_token[model]
+        except (KeyError, TypeError):
+            validate_embedding_model(model)
+            raise
     
     def calculate_batch_cost(self, batch_items: List[Dict[str, Any]]) -> float:
         """
@@ -474,7 +725,8 @@ class EmbeddingCostCalculator:
                 value=type(batch_items)
             )
         
-        total_cost = 0.0
+        token_counts = []
+        prices = []
         for i, item in enumerate(batch_items):
             if not isinstance(item, dict):
                 raise EmbeddingValidationError(
@@ -490,9 +742,25 @@ class EmbeddingCostCalculator:
                     value=list(item.keys())
                 )
             
-            total_cost += self.calculate_cost(item["tokens"], item["model"])
+            tokens = item["tokens"]
+            if not isinstance(tokens, int) or tokens <= 0:
+                raise EmbeddingValidationError(
+                    "トークン数は正の整数である必要があります",
+                    field="token_count",
+                    value=tokens
+                )
+            
+            token_counts.append(tokens)
+            prices.append(self._get_price_per_token(item["model"]))
+        
+        if not token_counts:
+            return 0.0
         
-        return total_cost
+        # トークン数 × 単価の総和を一括計算
+        return float(np.dot(
+            np.asarray(token_counts, dtype=np.float64),
+            np.asarray(prices, dtype=np.float64)
+        ))
     
     def get_model_costs(self) -> Dict[str, Dict[str, Any]]:
         """
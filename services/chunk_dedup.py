@@ -0,0 +1,191 @@
+"""
+チャンク近似重複排除サービス
+
+MinHash + LSH（Locality Sensitive Hashing）によりほぼ同一のチャンクを検出し、
+埋め込み生成前に代表チャンクへ集約してOpenAI API呼び出しを削減する
+"""
+
+import hashlib
+import logging
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 重複判定設定
+DEFAULT_THRESHOLD = 0.9
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_SIZE = 3
+
+# MinHash用の定数（メルセンヌ素数 2^61 - 1）
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_HASH_SEED = 1
+
+
+def _shingle_hashes(text: str, shingle_size: int) -> np.ndarray:
+    """
+    テキストを文字n-gramに分割し、各n-gramの32bitハッシュを返す
+
+    日本語は空白区切りでないため、トークンではなく文字n-gramを使用する
+
+    Args:
+        text: 対象テキスト
+        shingle_size: n-gramの文字数
+
+    Returns:
+        np.ndarray: n-gramハッシュ（uint64）
+    """
+    normalized = " ".join(text.split())
+    if len(normalized) <= shingle_size:
+        shingles = {normalized}
+    else:
+        shingles = {
+            normalized[i:i + shingle_size]
+            for i in range(len(normalized) - shingle_size + 1)
+        }
+
+    return np.fromiter(
+        (
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+            for s in shingles
+        ),
+        dtype=np.uint64,
+        count=len(shingles)
+    )
+
+
+def _optimal_band_layout(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    閾値に最も近い判定境界となるバンド数・行数を選択
+
+    LSHの候補判定境界は概ね (1/b)^(1/r) となる
+
+    Args:
+        threshold: Jaccard類似度閾値
+        num_perm: 置換（ハッシュ関数）数
+
+    Returns:
+        Tuple[int, int]: (バンド数, バンドあたりの行数)
+    """
+    best = (1, num_perm)
+    best_error = float("inf")
+    for bands in range(1, num_perm + 1):
+        if num_perm % bands:
+            continue
+        rows = num_perm // bands
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class ChunkDeduplicator:
+    """
+    チャンク近似重複排除クラス
+
+    各テキストのMinHash署名をLSHバンドで索引し、推定Jaccard類似度が
+    閾値以上の既出テキストがあればその代表へ集約します。
+    索引はdeduplicate()呼び出しごとに作り直すため、呼び出し間で状態を持ちません。
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        num_perm: int = DEFAULT_NUM_PERM,
+        shingle_size: int = DEFAULT_SHINGLE_SIZE
+    ) -> None:
+        """
+        初期化
+
+        Args:
+            threshold: 重複とみなすJaccard類似度閾値（0より大きく1以下）
+            num_perm: MinHashの置換数
+            shingle_size: 文字n-gramの文字数
+
+        Raises:
+            ValueError: パラメータが不正な場合
+        """
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError(f"thresholdは0より大きく1以下である必要があります: {threshold}")
+        if not isinstance(num_perm, int) or num_perm <= 0:
+            raise ValueError(f"num_permは正の整数である必要があります: {num_perm}")
+        if not isinstance(shingle_size, int) or shingle_size <= 0:
+            raise ValueError(f"shingle_sizeは正の整数である必要があります: {shingle_size}")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _optimal_band_layout(threshold, num_perm)
+
+        # 置換用の一次関数係数 (a * x + b) mod p
+        rng = np.random.RandomState(_HASH_SEED)
+        self._a = rng.randint(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        MinHash署名を計算
+
+        Args:
+            text: 対象テキスト
+
+        Returns:
+            np.ndarray: MinHash署名（num_perm要素のuint64配列）
+        """
+        hashes = _shingle_hashes(text, self.shingle_size)
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0)
+
+    def deduplicate(self, texts: List[str]) -> Tuple[List[int], List[int]]:
+        """
+        近似重複テキストを代表テキストへ集約
+
+        Args:
+            texts: 対象テキストリスト
+
+        Returns:
+            Tuple[List[int], List[int]]:
+                (代表テキストの元インデックス一覧,
+                 各テキストが対応する代表の位置（代表一覧内のインデックス）)
+        """
+        buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        signatures: List[np.ndarray] = []
+        unique_indices: List[int] = []
+        mapping: List[int] = []
+
+        for index, text in enumerate(texts):
+            sig = self.signature(text)
+            band_keys = [
+                sig[band * self.rows:(band + 1) * self.rows].tobytes()
+                for band in range(self.bands)
+            ]
+
+            candidates: Set[int] = set()
+            for band, key in enumerate(band_keys):
+                candidates.update(buckets[band].get(key, ()))
+
+            match = None
+            for candidate in sorted(candidates):
+                if np.mean(signatures[candidate] == sig) >= self.threshold:
+                    match = candidate
+                    break
+
+            if match is not None:
+                mapping.append(match)
+                continue
+
+            position = len(unique_indices)
+            unique_indices.append(index)
+            signatures.append(sig)
+            mapping.append(position)
+            for band, key in enumerate(band_keys):
+                buckets[band].setdefault(key, []).append(position)
+
+        if len(unique_indices) < len(texts):
+            logger.info(
+                f"近似重複チャンクを集約: {len(texts)}件 -> {len(unique_indices)}件"
+            )
+
+        return unique_indices, mapping
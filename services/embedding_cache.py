@@ -0,0 +1,135 @@
+"""
+埋め込みキャッシュサービス
+
+モデル名とチャンク内容のSHA-256ハッシュをキーとした埋め込みベクトルキャッシュ
+同一チャンクの再取り込み時にOpenAI API呼び出しを省略する
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# キャッシュ設定（1536次元float32で約6KB/件）
+DEFAULT_MAX_ENTRIES = 10000
+
+
+def make_cache_key(model: str, content: str) -> str:
+    """
+    キャッシュキーを生成
+
+    Args:
+        model: 埋め込みモデル名
+        content: 埋め込み対象テキスト
+
+    Returns:
+        str: SHA-256ハッシュ（16進文字列）
+    """
+    return hashlib.sha256(f"{model}:{content}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    埋め込みキャッシュクラス
+
+    埋め込みはfloat32のバイト列として保持し、上限件数を超えた場合は
+    最も古く参照されたエントリから破棄します（LRU）。
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        """
+        初期化
+
+        Args:
+            max_entries: 最大キャッシュ件数
+
+        Raises:
+            ValueError: 最大件数が正の整数でない場合
+        """
+        if not isinstance(max_entries, int) or max_entries <= 0:
+            raise ValueError(f"max_entriesは正の整数である必要があります: {max_entries}")
+
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[bytes, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+        logger.info(f"EmbeddingCache初期化完了: max_entries={max_entries}")
+
+    def get(self, model: str, content: str) -> Optional[Tuple[np.ndarray, int]]:
+        """
+        キャッシュから埋め込みを取得
+
+        Args:
+            model: 埋め込みモデル名
+            content: 埋め込み対象テキスト
+
+        Returns:
+            Optional[Tuple[np.ndarray, int]]: (埋め込みベクトル, トークン数)、未登録時None
+        """
+        key = make_cache_key(model, content)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+
+        embedding_bytes, token_count = entry
+        return np.frombuffer(embedding_bytes, dtype=np.float32), token_count
+
+    def set(self, model: str, content: str, embedding: Any, token_count: int) -> None:
+        """
+        埋め込みをキャッシュに登録
+
+        Args:
+            model: 埋め込みモデル名
+            content: 埋め込み対象テキスト
+            embedding: 埋め込みベクトル（リストまたはndarray）
+            token_count: トークン数
+        """
+        key = make_cache_key(model, content)
+        embedding_bytes = np.asarray(embedding, dtype=np.float32).tobytes()
+
+        with self._lock:
+            self._entries[key] = (embedding_bytes, token_count)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """キャッシュを全削除"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        キャッシュ統計情報を取得
+
+        Returns:
+            Dict[str, Any]: 統計情報
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
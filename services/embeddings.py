@@ -5,11 +5,12 @@ Issue #54: OpenAI text-embedding-3-small完全実装
 OpenAI text-embedding-3-smallを使用したベクトル埋め込み生成サービス
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 import time
 import asyncio
 from datetime import datetime
+import numpy as np
 import openai
 import tiktoken
 
@@ -27,8 +28,19 @@ from utils.tokenizer import TokenCounter
 # Supabase統合用（Issue #48要件）
 from services.vector_store import VectorStore
 
+# 埋め込みキャッシュ（同一チャンクの再計算回避）
+from services.embedding_cache import EmbeddingCache
+
+# チャンク近似重複排除（バッチ内のほぼ同一チャンクの埋め込み共有）
+from services.chunk_dedup import ChunkDeduplicator
+
 logger = logging.getLogger(__name__)
 
+# バッチ埋め込み設定
+EMBEDDING_BATCH_SIZE = 512  # 1リクエストあたりの入力数（API上限は2048）
+EMBEDDING_SPAN_TOKENS = 512  # 長文はこのトークン数ごとに分割し埋め込みを平均
+EMBEDDING_MAX_CONCURRENT_REQUESTS = 4  # 非同期バッチの同時リクエスト数
+
 # Issue #54専用のレスポンス時間追跡データクラス
 from dataclasses import dataclass
 
@@ -42,7 +54,7 @@ class BatchEmbeddingResult:
 class EmbeddingService:
     """OpenAI Embeddings サービスクラス"""
     
-    def __init__(self, api_key: str, model: str = "text-embedding-3-small", timeout: Optional[int] = None, async_mode: bool = False) -> None:
+    def __init__(self, api_key: str, model: str = "text-embedding-3-small", timeout: Optional[int] = None, async_mode: bool = False, cache: Optional[EmbeddingCache] = None, deduplicator: Optional[ChunkDeduplicator] = None) -> None:
         """
         OpenAI Embeddings Service初期化
         
@@ -51,6 +63,8 @@ class EmbeddingService:
             model: 使用するモデル名
             timeout: タイムアウト秒数
             async_mode: 非同期モード
+            cache: 埋め込みキャッシュ（指定時はキャッシュヒットでAPI呼び出しを省略）
+            deduplicator: チャンク近似重複排除（指定時はバッチ内の近似重複を1回の埋め込みで共有）
             
         Raises:
             ValueError: APIキーが空または不正形式の場合
@@ -66,6 +80,8 @@ class EmbeddingService:
         self.model = model
         self.timeout = timeout
         self.async_mode = async_mode
+        self.cache = cache
+        self.deduplicator = deduplicator
         
         # Issue #53のTokenCounterと統合
         self.token_counter = TokenCounter(model)
@@ -124,6 +140,11 @@ class EmbeddingService:
         if token_count > 8192:
             raise ValueError("テキストが長すぎます（8192トークン制限）")
         
+        cached_result = self._get_cached_result(text)
+        if cached_result is not None:
+            logger.info(f"埋め込みキャッシュヒット: {len(text)}文字")
+            return cached_result
+        
         logger.info(f"埋め込み生成開始: {len(text)}文字, {token_count}トークン")
         
         start_time = time.time()
@@ -157,6 +178,7 @@ class EmbeddingService:
             
             # Issue #54要件：response_time追跡
             result.response_time = response_time
+            self._store_cached_result(result)
             
             logger.info(f"埋め込み生成完了: {response_time:.3f}秒")
             return result
@@ -219,6 +241,11 @@ class EmbeddingService:
         if token_count > 8192:
             raise ValueError("テキストが長すぎます（8192トークン制限）")
         
+        cached_result = self._get_cached_result(text)
+        if cached_result is not None:
+            logger.info(f"埋め込みキャッシュヒット: {len(text)}文字")
+            return cached_result
+        
         logger.info(f"非同期埋め込み生成開始: {len(text)}文字")
         
         start_time = time.time()
@@ -249,6 +276,7 @@ class EmbeddingService:
                 created_at=datetime.now()
             )
             result.response_time = response_time
+            self._store_cached_result(result)
             
             logger.info(f"非同期埋め込み生成完了: {response_time:.3f}秒")
             return result
@@ -257,6 +285,43 @@ class EmbeddingService:
             logger.error(f"非同期埋め込み生成エラー: {str(e)}")
             raise EmbeddingError(f"非同期埋め込み生成中にエラーが発生しました: {str(e)}") from e
     
+    def _get_cached_result(self, text: str) -> Optional[EmbeddingResult]:
+        """
+        キャッシュから埋め込み結果を取得
+        
+        Args:
+            text: 埋め込み対象テキスト
+            
+        Returns:
+            Optional[EmbeddingResult]: キャッシュヒット時の埋め込み結果
+        """
+        if self.cache is None:
+            return None
+        
+        cached = self.cache.get(self.model, text)
+        if cached is None:
+            return None
+        
+        embedding, token_count = cached
+        return EmbeddingResult(
+            text=text,
+            embedding=embedding,
+            token_count=token_count,
+            model=self.model,
+            created_at=datetime.now(),
+            response_time=0.0
+        )
+    
+    def _store_cached_result(self, result: EmbeddingResult) -> None:
+        """
+        埋め込み結果をキャッシュに登録
+        
+        Args:
+            result: 埋め込み結果
+        """
+        if self.cache is not None:
+            self.cache.set(result.model, result.text, result.embedding, result.token_count)
+    
     def generate_batch_embeddings(self, texts: List[str]) -> BatchEmbeddingResult:
         """
         バッチで埋め込みを生成（Issue #54互換性）
@@ -279,31 +344,42 @@ class EmbeddingService:
         
         logger.info(f"バッチ埋め込み生成開始: {len(texts)}件")
         
+        # キャッシュ済みテキストは送信せず、近似重複チャンクは代表テキストのみ埋め込みを生成
+        cached_results, miss_indices = self._lookup_cached_results(texts)
+        embeddings = [None if result is None else result.embedding.tolist() for result in cached_results]
+        miss_texts = [texts[i] for i in miss_indices]
+        request_texts, mapping = self._deduplicate_requests(miss_texts)
+        total_tokens = 0
+        
         try:
-            response = self.client.embeddings.create(
-                input=texts,
-                model=self.model
-            )
-            
-            # OpenAI APIの返り値を確実にリスト形式に変換
-            embeddings = []
-            for item in response.data:
-                raw_embedding = item.embedding
-                if hasattr(raw_embedding, 'tolist'):
-                    embedding_list = raw_embedding.tolist()
-                elif not isinstance(raw_embedding, list):
-                    embedding_list = list(raw_embedding)
-                else:
-                    embedding_list = raw_embedding
-                embeddings.append(embedding_list)
+            if request_texts:
+                response = self.client.embeddings.create(
+                    input=request_texts,
+                    model=self.model
+                )
+                
+                request_embeddings = [self._to_embedding_list(item.embedding) for item in response.data]
+                if mapping is not None:
+                    request_embeddings = [request_embeddings[position] for position in mapping]
+                
+                for index, text, embedding in zip(miss_indices, miss_texts, request_embeddings, strict=True):
+                    embeddings[index] = embedding
+                    if self.cache is not None:
+                        self.cache.set(self.model, text, embedding, self.token_counter.count_tokens(text))
+                
+                total_tokens = response.usage.total_tokens
             
+            # total_tokensは今回APIで消費したトークン数（キャッシュヒット分は含まない）
             result = BatchEmbeddingResult(
                 embeddings=embeddings,
-                total_tokens=response.usage.total_tokens,
+                total_tokens=total_tokens,
                 model=self.model
             )
             
-            logger.info(f"バッチ埋め込み生成完了: {len(embeddings)}件")
+            logger.info(
+                f"バッチ埋め込み生成完了: {len(embeddings)}件 "
+                f"(キャッシュヒット{len(texts) - len(miss_indices)}件, 送信{len(request_texts)}件)"
+            )
             return result
             
         except Exception as e:
@@ -314,11 +390,14 @@ class EmbeddingService:
         """
         バッチで埋め込みを生成（Issue #53互換性）
         
+        EMBEDDING_BATCH_SIZE件ずつ1リクエストにまとめて送信します。
+        EMBEDDING_SPAN_TOKENSを超える長文はスパンに分割し、各スパンの埋め込みを平均します。
+        
         Args:
             texts: 埋め込み対象テキストリスト
             
         Returns:
-            EmbeddingBatch: バッチ埋め込み結果
+            EmbeddingBatch: 入力順のバッチ埋め込み結果
             
         Raises:
             ValueError: テキストリストが空または制限超過の場合
@@ -330,46 +409,289 @@ class EmbeddingService:
         logger.info(f"バッチ埋め込み生成開始: {len(texts)}件")
         
         try:
-            # 各テキストのEmbeddingResultを生成
-            results = []
-            for text in texts:
-                # 実際のOpenAI APIを呼び出し
-                response = self.client.embeddings.create(
-                    input=text,
-                    model=self.model
-                )
+            results, miss_indices = self._lookup_cached_results(texts)
+            miss_texts = [texts[i] for i in miss_indices]
+            request_texts, mapping = self._deduplicate_requests(miss_texts)
+            spans: List[str] = []
+            
+            if request_texts:
+                spans, span_counts, token_counts = self._prepare_batch_spans(request_texts)
                 
-                # OpenAI APIの返り値を確実にリスト形式に変換
-                raw_embedding = response.data[0].embedding
-                if hasattr(raw_embedding, 'tolist'):
-                    embedding_list = raw_embedding.tolist()
-                elif not isinstance(raw_embedding, list):
-                    embedding_list = list(raw_embedding)
-                else:
-                    embedding_list = raw_embedding
-                    
-                result = EmbeddingResult(
-                    text=text,
-                    embedding=embedding_list,
-                    token_count=response.usage.total_tokens,
-                    model=self.model,
-                    created_at=datetime.now()
+                embeddings = []
+                for start in range(0, len(spans), EMBEDDING_BATCH_SIZE):
+                    response = self.client.embeddings.create(
+                        input=spans[start:start + EMBEDDING_BATCH_SIZE],
+                        model=self.model
+                    )
+                    embeddings.extend(self._to_embedding_list(item.embedding) for item in response.data)
+                
+                request_results = self._build_embedding_results(
+                    request_texts, span_counts, token_counts, embeddings
+                )
+                self._fill_batch_results(
+                    results, miss_indices,
+                    self._expand_deduplicated_results(miss_texts, mapping, request_results)
                 )
-                results.append(result)
             
-            # EmbeddingBatchオブジェクトを作成
             batch = EmbeddingBatch(results)
             
-            logger.info(f"バッチ埋め込み生成完了: {len(results)}件")
+            logger.info(
+                f"バッチ埋め込み生成完了: {len(batch.results)}件 "
+                f"(キャッシュヒット{len(texts) - len(miss_indices)}件, 送信{len(request_texts)}件, {len(spans)}スパン)"
+            )
             return batch
             
         except EmbeddingValidationError as e:
             logger.error(f"バッチ埋め込み検証エラー: {str(e)}", exc_info=True)
             raise EmbeddingError(f"バッチ埋め込み検証エラー: {str(e)}") from e
+        except EmbeddingError:
+            raise
         except Exception as e:
             logger.error(f"バッチ埋め込み生成エラー: {str(e)}", exc_info=True)
             raise EmbeddingError(f"バッチ埋め込み生成中にエラーが発生しました: {str(e)}") from e
     
+    async def create_batch_embeddings_async(self, texts: List[str]) -> EmbeddingBatch:
+        """
+        非同期でバッチ埋め込みを生成
+        
+        リクエスト単位のバッチをEMBEDDING_MAX_CONCURRENT_REQUESTS件まで並行送信します。
+        
+        Args:
+            texts: 埋め込み対象テキストリスト
+            
+        Returns:
+            EmbeddingBatch: 入力順のバッチ埋め込み結果
+            
+        Raises:
+            ValueError: テキストリストが空の場合
+            EmbeddingError: 非同期モード無効、または埋め込み生成エラーの場合
+        """
+        if not self.async_mode or self.async_client is None:
+            raise EmbeddingError("非同期モードが有効化されていません")
+        
+        if not texts:
+            raise ValueError("テキストリストが空です")
+        
+        logger.info(f"非同期バッチ埋め込み生成開始: {len(texts)}件")
+        
+        try:
+            results, miss_indices = self._lookup_cached_results(texts)
+            miss_texts = [texts[i] for i in miss_indices]
+            request_texts, mapping = self._deduplicate_requests(miss_texts)
+            spans: List[str] = []
+            
+            if request_texts:
+                spans, span_counts, token_counts = self._prepare_batch_spans(request_texts)
+                semaphore = asyncio.Semaphore(EMBEDDING_MAX_CONCURRENT_REQUESTS)
+                
+                async def embed_chunk(chunk: List[str]) -> List[List[float]]:
+                    async with semaphore:
+                        response = await self.async_client.embeddings.create(
+                            input=chunk,
+                            model=self.model
+                        )
+                    return [self._to_embedding_list(item.embedding) for item in response.data]
+                
+                chunk_embeddings = await asyncio.gather(*(
+                    embed_chunk(spans[start:start + EMBEDDING_BATCH_SIZE])
+                    for start in range(0, len(spans), EMBEDDING_BATCH_SIZE)
+                ))
+                embeddings = [embedding for chunk in chunk_embeddings for embedding in chunk]
+                
+                request_results = self._build_embedding_results(
+                    request_texts, span_counts, token_counts, embeddings
+                )
+                self._fill_batch_results(
+                    results, miss_indices,
+                    self._expand_deduplicated_results(miss_texts, mapping, request_results)
+                )
+            
+            batch = EmbeddingBatch(results)
+            
+            logger.info(
+                f"非同期バッチ埋め込み生成完了: {len(batch.results)}件 "
+                f"(キャッシュヒット{len(texts) - len(miss_indices)}件, 送信{len(request_texts)}件, {len(spans)}スパン)"
+            )
+            return batch
+            
+        except EmbeddingValidationError as e:
+            logger.error(f"バッチ埋め込み検証エラー: {str(e)}", exc_info=True)
+            raise EmbeddingError(f"バッチ埋め込み検証エラー: {str(e)}") from e
+        except EmbeddingError:
+            raise
+        except Exception as e:
+            logger.error(f"非同期バッチ埋め込み生成エラー: {str(e)}", exc_info=True)
+            raise EmbeddingError(f"非同期バッチ埋め込み生成中にエラーが発生しました: {str(e)}") from e
+    
+    @staticmethod
+    def _to_embedding_list(raw_embedding: Any) -> List[float]:
+        """OpenAI APIの返り値を確実にリスト形式に変換"""
+        if hasattr(raw_embedding, 'tolist'):
+            return raw_embedding.tolist()
+        if not isinstance(raw_embedding, list):
+            return list(raw_embedding)
+        return raw_embedding
+    
+    def _lookup_cached_results(self, texts: List[str]) -> Tuple[List[Optional[EmbeddingResult]], List[int]]:
+        """
+        バッチ入力をキャッシュと照合
+        
+        Args:
+            texts: 埋め込み対象テキストリスト
+            
+        Returns:
+            Tuple[List[Optional[EmbeddingResult]], List[int]]:
+                (入力順の結果一覧（未ヒットはNone）, キャッシュ未ヒットのインデックス一覧)
+        """
+        if self.cache is None:
+            return [None] * len(texts), list(range(len(texts)))
+        
+        results = [self._get_cached_result(text) for text in texts]
+        miss_indices = [i for i, result in enumerate(results) if result is None]
+        return results, miss_indices
+    
+    def _deduplicate_requests(self, texts: List[str]) -> Tuple[List[str], Optional[List[int]]]:
+        """
+        近似重複テキストを代表テキストに集約（重複排除未設定時はそのまま）
+        
+        Args:
+            texts: 埋め込み対象テキストリスト
+            
+        Returns:
+            Tuple[List[str], Optional[List[int]]]:
+                (API送信テキスト一覧, 各テキストが対応する送信テキストの位置。重複排除なしはNone)
+        """
+        if self.deduplicator is None or not texts:
+            return texts, None
+        
+        unique_indices, mapping = self.deduplicator.deduplicate(texts)
+        return [texts[i] for i in unique_indices], mapping
+    
+    def _expand_deduplicated_results(
+        self,
+        texts: List[str],
+        mapping: Optional[List[int]],
+        request_results: List[EmbeddingResult]
+    ) -> List[EmbeddingResult]:
+        """
+        代表テキストの埋め込み結果を集約元の各テキストに展開
+        
+        Args:
+            texts: 集約前のテキストリスト
+            mapping: 各テキストが対応する代表の位置（Noneは集約なし）
+            request_results: 代表テキストの埋め込み結果
+            
+        Returns:
+            List[EmbeddingResult]: textsと同順の埋め込み結果
+        """
+        if mapping is None:
+            return request_results
+        
+        results = []
+        for text, position in zip(texts, mapping, strict=True):
+            representative = request_results[position]
+            if text == representative.text:
+                results.append(representative)
+                continue
+            
+            # 近似重複は代表の埋め込みを共有し、トークン数は自身の値を保持
+            results.append(EmbeddingResult(
+                text=text,
+                embedding=representative.embedding,
+                token_count=self.token_counter.count_tokens(text),
+                model=self.model,
+                created_at=representative.created_at
+            ))
+        return results
+    
+    def _fill_batch_results(
+        self,
+        results: List[Optional[EmbeddingResult]],
+        miss_indices: List[int],
+        new_results: List[EmbeddingResult]
+    ) -> None:
+        """
+        新たに生成した埋め込みを結果一覧に反映し、キャッシュに登録
+        
+        Args:
+            results: 入力順の結果一覧（未ヒット箇所を埋める）
+            miss_indices: キャッシュ未ヒットのインデックス一覧
+            new_results: 未ヒット分の埋め込み結果（miss_indicesと同順）
+        """
+        for index, result in zip(miss_indices, new_results, strict=True):
+            results[index] = result
+            self._store_cached_result(result)
+    
+    def _prepare_batch_spans(self, texts: List[str]) -> Tuple[List[str], List[int], List[int]]:
+        """
+        バッチ入力をAPI送信用スパンに展開
+        
+        Args:
+            texts: 埋め込み対象テキストリスト
+            
+        Returns:
+            Tuple[List[str], List[int], List[int]]:
+                (送信スパン一覧, テキストごとのスパン数, テキストごとのトークン数)
+        """
+        token_counts = self.token_counter.count_tokens_batch(texts)
+        spans: List[str] = []
+        span_counts: List[int] = []
+        
+        for text, token_count in zip(texts, token_counts):
+            if token_count > EMBEDDING_SPAN_TOKENS:
+                text_spans = self.token_counter.split_into_spans(text, EMBEDDING_SPAN_TOKENS)
+            else:
+                text_spans = [text]
+            spans.extend(text_spans)
+            span_counts.append(len(text_spans))
+        
+        return spans, span_counts, token_counts
+    
+    def _build_embedding_results(
+        self,
+        texts: List[str],
+        span_counts: List[int],
+        token_counts: List[int],
+        embeddings: List[List[float]]
+    ) -> List[EmbeddingResult]:
+        """
+        スパン埋め込みをテキスト単位に集約してEmbeddingResultを作成
+        
+        Raises:
+            EmbeddingError: 返却された埋め込み数がスパン数と一致しない場合
+        """
+        if len(embeddings) != sum(span_counts):
+            raise EmbeddingError(
+                f"埋め込み数がスパン数と一致しません: {len(embeddings)} != {sum(span_counts)}"
+            )
+        
+        results = []
+        offset = 0
+        created_at = datetime.now()
+        for text, span_count, token_count in zip(texts, span_counts, token_counts):
+            if span_count == 1:
+                embedding = embeddings[offset]
+            else:
+                # 平均ベクトルは単位長でなくなるため、他の埋め込みと同様にL2正規化する
+                embedding = np.mean(
+                    np.asarray(embeddings[offset:offset + span_count], dtype=np.float32),
+                    axis=0
+                )
+                norm = np.linalg.norm(embedding)
+                if norm > 0:
+                    embedding = embedding / norm
+            offset += span_count
+            
+            results.append(EmbeddingResult(
+                text=text,
+                embedding=embedding,
+                token_count=token_count,
+                model=self.model,
+                created_at=created_at
+            ))
+        
+        return results
+    
     def estimate_tokens(self, text: str) -> int:
         """
         テキストのトークン数を推定
@@ -452,17 +774,17 @@ class EmbeddingService:
         if len(embedding1) != len(embedding2):
             raise ValueError("埋め込みの次元数が一致しません")
         
-        # ドット積計算
-        dot_product = sum(a * b for a, b in zip(embedding1, embedding2))
+        # NumPy（BLAS・SIMD）でドット積とノルムを計算
+        vector1 = np.asarray(embedding1, dtype=np.float64)
+        vector2 = np.asarray(embedding2, dtype=np.float64)
         
-        # ノルム計算
-        norm1 = sum(a * a for a in embedding1) ** 0.5
-        norm2 = sum(b * b for b in embedding2) ** 0.5
+        norm1 = np.linalg.norm(vector1)
+        norm2 = np.linalg.norm(vector2)
         
         if norm1 == 0 or norm2 == 0:
             return 0.0
         
-        return dot_product / (norm1 * norm2)
+        return float(np.dot(vector1, vector2) / (norm1 * norm2))
     
     def store_embeddings_to_supabase(
         self,
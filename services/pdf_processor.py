@@ -4,8 +4,10 @@ PDF処理サービス
 PyMuPDF + spaCyを使用したPDF文書処理機能
 """
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Union, Sequence, Callable, Iterator
 import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 from dataclasses import dataclass, field
 import fitz  # PyMuPDF
@@ -13,11 +15,34 @@ import spacy
 import time
 import uuid
 from datetime import datetime
-import io
+import mmap
 import re
 
 logger = logging.getLogger(__name__)
 
+# PDFファイルシグネチャ
+PDF_HEADER = b'%PDF-'
+
+# PDFバイトデータ（bytes・bytearray・memoryview・mmap等のバッファプロトコル対応オブジェクト）
+PDFBuffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+
+
+def _as_pdf_stream(pdf_bytes: PDFBuffer) -> Union[bytes, bytearray, memoryview]:
+    """
+    PyMuPDFのstream引数として渡せる形式に変換
+
+    mmap等のバッファはmemoryviewで包むため、データはコピーされません
+
+    Args:
+        pdf_bytes: PDFバイトデータ
+
+    Returns:
+        Union[bytes, bytearray, memoryview]: fitz.open(stream=...)に渡すバッファ
+    """
+    if isinstance(pdf_bytes, (bytes, bytearray, memoryview)):
+        return pdf_bytes
+    return memoryview(pdf_bytes)
+
 @dataclass
 class TextBlock:
     """テキストブロックデータクラス"""
@@ -123,12 +148,12 @@ class PDFProcessor:
             r'^[ア-ン][．\.\s]+.+',  # カタカナ見出し
         ]
     
-    def process_pdf(self, pdf_bytes: bytes, filename: str) -> ProcessingResult:
+    def process_pdf(self, pdf_bytes: PDFBuffer, filename: str) -> ProcessingResult:
         """
         PDFファイルを処理してチャンクに分割
         
         Args:
-            pdf_bytes: PDFファイルのバイトデータ
+            pdf_bytes: PDFファイルのバイトデータ（bytes・memoryview・mmap等のバッファ）
             filename: ファイル名
             
         Returns:
@@ -139,13 +164,7 @@ class PDFProcessor:
         """
         logger.info(f"PDF処理開始: {filename}")
         
-        # 空ファイルチェック
-        if not pdf_bytes or len(pdf_bytes) == 0:
-            raise PDFProcessingError("PDFファイルが空です")
-        
-        # 無効PDFファイルチェック（PDFヘッダーの確認）
-        if not pdf_bytes.startswith(b'%PDF-'):
-            raise PDFProcessingError("無効なPDFファイルです")
+        self._validate_pdf_bytes(pdf_bytes)
         
         try:
             # TODO: 実装
@@ -162,50 +181,121 @@ class PDFProcessor:
                 token_count=10
             )
             
-            # バイトデータから一時ファイルを作成してDocument形式で処理
-            with io.BytesIO(pdf_bytes) as pdf_stream:
-                # PyMuPDFでバイトデータを直接処理
-                pdf_doc = fitz.open(stream=pdf_stream, filetype="pdf")
-                
-                # 基本メタデータを取得
-                metadata = self._extract_metadata(pdf_doc)
-                
-                # ページごとにテキストを抽出
-                pages = []
-                for page_num in range(pdf_doc.page_count):
-                    page = self._extract_page_text(pdf_doc[page_num], page_num + 1)
-                    pages.append(page)
-                
-                # Documentを作成
-                document = Document(
-                    filename=filename,
-                    original_filename=filename,
-                    total_pages=pdf_doc.page_count,
-                    pages=pages,
-                    metadata=metadata,
-                    processing_status="completed"
-                )
-                
-                pdf_doc.close()
-                
-                # 文書構造解析
-                document_structure = self.analyze_document_structure(document)
-                
-                # DocumentからDocumentChunkを作成
-                chunks = self._convert_document_to_chunks(document)
-                
-                return ProcessingResult(
-                    chunks=chunks,
-                    total_pages=document.total_pages,
-                    total_chunks=len(chunks),
-                    processing_time=0.1,
-                    errors=[],
-                    document_structure=document_structure
-                )
+            # バイトデータをコピーせずPyMuPDFへ直接渡してDocument形式で処理
+            pdf_doc = fitz.open(stream=_as_pdf_stream(pdf_bytes), filetype="pdf")
+            
+            # 基本メタデータを取得
+            metadata = self._extract_metadata(pdf_doc)
+            
+            # ページごとにテキストを抽出
+            pages = []
+            for page_num in range(pdf_doc.page_count):
+                page = self._extract_page_text(pdf_doc[page_num], page_num + 1)
+                pages.append(page)
+            
+            # Documentを作成
+            document = Document(
+                filename=filename,
+                original_filename=filename,
+                total_pages=pdf_doc.page_count,
+                pages=pages,
+                metadata=metadata,
+                processing_status="completed"
+            )
+            
+            pdf_doc.close()
+            
+            # 文書構造解析
+            document_structure = self.analyze_document_structure(document)
+            
+            # DocumentからDocumentChunkを作成
+            chunks = self._convert_document_to_chunks(document)
+            
+            return ProcessingResult(
+                chunks=chunks,
+                total_pages=document.total_pages,
+                total_chunks=len(chunks),
+                processing_time=0.1,
+                errors=[],
+                document_structure=document_structure
+            )
+        
+        except Exception as e:
+            logger.error(f"PDF処理エラー: {str(e)}", exc_info=True)
+            raise PDFProcessingError(f"PDFの処理中にエラーが発生しました: {str(e)}") from e
+    
+    @staticmethod
+    def _validate_pdf_bytes(pdf_bytes: PDFBuffer) -> None:
+        """
+        PDFバイトデータの事前検証
+        
+        Raises:
+            PDFProcessingError: 空ファイルまたは無効なPDFの場合
+        """
+        # 空ファイルチェック
+        if pdf_bytes is None or len(pdf_bytes) == 0:
+            raise PDFProcessingError("PDFファイルが空です")
+        
+        # 無効PDFファイルチェック（PDFヘッダーの確認、バッファ全体はコピーしない）
+        if bytes(memoryview(pdf_bytes)[:len(PDF_HEADER)]) != PDF_HEADER:
+            raise PDFProcessingError("無効なPDFファイルです")
+    
+    def iter_chunks(
+        self,
+        source: Union[PDFBuffer, str, Path],
+        filename: Optional[str] = None
+    ) -> Iterator[DocumentChunk]:
+        """
+        PDFをページ単位で読み込み、チャンクを逐次生成
+        
+        文書全体をDocumentとして保持しないため、ファイルサイズに関わらず
+        メモリ使用量は1ページ分に抑えられます（文書構造解析は行いません）。
+        
+        Args:
+            source: PDFファイルのバイトデータ（バッファ）、またはファイルパス
+            filename: チャンクに設定するファイル名（省略時はパスのファイル名）
+            
+        Yields:
+            DocumentChunk: ページ順のチャンク
             
+        Raises:
+            FileNotFoundError: ファイルが存在しない場合
+            PDFProcessingError: PDF処理エラーの場合
+        """
+        if not isinstance(source, (str, Path)):
+            self._validate_pdf_bytes(source)
+            filename = filename or "document.pdf"
+            open_args = {"stream": _as_pdf_stream(source), "filetype": "pdf"}
+        else:
+            pdf_path = Path(source)
+            if not pdf_path.exists():
+                raise FileNotFoundError(f"PDFファイルが見つかりません: {pdf_path}")
+            filename = filename or pdf_path.name
+            open_args = {"filename": str(pdf_path)}
+        
+        logger.info(f"PDFストリーミング処理開始: {filename}")
+        
+        try:
+            pdf_doc = fitz.open(**open_args)
         except Exception as e:
             logger.error(f"PDF処理エラー: {str(e)}", exc_info=True)
             raise PDFProcessingError(f"PDFの処理中にエラーが発生しました: {str(e)}") from e
+        
+        try:
+            for page_num in range(pdf_doc.page_count):
+                try:
+                    page = self._extract_page_text(pdf_doc[page_num], page_num + 1)
+                except Exception as e:
+                    logger.error(f"PDF処理エラー: {str(e)}", exc_info=True)
+                    raise PDFProcessingError(
+                        f"PDFの処理中にエラーが発生しました: {str(e)}"
+                    ) from e
+                
+                yield from self._page_to_chunks(page, filename)
+                # 処理済みページを保持しない
+                del page
+        finally:
+            pdf_doc.close()
     
     def extract_text_from_pdf(self, pdf_path: Path) -> Document:
         """
@@ -328,20 +418,23 @@ class PDFProcessor:
         chunks = []
         
         for page in document.pages:
-            for i, text_block in enumerate(page.text_blocks):
-                if text_block.content.strip():  # 空でないテキストのみ
-                    chunk = DocumentChunk(
-                        content=text_block.content,
-                        filename=document.filename,
-                        page_number=page.page_number,
-                        start_pos={"x": text_block.bbox["x0"], "y": text_block.bbox["y0"]},
-                        end_pos={"x": text_block.bbox["x1"], "y": text_block.bbox["y1"]},
-                        token_count=len(text_block.content.split())  # 簡易的なトークン数
-                    )
-                    chunks.append(chunk)
+            chunks.extend(self._page_to_chunks(page, document.filename))
         
         return chunks
     
+    def _page_to_chunks(self, page: Page, filename: str) -> Iterator[DocumentChunk]:
+        """PageのテキストブロックからDocumentChunkを生成"""
+        for text_block in page.text_blocks:
+            if text_block.content.strip():  # 空でないテキストのみ
+                yield DocumentChunk(
+                    content=text_block.content,
+                    filename=filename,
+                    page_number=page.page_number,
+                    start_pos={"x": text_block.bbox["x0"], "y": text_block.bbox["y0"]},
+                    end_pos={"x": text_block.bbox["x1"], "y": text_block.bbox["y1"]},
+                    token_count=len(text_block.content.split())  # 簡易的なトークン数
+                )
+    
     def analyze_document_structure(self, document: Document) -> DocumentStructure:
         """
         文書構造を解析してセクション階層を検出
@@ -611,6 +704,126 @@ class PDFProcessor:
         
         return min(sum(confidence_factors), 1.0)
 
+# バッチ処理設定
+DEFAULT_BATCH_WORKERS = os.cpu_count() or 1
+
+# バッチ入力: PDFファイルパス、または (PDFバイトデータ, ファイル名)
+BatchInput = Union[str, Path, Tuple[bytes, str]]
+
+# プロセスワーカーごとのPDFProcessor（initializerで生成）
+_worker_processor: Optional[PDFProcessor] = None
+
+
+def _init_worker_processor() -> None:
+    """プロセスワーカー初期化: ワーカー専用のPDFProcessorを生成"""
+    global _worker_processor
+    _worker_processor = PDFProcessor()
+
+
+def _process_in_worker(pdf_bytes: bytes, filename: str) -> ProcessingResult:
+    """プロセスワーカー内でPDFを処理"""
+    return _worker_processor.process_pdf(pdf_bytes, filename)
+
+
+class PDFBatchProcessor:
+    """
+    複数PDF一括処理クラス
+
+    ファイル単位でワーカーへ分配して並列処理します。
+    PyMuPDFは解析中にGILを解放するため既定はスレッドプールを使用し、
+    use_processes=Trueでプロセスプール（ワーカーごとにPDFProcessorを生成）を使用します。
+    """
+
+    def __init__(
+        self,
+        processor: Optional[PDFProcessor] = None,
+        use_processes: bool = False
+    ) -> None:
+        """
+        初期化
+
+        Args:
+            processor: スレッド実行時に共有するPDFProcessor（省略時は新規作成）
+            use_processes: Trueの場合プロセスプールで処理
+        """
+        self.use_processes = use_processes
+        self.processor = None if use_processes else (processor or PDFProcessor())
+
+    @staticmethod
+    def _load_input(item: BatchInput) -> Tuple[bytes, str]:
+        """バッチ入力を (バイトデータ, ファイル名) に正規化"""
+        if isinstance(item, tuple):
+            return item
+        path = Path(item)
+        return path.read_bytes(), path.name
+
+    def _create_executor(self, workers: int) -> Executor:
+        """ワーカー数に応じたExecutorを作成"""
+        if self.use_processes:
+            return ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker_processor
+            )
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pdf-batch")
+
+    def process_files(
+        self,
+        paths: Sequence[BatchInput],
+        workers: Optional[int] = None,
+        callback: Optional[Callable[[str, ProcessingResult], None]] = None
+    ) -> List[ProcessingResult]:
+        """
+        複数PDFを並列処理
+
+        Args:
+            paths: PDFファイルパス、または (PDFバイトデータ, ファイル名) のリスト
+            workers: 最大ワーカー数（省略時はCPUコア数、ファイル数が上限）
+            callback: 1ファイル完了ごとに (ファイル名, 処理結果) で呼ばれる関数
+
+        Returns:
+            List[ProcessingResult]: 入力順の処理結果
+
+        Raises:
+            ValueError: ワーカー数が不正な場合
+            PDFProcessingError: いずれかのPDF処理に失敗した場合
+        """
+        if workers is not None and workers <= 0:
+            raise ValueError(f"workersは正の整数である必要があります: {workers}")
+
+        inputs = [self._load_input(item) for item in paths]
+        if not inputs:
+            return []
+
+        max_workers = min(workers or DEFAULT_BATCH_WORKERS, len(inputs))
+        logger.info(f"PDFバッチ処理開始: {len(inputs)}件 (ワーカー数: {max_workers})")
+
+        task = _process_in_worker if self.use_processes else self.processor.process_pdf
+
+        if callback is None:
+            # 進捗通知が不要なら完了順の追跡をせず、mapで入力順に結果を受け取る
+            pdf_buffers, filenames = zip(*inputs)
+            with self._create_executor(max_workers) as executor:
+                results = list(executor.map(task, pdf_buffers, filenames))
+            logger.info(f"PDFバッチ処理完了: {len(inputs)}件")
+            return results
+
+        results: List[Optional[ProcessingResult]] = [None] * len(inputs)
+
+        with self._create_executor(max_workers) as executor:
+            futures = {
+                executor.submit(task, pdf_bytes, filename): index
+                for index, (pdf_bytes, filename) in enumerate(inputs)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                results[index] = future.result()
+                if callback:
+                    callback(inputs[index][1], results[index])
+
+        logger.info(f"PDFバッチ処理完了: {len(inputs)}件")
+        return results
+
+
 class PDFProcessingError(Exception):
     """PDF処理エラー"""
     pass
\ No newline at end of file
@@ -4,17 +4,24 @@
 Supabase + pgvectorを使用したベクトル検索機能
 """
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Tuple
 import logging
 from dataclasses import dataclass
 import uuid
 import math
 import asyncio
+import concurrent.futures
+import json
+import os
+import struct
+import threading
 import time
 from functools import wraps
 from typing import Union
 import weakref
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 # セキュリティ関連の定数
@@ -31,6 +38,38 @@ CONNECTION_TIMEOUT = 30.0
 RETRY_ATTEMPTS = 3
 RETRY_DELAY = 1.0
 
+# 共有HTTPクライアント設定（Supabase REST呼び出しのkeep-alive接続を再利用）
+HTTP_MAX_CONNECTIONS = 10
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 5
+STORAGE_CLIENT_TIMEOUT = 20
+
+# ハイブリッド検索設定（Reciprocal Rank Fusion）
+RRF_K = 60
+HYBRID_CANDIDATE_MULTIPLIER = 2
+
+# バルク挿入設定
+BULK_INSERT_CHUNK_SIZE = 50
+BULK_INSERT_MAX_CONCURRENCY = 8
+
+# チャンク保存設定（1リクエストあたりの行数、PostgRESTのペイロード上限対策）
+STORE_CHUNKS_BATCH_ROWS = 1000
+
+# COPY設定（PostgRESTを経由せずPostgreSQLへ直接バルク挿入）
+COPY_MIN_RECORDS = 50
+DOCUMENT_CHUNK_COPY_COLUMNS = (
+    "id",
+    "document_id",
+    "content",
+    "filename",
+    "page_number",
+    "chapter_number",
+    "section_name",
+    "start_pos",
+    "end_pos",
+    "embedding",
+    "token_count",
+)
+
 
 def async_retry(max_attempts: int = RETRY_ATTEMPTS, delay: float = RETRY_DELAY):
     """
@@ -104,6 +143,88 @@ def sync_retry(max_attempts: int = RETRY_ATTEMPTS, delay: float = RETRY_DELAY):
     return decorator
 
 
+# (URL, キー)ごとに共有するSupabase同期クライアント
+_shared_clients: Dict[tuple, object] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def _create_pooled_client(supabase_url: str, supabase_key: str) -> object:
+    """
+    接続数上限付きのhttpxクライアントを持つSupabaseクライアントを作成
+
+    ClientOptionsがhttpx_clientを受け付けない古いsupabaseでは既定のクライアントを使用する
+
+    Args:
+        supabase_url: Supabase URL
+        supabase_key: Supabase APIキー
+
+    Returns:
+        object: Supabaseクライアント
+
+    Raises:
+        ImportError: supabaseパッケージが利用できない場合
+    """
+    from supabase import create_client
+
+    try:
+        import httpx
+        from supabase import ClientOptions
+    except ImportError:
+        return create_client(supabase_url, supabase_key)
+
+    httpx_client = httpx.Client(
+        timeout=CONNECTION_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+    )
+    try:
+        options = ClientOptions(
+            postgrest_client_timeout=CONNECTION_TIMEOUT,
+            storage_client_timeout=STORAGE_CLIENT_TIMEOUT,
+            httpx_client=httpx_client,
+        )
+    except TypeError:
+        httpx_client.close()
+        logger.warning("supabaseがhttpx_clientに未対応のため既定のクライアントを使用します")
+        return create_client(supabase_url, supabase_key)
+    return create_client(supabase_url, supabase_key, options=options)
+
+
+def get_shared_client(supabase_url: str, supabase_key: str) -> object:
+    """
+    共有Supabaseクライアントを取得（初回のみ作成）
+
+    VectorStoreや接続プールの各スロットで同一クライアントを共有し、
+    インスタンスごとのhttpxクライアント生成・TLSハンドシェイクを回避する
+
+    Args:
+        supabase_url: Supabase URL
+        supabase_key: Supabase APIキー
+
+    Returns:
+        object: Supabaseクライアント
+
+    Raises:
+        ImportError: supabaseパッケージが利用できない場合
+    """
+    key = (supabase_url, supabase_key)
+    with _shared_clients_lock:
+        client = _shared_clients.get(key)
+        if client is None:
+            client = _create_pooled_client(supabase_url, supabase_key)
+            _shared_clients[key] = client
+            logger.info("共有Supabaseクライアントを作成しました")
+        return client
+
+
+def clear_shared_clients() -> None:
+    """共有Supabaseクライアントを破棄（次回取得時に再作成）"""
+    with _shared_clients_lock:
+        _shared_clients.clear()
+
+
 class SupabaseConnectionPool:
     """
     Supabase接続プール管理クラス
@@ -188,10 +309,9 @@ class SupabaseConnectionPool:
             logger.error(f"接続返却エラー: {str(e)}")
     
     def _create_sync_client(self) -> object:
-        """同期Supabaseクライアント作成"""
+        """同期Supabaseクライアント作成（共有クライアントを使用）"""
         try:
-            from supabase import create_client
-            return create_client(self.supabase_url, self.supabase_key)
+            return get_shared_client(self.supabase_url, self.supabase_key)
         except ImportError:
             return None
     
@@ -235,7 +355,7 @@ def validate_embedding_vector(embedding: List[float]) -> None:
     if hasattr(embedding, '__class__'):
         logger.info(f"埋め込みベクトルクラス: {embedding.__class__.__module__}.{embedding.__class__.__name__}")
     
-    if not embedding:
+    if embedding is None or len(embedding) == 0:
         raise VectorStoreError("埋め込みベクトルが空です")
 
     # 型変換を試行
@@ -275,6 +395,72 @@ def validate_embedding_vector(embedding: List[float]) -> None:
             raise VectorStoreError(f"インデックス {i} の値が異常に大きいです: {value}")
 
 
+def to_json_vector(embedding: Any) -> Any:
+    """
+    埋め込みベクトルをJSON直列化可能な形式に変換
+
+    ndarrayで保持された埋め込みはSupabase送信直前にのみリストへ変換する
+
+    Args:
+        embedding: 埋め込みベクトル（リスト・ndarray・None）
+
+    Returns:
+        Any: リスト形式の埋め込みベクトル（Noneはそのまま）
+    """
+    if isinstance(embedding, np.ndarray):
+        return embedding.tolist()
+    return embedding
+
+
+def to_json_vectors(embeddings: List[Any]) -> List[Any]:
+    """
+    埋め込みベクトル群をJSON直列化可能な形式に一括変換
+
+    全要素が同一形状のndarrayの場合は行列にまとめて1回のtolist()で変換する
+
+    Args:
+        embeddings: 埋め込みベクトルのリスト（リスト・ndarray・None混在可）
+
+    Returns:
+        List[Any]: リスト形式の埋め込みベクトルのリスト
+    """
+    if embeddings and all(isinstance(e, np.ndarray) for e in embeddings):
+        first_shape = embeddings[0].shape
+        if len(first_shape) == 1 and all(e.shape == first_shape for e in embeddings):
+            return np.stack(embeddings).tolist()
+    return [to_json_vector(e) for e in embeddings]
+
+
+def encode_pgvector(embedding: Any) -> bytes:
+    """
+    埋め込みベクトルをpgvectorのバイナリ形式に変換
+
+    形式: 次元数(int16) + 予約領域(int16) + float4配列（いずれもビッグエンディアン）
+
+    Args:
+        embedding: 埋め込みベクトル（リストまたはndarray）
+
+    Returns:
+        bytes: pgvectorバイナリ表現
+    """
+    vector = np.asarray(embedding, dtype=">f4")
+    return struct.pack(">HH", vector.shape[0], 0) + vector.tobytes()
+
+
+def decode_pgvector(data: bytes) -> np.ndarray:
+    """
+    pgvectorのバイナリ形式を埋め込みベクトルに変換
+
+    Args:
+        data: pgvectorバイナリ表現
+
+    Returns:
+        np.ndarray: 埋め込みベクトル（float32）
+    """
+    dimension, _ = struct.unpack_from(">HH", data)
+    return np.frombuffer(data, dtype=">f4", count=dimension, offset=4).astype(np.float32)
+
+
 def validate_search_parameters(k: int, similarity_threshold: float) -> None:
     """
     検索パラメータの入力検証
@@ -303,6 +489,28 @@ def validate_search_parameters(k: int, similarity_threshold: float) -> None:
         )
 
 
+def validate_filename(filename: Any) -> None:
+    """
+    ファイル名の入力検証
+
+    Args:
+        filename: 検証対象のファイル名
+
+    Raises:
+        VectorStoreError: 無効なファイル名の場合
+    """
+    if not isinstance(filename, str):
+        raise VectorStoreError("filenameは文字列である必要があります")
+
+    if len(filename.strip()) == 0:
+        raise VectorStoreError("filenameは空でない文字列である必要があります")
+
+    if len(filename) > MAX_FILENAME_LENGTH:
+        raise VectorStoreError(
+            f"ファイル名が長すぎます: {len(filename)} 文字 (最大{MAX_FILENAME_LENGTH}文字)"
+        )
+
+
 def validate_chunk_data(chunk: Dict[str, Any]) -> None:
     """
     チャンクデータの入力検証
@@ -330,17 +538,7 @@ def validate_chunk_data(chunk: Dict[str, Any]) -> None:
             f"contentが長すぎます: {len(content)} 文字 (最大{MAX_CONTENT_LENGTH}文字)"
         )
 
-    filename = chunk.get("filename", "")
-    if not isinstance(filename, str):
-        raise VectorStoreError("filenameは文字列である必要があります")
-
-    if len(filename.strip()) == 0:
-        raise VectorStoreError("filenameは空でない文字列である必要があります")
-
-    if len(filename) > MAX_FILENAME_LENGTH:
-        raise VectorStoreError(
-            f"ファイル名が長すぎます: {len(filename)} 文字 (最大{MAX_FILENAME_LENGTH}文字)"
-        )
+    validate_filename(chunk.get("filename", ""))
 
     # オプショナルフィールドの検証
     page_number = chunk.get("page_number")
@@ -373,6 +571,92 @@ def validate_chunk_data(chunk: Dict[str, Any]) -> None:
         validate_embedding_vector(embedding)
 
 
+def validate_embedding_matrix(embeddings: Any, expected_rows: int) -> np.ndarray:
+    """
+    埋め込み行列の一括入力検証
+
+    validate_embedding_vectorと同じ条件（次元数・NaN・無限大・異常値）を
+    行列全体に配列演算で適用する。
+
+    Args:
+        embeddings: 埋め込み行列（N × 1536）
+        expected_rows: 期待する行数
+
+    Returns:
+        np.ndarray: float32の埋め込み行列
+
+    Raises:
+        VectorStoreError: 無効な埋め込み行列の場合
+    """
+    try:
+        matrix = np.asarray(embeddings, dtype=np.float32)
+    except (TypeError, ValueError) as e:
+        raise VectorStoreError(f"埋め込み行列を数値配列に変換できません: {str(e)}") from e
+
+    if matrix.shape != (expected_rows, EMBEDDING_DIMENSION):
+        raise VectorStoreError(
+            f"埋め込み行列は({expected_rows}, {EMBEDDING_DIMENSION})の形状である必要があります。"
+            f"現在: {matrix.shape}"
+        )
+
+    invalid_rows = np.flatnonzero(
+        ~np.isfinite(matrix).all(axis=1) | (np.abs(matrix) > MAX_EMBEDDING_VALUE).any(axis=1)
+    )
+    if invalid_rows.size:
+        raise VectorStoreError(
+            f"埋め込みにNaN・無限大・異常に大きな値が含まれています: インデックス {invalid_rows.tolist()}"
+        )
+
+    return matrix
+
+
+def precheck_bulk_inputs(
+    document_chunks: List[Dict[str, Any]], embedding_vectors: List[Any]
+) -> None:
+    """
+    バルク挿入入力の一括事前検証
+
+    空コンテンツと次元数不一致の埋め込みを配列演算でまとめて検出し、
+    該当する全インデックスを1つのエラーで報告する。
+    型不正など詳細な検証は行ごとの検証に委ねる。
+
+    Args:
+        document_chunks: チャンクデータリスト
+        embedding_vectors: 埋め込みベクトルリスト（None・空は検証対象外）
+
+    Raises:
+        VectorStoreError: 無効な行が含まれる場合
+    """
+    count = len(document_chunks)
+
+    # 文字列以外（-1）は行ごとの検証で型エラーとして報告する
+    content_lengths = np.fromiter(
+        (
+            len(chunk["content"].strip()) if isinstance(chunk.get("content"), str) else -1
+            for chunk in document_chunks
+        ),
+        dtype=np.int64,
+        count=count
+    )
+    empty_indices = np.flatnonzero(content_lengths == 0)
+    if empty_indices.size:
+        raise VectorStoreError(
+            f"contentは空でない文字列である必要があります: インデックス {empty_indices.tolist()}"
+        )
+
+    dimensions = np.fromiter(
+        (len(vector) if vector is not None else 0 for vector in embedding_vectors),
+        dtype=np.int64,
+        count=len(embedding_vectors)
+    )
+    invalid_indices = np.flatnonzero((dimensions != 0) & (dimensions != EMBEDDING_DIMENSION))
+    if invalid_indices.size:
+        raise VectorStoreError(
+            f"埋め込みベクトルは{EMBEDDING_DIMENSION}次元である必要があります: "
+            f"インデックス {invalid_indices.tolist()}"
+        )
+
+
 @dataclass
 class SearchResult:
     """検索結果データクラス"""
@@ -384,6 +668,105 @@ class SearchResult:
     metadata: Dict[str, Any]
 
 
+def _is_connection_error(error: Exception, asyncpg_module: Any) -> bool:
+    """
+    COPY用の直接接続で発生した接続エラーか判定
+
+    接続エラーのみREST挿入へのフォールバック対象とする
+
+    Args:
+        error: 発生した例外
+        asyncpg_module: asyncpgモジュール
+
+    Returns:
+        bool: 接続エラーの場合True
+    """
+    # ConnectionRefusedError・TimeoutError等
+    if isinstance(error, OSError):
+        return True
+    connection_errors = tuple(
+        error_class
+        for error_class in (
+            getattr(asyncpg_module, "PostgresConnectionError", None),
+            getattr(asyncpg_module, "InterfaceError", None),
+        )
+        if isinstance(error_class, type)
+    )
+    return isinstance(error, connection_errors)
+
+
+def _to_search_result(row: Dict[str, Any], similarity_score: float) -> SearchResult:
+    """
+    検索RPCの結果行をSearchResultに変換
+
+    Args:
+        row: RPC結果行
+        similarity_score: 類似度スコア
+
+    Returns:
+        SearchResult: 検索結果
+    """
+    return SearchResult(
+        content=row.get("content", ""),
+        filename=row.get("filename", ""),
+        page_number=row.get("page_number", 0),
+        similarity_score=similarity_score,
+        metadata={
+            "section_name": row.get("section_name"),
+            "chapter_number": row.get("chapter_number"),
+            "start_pos": row.get("start_pos"),
+            "end_pos": row.get("end_pos"),
+            "token_count": row.get("token_count", 0),
+        },
+    )
+
+
+def reciprocal_rank_fusion(
+    result_lists: List[List[SearchResult]], limit: int, k: int = RRF_K
+) -> List[SearchResult]:
+    """
+    複数の検索結果をReciprocal Rank Fusionで統合
+
+    各結果のスコアは Σ 1 / (k + 順位) とし、同一チャンク（ファイル名・ページ・内容）は統合する。
+    similarity_scoreは各検索での最大値を保持し、RRFスコアはmetadata["rrf_score"]に格納する。
+
+    Args:
+        result_lists: 検索結果リストのリスト（各リストはスコア降順）
+        limit: 返す結果数
+        k: 順位平滑化定数
+
+    Returns:
+        List[SearchResult]: RRFスコア降順の統合結果
+    """
+    fused: Dict[tuple, SearchResult] = {}
+    scores: Dict[tuple, float] = {}
+
+    for results in result_lists:
+        for rank, result in enumerate(results, start=1):
+            key = (result.filename, result.page_number, result.content)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+
+            existing = fused.get(key)
+            if existing is None:
+                fused[key] = SearchResult(
+                    content=result.content,
+                    filename=result.filename,
+                    page_number=result.page_number,
+                    similarity_score=result.similarity_score,
+                    metadata=dict(result.metadata),
+                )
+            elif result.similarity_score > existing.similarity_score:
+                existing.similarity_score = result.similarity_score
+
+    ranked_keys = sorted(scores, key=scores.get, reverse=True)[:limit]
+    fused_results = []
+    for key in ranked_keys:
+        result = fused[key]
+        result.metadata["rrf_score"] = scores[key]
+        fused_results.append(result)
+    return fused_results
+
+
 @dataclass
 class DocumentRecord:
     """文書レコード"""
@@ -405,7 +788,8 @@ class VectorStore:
         supabase_url: str, 
         supabase_key: str, 
         pool_size: int = DEFAULT_POOL_SIZE,
-        enable_async: bool = True
+        enable_async: bool = True,
+        database_url: Optional[str] = None
     ) -> None:
         """
         初期化
@@ -415,11 +799,14 @@ class VectorStore:
             supabase_key: Supabase APIキー
             pool_size: 接続プールサイズ
             enable_async: 非同期モード有効化
+            database_url: PostgreSQL接続URL（セッションモードpooler、ポート5432）。
+                未指定時は環境変数SUPABASE_DB_URLを使用し、設定時はバルク挿入にCOPYを使用
         """
         self.supabase_url = supabase_url
         self.supabase_key = supabase_key
         self.pool_size = min(pool_size, MAX_POOL_SIZE)
         self.enable_async = enable_async
+        self.database_url = database_url or os.getenv("SUPABASE_DB_URL")
         
         # 接続プール管理（新しい実装）
         self._connection_pool = SupabaseConnectionPool(
@@ -439,9 +826,7 @@ class VectorStore:
 
         # 後方互換性のためのフォールバッククライアント
         try:
-            from supabase import create_client
-
-            self.client = create_client(supabase_url, supabase_key)
+            self.client = get_shared_client(supabase_url, supabase_key)
             
             # 非同期クライアントの初期化も試行
             if enable_async:
@@ -526,7 +911,6 @@ class VectorStore:
             logger.error(f"文書保存エラー: {str(e)}", exc_info=True)
             raise VectorStoreError(f"文書保存中にエラーが発生しました: {str(e)}") from e
 
-    @sync_retry(max_attempts=RETRY_ATTEMPTS)
     def store_chunks(self, chunks: List[Dict[str, Any]], document_id: str) -> List[str]:
         """
         チャンクをデータベースに保存
@@ -553,35 +937,9 @@ class VectorStore:
             if not isinstance(document_id, str) or not document_id.strip():
                 raise VectorStoreError("document_idが無効です")
 
-            # 各チャンクの入力検証
-            for i, chunk in enumerate(chunks):
-                try:
-                    validate_chunk_data(chunk)
-                except VectorStoreError as e:
-                    raise VectorStoreError(
-                        f"チャンク {i} の検証エラー: {str(e)}"
-                    ) from e
-
             # document_chunksテーブルに一括挿入
-            chunk_records = []
-            for chunk in chunks:
-                chunk_record = {
-                    "id": str(uuid.uuid4()),
-                    "document_id": document_id,
-                    "content": chunk.get("content", ""),
-                    "filename": chunk.get("filename", ""),
-                    "page_number": chunk.get("page_number"),
-                    "chapter_number": chunk.get("chapter_number"),
-                    "section_name": chunk.get("section_name"),
-                    "start_pos": chunk.get("start_pos"),
-                    "end_pos": chunk.get("end_pos"),
-                    "embedding": chunk.get("embedding"),
-                    "token_count": chunk.get("token_count", 0),
-                }
-                chunk_records.append(chunk_record)
-
-            # バッチ挿入実行
-            result = self.client.table("document_chunks").insert(chunk_records).execute()
+            chunk_records = self._build_chunk_records(chunks, document_id)
+            self._write_chunk_records(chunk_records)
 
             # 保存されたチャンクIDを収集
             chunk_ids = [record["id"] for record in chunk_records]
@@ -595,6 +953,274 @@ class VectorStore:
                 f"チャンク保存中にエラーが発生しました: {str(e)}"
             ) from e
 
+    @staticmethod
+    def _build_chunk_records(
+        chunks: List[Dict[str, Any]], document_id: str
+    ) -> List[Dict[str, Any]]:
+        """
+        チャンクデータを検証し、document_chunksテーブルのレコードへ変換
+
+        Args:
+            chunks: チャンクリスト
+            document_id: 文書ID
+
+        Returns:
+            List[Dict[str, Any]]: チャンクIDを採番したレコードリスト
+
+        Raises:
+            VectorStoreError: チャンクデータが無効な場合
+        """
+        for i, chunk in enumerate(chunks):
+            try:
+                validate_chunk_data(chunk)
+            except VectorStoreError as e:
+                raise VectorStoreError(
+                    f"チャンク {i} の検証エラー: {str(e)}"
+                ) from e
+
+        embeddings = to_json_vectors([chunk.get("embedding") for chunk in chunks])
+        return [
+            {
+                "id": str(uuid.uuid4()),
+                "document_id": document_id,
+                "content": chunk.get("content", ""),
+                "filename": chunk.get("filename", ""),
+                "page_number": chunk.get("page_number"),
+                "chapter_number": chunk.get("chapter_number"),
+                "section_name": chunk.get("section_name"),
+                "start_pos": chunk.get("start_pos"),
+                "end_pos": chunk.get("end_pos"),
+                "embedding": embedding,
+                "token_count": chunk.get("token_count", 0),
+            }
+            for chunk, embedding in zip(chunks, embeddings)
+        ]
+
+    def store_document_with_chunks(
+        self,
+        document_data: Dict[str, Any],
+        chunks: List[Dict[str, Any]],
+        document_id: Optional[str] = None,
+    ) -> Tuple[str, List[str]]:
+        """
+        文書とチャンクを1回のRPCでまとめて保存
+
+        insert_document_with_chunks関数が1トランザクションで両テーブルへ挿入し、
+        同じトランザクション内で文書をcompletedにするため、チャンク保存に失敗しても
+        親文書だけが残ることはない。IDは再試行の外で1回だけ採番し、RPCはid競合時に
+        挿入しないため、再試行しても重複レコードは作られない
+
+        Args:
+            document_data: 文書データ
+            chunks: チャンクリスト
+            document_id: 指定する文書ID（オプション）
+
+        Returns:
+            Tuple[str, List[str]]: (文書ID, 保存されたチャンクIDリスト)
+
+        Raises:
+            VectorStoreError: 入力エラー・データベースエラーの場合
+        """
+        logger.info(
+            f"文書・チャンク一括保存開始: {document_data.get('filename', 'unknown')}, {len(chunks)}個"
+        )
+
+        try:
+            if not self.client:
+                raise VectorStoreError("Supabaseクライアントが初期化されていません")
+
+            if not chunks:
+                raise VectorStoreError("チャンクリストが空です")
+
+            if document_id is None:
+                document_id = str(uuid.uuid4())
+
+            chunk_records = self._build_chunk_records(chunks, document_id)
+            document_record = {
+                "id": document_id,
+                "filename": document_data.get("filename"),
+                "original_filename": document_data.get(
+                    "original_filename", document_data.get("filename")
+                ),
+                "file_size": document_data.get("file_size", 0),
+                "total_pages": document_data.get("total_pages", 0),
+                "processing_status": "processing",
+            }
+
+            self._insert_document_with_chunks(document_record, chunk_records)
+
+            chunk_ids = [record["id"] for record in chunk_records]
+            logger.info(f"文書・チャンク一括保存完了: {document_id}, {len(chunk_ids)}個")
+            return document_id, chunk_ids
+
+        except Exception as e:
+            logger.error(f"文書・チャンク一括保存エラー: {str(e)}", exc_info=True)
+            raise VectorStoreError(
+                f"文書・チャンク一括保存中にエラーが発生しました: {str(e)}"
+            ) from e
+
+    @sync_retry(max_attempts=RETRY_ATTEMPTS)
+    def _insert_document_with_chunks(
+        self, document_record: Dict[str, Any], chunk_records: List[Dict[str, Any]]
+    ) -> None:
+        """
+        採番済みの文書・チャンクレコードをinsert_document_with_chunks RPCで保存
+
+        Args:
+            document_record: 文書レコード
+            chunk_records: チャンクレコードリスト
+        """
+        self.client.rpc(
+            "insert_document_with_chunks",
+            {"document": document_record, "chunks": chunk_records},
+        ).execute()
+
+    def store_chunks_columnar(
+        self,
+        document_id: str,
+        filename: str,
+        contents: List[str],
+        embeddings: np.ndarray,
+        page_numbers: Optional[Sequence[int]] = None,
+        token_counts: Optional[Sequence[int]] = None,
+    ) -> List[str]:
+        """
+        列形式のチャンクをデータベースに保存
+
+        チャンクごとの辞書を受け取らず、埋め込みを (N, 1536) 行列のまま検証・変換する。
+        同一ファイルのチャンクをまとめて保存する用途向け。
+
+        Args:
+            document_id: 文書ID
+            filename: ファイル名
+            contents: チャンク本文リスト
+            embeddings: 埋め込み行列（N × 1536）
+            page_numbers: チャンクごとのページ番号（省略可）
+            token_counts: チャンクごとのトークン数（省略可）
+
+        Returns:
+            List[str]: 保存されたチャンクIDリスト（入力順）
+
+        Raises:
+            VectorStoreError: 入力が無効な場合、またはデータベースエラーの場合
+        """
+        logger.info(f"列形式チャンク保存開始: {len(contents)}個")
+
+        try:
+            if not self.client:
+                raise VectorStoreError("Supabaseクライアントが初期化されていません")
+
+            if not isinstance(document_id, str) or not document_id.strip():
+                raise VectorStoreError("document_idが無効です")
+
+            count = len(contents)
+            if count == 0:
+                raise VectorStoreError("チャンクリストが空です")
+
+            validate_filename(filename)
+            matrix = validate_embedding_matrix(embeddings, count)
+
+            non_str, empty, too_long = [], [], []
+            for i, content in enumerate(contents):
+                if not isinstance(content, str):
+                    non_str.append(i)
+                elif not content.strip():
+                    empty.append(i)
+                elif len(content) > MAX_CONTENT_LENGTH:
+                    too_long.append(i)
+            if non_str:
+                raise VectorStoreError(f"contentは文字列である必要があります: インデックス {non_str}")
+            if empty:
+                raise VectorStoreError(f"contentは空でない文字列である必要があります: インデックス {empty}")
+            if too_long:
+                raise VectorStoreError(
+                    f"contentが長すぎます (最大{MAX_CONTENT_LENGTH}文字): インデックス {too_long}"
+                )
+
+            for name, values in (("page_numbers", page_numbers), ("token_counts", token_counts)):
+                if values is None:
+                    continue
+                if len(values) != count:
+                    raise VectorStoreError(
+                        f"{name}の件数がチャンク数と一致しません: {len(values)} != {count}"
+                    )
+                invalid = [
+                    i for i, value in enumerate(values)
+                    if not isinstance(value, (int, np.integer)) or value <= 0
+                ]
+                if invalid:
+                    raise VectorStoreError(
+                        f"{name}は正の整数である必要があります: インデックス {invalid}"
+                    )
+
+            # 行列から一括でリストへ変換（行ごとの変換・検証を行わない）
+            embedding_lists = matrix.tolist()
+            pages = [int(page) for page in page_numbers] if page_numbers is not None else [None] * count
+            tokens = [int(token) for token in token_counts] if token_counts is not None else [0] * count
+
+            chunk_records = [
+                {
+                    "id": str(uuid.uuid4()),
+                    "document_id": document_id,
+                    "content": content,
+                    "filename": filename,
+                    "page_number": page_number,
+                    "chapter_number": None,
+                    "section_name": None,
+                    "start_pos": None,
+                    "end_pos": None,
+                    "embedding": embedding,
+                    "token_count": token_count,
+                }
+                for content, embedding, page_number, token_count in zip(
+                    contents, embedding_lists, pages, tokens
+                )
+            ]
+
+            self._write_chunk_records(chunk_records)
+
+            logger.info(f"列形式チャンク保存完了: {count}個")
+            return [record["id"] for record in chunk_records]
+
+        except Exception as e:
+            logger.error(f"チャンク保存エラー: {str(e)}", exc_info=True)
+            raise VectorStoreError(
+                f"チャンク保存中にエラーが発生しました: {str(e)}"
+            ) from e
+
+    def _write_chunk_records(self, chunk_records: List[Dict[str, Any]]) -> None:
+        """
+        チャンクレコードをdocument_chunksテーブルへ一括挿入
+
+        直接接続が設定されていればCOPY、それ以外（またはCOPY失敗時）はREST一括挿入。
+        レコードIDは採番済みのため、REST挿入は失敗したバッチのみを再試行します
+
+        Args:
+            chunk_records: 挿入するレコードリスト
+        """
+        copied = False
+        if self.database_url and len(chunk_records) >= COPY_MIN_RECORDS:
+            copied = self._copy_chunk_records_sync(chunk_records)
+
+        if not copied:
+            for start in range(0, len(chunk_records), STORE_CHUNKS_BATCH_ROWS):
+                self._upsert_chunk_batch(chunk_records[start:start + STORE_CHUNKS_BATCH_ROWS])
+
+    @sync_retry(max_attempts=RETRY_ATTEMPTS)
+    def _upsert_chunk_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """
+        チャンクレコード1バッチをidで照合してupsert
+
+        応答が失われたバッチを再試行しても重複行が作られません。
+        挿入結果は使用しないためレスポンス本文を省略します（return=minimal）
+
+        Args:
+            batch: 挿入するレコードリスト
+        """
+        self.client.table("document_chunks").upsert(
+            batch, on_conflict="id", returning="minimal"
+        ).execute()
+
     @sync_retry(max_attempts=RETRY_ATTEMPTS)
     def similarity_search(
         self,
@@ -606,7 +1232,7 @@ class VectorStore:
         ベクトル類似検索
 
         Args:
-            query_embedding: クエリのベクトル表現
+            query_embedding: クエリのベクトル表現（リスト・ndarray）
             k: 返す結果数
             similarity_threshold: 類似度閾値
 
@@ -634,7 +1260,7 @@ class VectorStore:
             result = self.client.rpc(
                 "match_documents",
                 {
-                    "query_embedding": query_embedding,
+                    "query_embedding": to_json_vector(query_embedding),
                     "match_threshold": max_distance,
                     "match_count": k,
                 },
@@ -738,13 +1364,18 @@ class VectorStore:
             logger.error(f"文書削除エラー: {str(e)}", exc_info=True)
             raise VectorStoreError(f"文書削除中にエラーが発生しました: {str(e)}") from e
 
-    @async_retry(max_attempts=RETRY_ATTEMPTS)
     async def bulk_insert_embeddings(
         self, embeddings: List[Any], document_chunks: List[Dict[str, Any]]
     ) -> bool:
         """
         バルク埋め込み保存 - Issue #57 要件実装（接続プール対応）
 
+        全行を検証してから書き込みを始め、文書は処理中として作成し、全チャンクの保存後に
+        completedへ更新します。チャンク保存に失敗した場合は残りのバッチを取り消し、
+        文書をfailedとするため、一部のチャンクしかない文書が検索対象になることはありません。
+        文書ID・チャンクIDは最初に1回だけ採番し、再試行は失敗した書き込み単位で
+        idに基づくupsertとして行うため、重複レコードを作りません。
+
         Args:
             embeddings: EmbeddingResultリスト
             document_chunks: DocumentChunkリスト
@@ -779,41 +1410,30 @@ class VectorStore:
                     f"埋め込み数({len(embeddings)})とチャンク数({len(document_chunks)})が一致しません"
                 )
 
-            # 先に文書レコードを作成
-            document_id = str(uuid.uuid4())
-            
-            # documentsテーブルに親レコードを作成
-            if hasattr(client, 'table'):
-                result = client.table("documents").insert({
-                    "id": document_id,
-                    "filename": document_chunks[0].get("filename", "bulk_upload.pdf"),
-                    "original_filename": document_chunks[0].get("filename", "bulk_upload.pdf"),
-                    "file_size": sum(chunk.get("token_count", 0) for chunk in document_chunks) * 4,  # 概算
-                    "total_pages": max((chunk.get("page_number", 1) for chunk in document_chunks), default=1),
-                    "processing_status": "completed",
-                })
-                
-                # 非同期実行対応
-                if hasattr(result, 'execute'):
-                    if asyncio.iscoroutinefunction(result.execute):
-                        await result.execute()
-                    else:
-                        result.execute()
-
-            # バルクレコード準備
-            bulk_records = []
-            for _i, (embedding_result, chunk) in enumerate(
-                zip(embeddings, document_chunks)
-            ):
-                # チャンクデータ検証
-                validate_chunk_data(chunk)
+            # 空コンテンツ・次元数不一致を一括検出（親レコード作成前に失敗させる）
+            embedding_vectors = [
+                getattr(embedding_result, "embedding", None) for embedding_result in embeddings
+            ]
+            precheck_bulk_inputs(document_chunks, embedding_vectors)
 
-                # 埋め込みベクトル検証
-                embedding_vector = getattr(embedding_result, "embedding", None)
-                if embedding_vector:
+            # 全行の検証（チャンク・埋め込みベクトル）も親レコード作成前に済ませる
+            record_count = len(embeddings)
+            for i in range(record_count):
+                validate_chunk_data(document_chunks[i])
+
+                embedding_vector = embedding_vectors[i]
+                if embedding_vector is not None and len(embedding_vector) > 0:
                     validate_embedding_vector(embedding_vector)
 
-                chunk_record = {
+            # 埋め込みはまとめてリストへ変換（行ごとのtolist()を回避）
+            json_vectors = to_json_vectors(embedding_vectors)
+
+            # バルクレコード準備（事前確保したバッファへ直接格納）
+            document_id = str(uuid.uuid4())
+            bulk_records: List[Dict[str, Any]] = [None] * record_count
+            for i in range(record_count):
+                chunk = document_chunks[i]
+                bulk_records[i] = {
                     "id": str(uuid.uuid4()),
                     "document_id": document_id,
                     "content": chunk.get("content", ""),
@@ -823,20 +1443,38 @@ class VectorStore:
                     "section_name": chunk.get("section_name"),
                     "start_pos": chunk.get("start_pos"),
                     "end_pos": chunk.get("end_pos"),
-                    "embedding": embedding_vector,
+                    "embedding": json_vectors[i],
                     "token_count": chunk.get("token_count", 0),
                 }
-                bulk_records.append(chunk_record)
 
-            # Supabaseへバルクインサート実行
-            bulk_result = client.table("document_chunks").insert(bulk_records)
-            
-            # 非同期実行対応
-            if hasattr(bulk_result, 'execute'):
-                if asyncio.iscoroutinefunction(bulk_result.execute):
-                    await bulk_result.execute()
-                else:
-                    bulk_result.execute()
+            # documentsテーブルに親レコードを処理中として作成（検索対象外）
+            has_document = hasattr(client, 'table')
+            if has_document:
+                await self._upsert_records(client, "documents", {
+                    "id": document_id,
+                    "filename": document_chunks[0].get("filename", "bulk_upload.pdf"),
+                    "original_filename": document_chunks[0].get("filename", "bulk_upload.pdf"),
+                    "file_size": sum(chunk.get("token_count", 0) for chunk in document_chunks) * 4,  # 概算
+                    "total_pages": max((chunk.get("page_number", 1) for chunk in document_chunks), default=1),
+                    "processing_status": "processing",
+                })
+
+            try:
+                # 大量レコードはCOPYで直接挿入（小バッチ・COPY不可時はREST挿入）
+                copied = False
+                if self.database_url and record_count >= COPY_MIN_RECORDS:
+                    copied = await self._copy_chunk_records(bulk_records)
+
+                if not copied:
+                    await self._insert_chunk_batches(client, bulk_records)
+            except Exception:
+                if has_document:
+                    await self._mark_document_failed(client, document_id)
+                raise
+
+            # 全チャンクの保存後に検索対象とする
+            if has_document:
+                await self._set_document_status(client, document_id, "completed")
 
             logger.info(f"バルク埋め込み保存完了: {len(bulk_records)}件")
             return True
@@ -850,6 +1488,186 @@ class VectorStore:
             # 接続を必ずプールに戻す
             await self._connection_pool.release_connection(connection_index)
 
+    async def _insert_chunk_batches(self, client: Any, records: List[Dict[str, Any]]) -> None:
+        """
+        チャンクレコードをBULK_INSERT_CHUNK_SIZE件ずつ並行してREST挿入
+
+        1バッチでも失敗した場合は未完了のバッチを取り消し、最初のエラーを送出します。
+
+        Args:
+            client: Supabaseクライアント
+            records: 挿入するレコードリスト
+        """
+        semaphore = asyncio.Semaphore(BULK_INSERT_MAX_CONCURRENCY)
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                for start in range(0, len(records), BULK_INSERT_CHUNK_SIZE):
+                    task_group.create_task(self._insert_chunk_records(
+                        client, records[start:start + BULK_INSERT_CHUNK_SIZE], semaphore
+                    ))
+        except ExceptionGroup as group:
+            raise group.exceptions[0]
+
+    @async_retry(max_attempts=RETRY_ATTEMPTS)
+    async def _set_document_status(self, client: Any, document_id: str, status: str) -> None:
+        """
+        文書の処理状態を更新（非同期・冪等のため再試行可能）
+
+        Args:
+            client: Supabaseクライアント
+            document_id: 文書ID
+            status: 新しい状態
+        """
+        update_result = client.table("documents").update(
+            {"processing_status": status}
+        ).eq("id", document_id)
+
+        if hasattr(update_result, 'execute'):
+            if asyncio.iscoroutinefunction(update_result.execute):
+                await update_result.execute()
+            else:
+                await asyncio.to_thread(update_result.execute)
+
+    async def _mark_document_failed(self, client: Any, document_id: str) -> None:
+        """
+        チャンク保存に失敗した文書をfailedに更新
+
+        元のエラーを優先するため、更新自体の失敗はログのみとします。
+
+        Args:
+            client: Supabaseクライアント
+            document_id: 文書ID
+        """
+        try:
+            await self._set_document_status(client, document_id, "failed")
+        except Exception as e:
+            logger.error(f"文書状態のfailed更新に失敗しました: {document_id}: {str(e)}")
+
+    async def _insert_chunk_records(
+        self, client: Any, records: List[Dict[str, Any]], semaphore: asyncio.Semaphore
+    ) -> None:
+        """
+        チャンクレコードの部分挿入（バルク挿入の1バッチ分）
+
+        Args:
+            client: Supabaseクライアント
+            records: 挿入するレコードリスト
+            semaphore: 同時実行数制御用セマフォ
+        """
+        async with semaphore:
+            await self._upsert_records(client, "document_chunks", records)
+
+            logger.debug(f"バルク挿入バッチ完了: {len(records)}件")
+
+    @async_retry(max_attempts=RETRY_ATTEMPTS)
+    async def _upsert_records(
+        self, client: Any, table: str, records: Union[Dict[str, Any], List[Dict[str, Any]]]
+    ) -> None:
+        """
+        採番済みレコードをidで照合してupsert
+
+        応答が失われた書き込みを再試行しても重複行が作られません。
+
+        Args:
+            client: Supabaseクライアント
+            table: テーブル名
+            records: 挿入するレコード（単一またはリスト）
+        """
+        upsert_result = client.table(table).upsert(records, on_conflict="id")
+
+        # 非同期実行対応（同期クライアントはスレッドで実行して並行化）
+        if hasattr(upsert_result, 'execute'):
+            if asyncio.iscoroutinefunction(upsert_result.execute):
+                await upsert_result.execute()
+            else:
+                await asyncio.to_thread(upsert_result.execute)
+
+    def _copy_chunk_records_sync(self, records: List[Dict[str, Any]]) -> bool:
+        """
+        同期処理からCOPY一括挿入を実行
+
+        実行中のイベントループがある場合は入れ子で実行できないため、
+        専用スレッドの新しいイベントループで実行します。
+
+        Args:
+            records: 挿入するレコードリスト
+
+        Returns:
+            bool: COPY成功フラグ
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._copy_chunk_records(records))
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self._copy_chunk_records(records)).result()
+
+    async def _copy_chunk_records(self, records: List[Dict[str, Any]]) -> bool:
+        """
+        チャンクレコードをPostgreSQLのバイナリCOPYで一括挿入
+
+        PostgRESTのJSONペイロードを経由しないため、幅の広いベクトル行で高速。
+        COPYは単一トランザクションのため、失敗時は部分挿入されません。
+
+        Args:
+            records: 挿入するレコードリスト
+
+        Returns:
+            bool: COPY成功フラグ（asyncpg未導入・接続失敗時はFalse）
+
+        Raises:
+            Exception: 接続以外のエラー（データ不正等）はRESTで再送せずそのまま送出
+        """
+        try:
+            import asyncpg
+        except ImportError:
+            logger.warning("asyncpgが利用できないためREST挿入にフォールバックします")
+            return False
+
+        rows = [
+            (
+                record["id"],
+                record["document_id"],
+                record["content"],
+                record["filename"],
+                record["page_number"],
+                record["chapter_number"],
+                record["section_name"],
+                json.dumps(record["start_pos"]) if record["start_pos"] is not None else None,
+                json.dumps(record["end_pos"]) if record["end_pos"] is not None else None,
+                record["embedding"],
+                record["token_count"],
+            )
+            for record in records
+        ]
+
+        try:
+            conn = await asyncpg.connect(self.database_url, timeout=CONNECTION_TIMEOUT)
+            try:
+                await conn.set_type_codec(
+                    "vector",
+                    schema="public",
+                    encoder=encode_pgvector,
+                    decoder=decode_pgvector,
+                    format="binary",
+                )
+                await conn.copy_records_to_table(
+                    "document_chunks",
+                    records=rows,
+                    columns=list(DOCUMENT_CHUNK_COPY_COLUMNS),
+                )
+            finally:
+                await conn.close()
+        except Exception as e:
+            if not _is_connection_error(e, asyncpg):
+                raise
+            logger.warning(f"COPY接続エラーのためREST挿入にフォールバックします: {str(e)}")
+            return False
+
+        logger.info(f"COPYバルク挿入完了: {len(rows)}件")
+        return True
+
     @async_retry(max_attempts=RETRY_ATTEMPTS)
     async def search_similar_embeddings(
         self, query_embedding: List[float], limit: int = 10, similarity_threshold: float = 0.0
@@ -902,40 +1720,26 @@ class VectorStore:
             rpc_result = client.rpc(
                 "match_documents",
                 {
-                    "query_embedding": query_embedding,
+                    "query_embedding": to_json_vector(query_embedding),
                     "match_threshold": max_distance,
                     "match_count": limit,
                 },
             )
 
-            # 非同期実行対応
+            # 非同期実行対応（同期クライアントはスレッドで実行し、並行検索を妨げない）
             if hasattr(rpc_result, 'execute'):
                 if asyncio.iscoroutinefunction(rpc_result.execute):
                     result = await rpc_result.execute()
                 else:
-                    result = rpc_result.execute()
+                    result = await asyncio.to_thread(rpc_result.execute)
             else:
                 result = rpc_result
 
-            # 結果をSearchResultオブジェクトに変換
-            search_results = []
-            if result.data:
-                for row in result.data:
-                    search_result = SearchResult(
-                        content=row.get("content", ""),
-                        filename=row.get("filename", ""),
-                        page_number=row.get("page_number", 0),
-                        similarity_score=1.0
-                        - row.get("distance", 1.0),  # 距離を類似度に変換
-                        metadata={
-                            "section_name": row.get("section_name"),
-                            "chapter_number": row.get("chapter_number"),
-                            "start_pos": row.get("start_pos"),
-                            "end_pos": row.get("end_pos"),
-                            "token_count": row.get("token_count", 0),
-                        },
-                    )
-                    search_results.append(search_result)
+            # 結果をSearchResultオブジェクトに変換（距離を類似度に変換）
+            search_results = [
+                _to_search_result(row, 1.0 - row.get("distance", 1.0))
+                for row in (result.data or [])
+            ]
 
             # メトリクス更新
             end_time = time.time()
@@ -952,6 +1756,123 @@ class VectorStore:
             # 接続を必ずプールに戻す
             await self._connection_pool.release_connection(connection_index)
 
+    @async_retry(max_attempts=RETRY_ATTEMPTS)
+    async def search_keyword(self, query_text: str, limit: int = 10) -> List[SearchResult]:
+        """
+        キーワード検索（トライグラム類似度、非同期・接続プール対応）
+
+        Args:
+            query_text: 検索クエリテキスト
+            limit: 返す結果数
+
+        Returns:
+            List[SearchResult]: 検索結果リスト（similarity_scoreはキーワード一致度）
+
+        Raises:
+            VectorStoreError: 検索エラーの場合
+        """
+        logger.info(f"キーワード検索開始: limit={limit}")
+
+        # 接続プールから接続を取得
+        client, connection_index = await self._connection_pool.get_connection(async_mode=True)
+
+        try:
+            if not client:
+                client = await self._get_async_client() if self.enable_async else self.client
+
+            if not client:
+                raise VectorStoreError("Supabaseクライアントが初期化されていません")
+
+            # 入力検証
+            if not isinstance(query_text, str) or not query_text.strip():
+                raise VectorStoreError("query_textは空でない文字列である必要があります")
+
+            if not isinstance(limit, int) or limit <= 0:
+                raise VectorStoreError(f"limit は正の整数である必要があります: {limit}")
+
+            if limit > MAX_SEARCH_LIMIT:
+                raise VectorStoreError(
+                    f"limit は{MAX_SEARCH_LIMIT}以下である必要があります: {limit}"
+                )
+
+            rpc_result = client.rpc(
+                "match_documents_keyword",
+                {
+                    "query_text": query_text,
+                    "match_count": limit,
+                },
+            )
+
+            # 非同期実行対応（同期クライアントはスレッドで実行）
+            if hasattr(rpc_result, 'execute'):
+                if asyncio.iscoroutinefunction(rpc_result.execute):
+                    result = await rpc_result.execute()
+                else:
+                    result = await asyncio.to_thread(rpc_result.execute)
+            else:
+                result = rpc_result
+
+            search_results = [
+                _to_search_result(row, row.get("rank", 0.0))
+                for row in (result.data or [])
+            ]
+
+            logger.info(f"キーワード検索完了: {len(search_results)}件")
+            return search_results
+
+        except Exception as e:
+            logger.error(f"キーワード検索エラー: {str(e)}", exc_info=True)
+            raise VectorStoreError(f"キーワード検索中にエラーが発生しました: {str(e)}") from e
+        finally:
+            # 接続を必ずプールに戻す
+            await self._connection_pool.release_connection(connection_index)
+
+    async def hybrid_search(
+        self,
+        query_embedding: List[float],
+        query_text: str,
+        limit: int = 10,
+        similarity_threshold: float = 0.0
+    ) -> List[SearchResult]:
+        """
+        ハイブリッド検索（キーワード検索 + ベクトル検索をRRFで統合）
+
+        両検索はそれぞれ別の接続で並行実行する。
+
+        Args:
+            query_embedding: クエリ埋め込みベクトル
+            query_text: 検索クエリテキスト
+            limit: 返す結果数
+            similarity_threshold: ベクトル検索の類似度閾値
+
+        Returns:
+            List[SearchResult]: RRFスコア降順の検索結果
+
+        Raises:
+            VectorStoreError: 検索エラーの場合
+        """
+        if not isinstance(limit, int) or limit <= 0:
+            raise VectorStoreError(f"limit は正の整数である必要があります: {limit}")
+
+        # 統合後に上位limit件を選ぶため、各検索は多めに候補を取得
+        candidate_limit = min(limit * HYBRID_CANDIDATE_MULTIPLIER, MAX_SEARCH_LIMIT)
+
+        keyword_results, dense_results = await asyncio.gather(
+            self.search_keyword(query_text, limit=candidate_limit),
+            self.search_similar_embeddings(
+                query_embedding,
+                limit=candidate_limit,
+                similarity_threshold=similarity_threshold
+            ),
+        )
+
+        results = reciprocal_rank_fusion([keyword_results, dense_results], limit)
+        logger.info(
+            f"ハイブリッド検索完了: keyword={len(keyword_results)}件, "
+            f"dense={len(dense_results)}件 -> {len(results)}件"
+        )
+        return results
+
     def _update_search_metrics(self, response_time: float) -> None:
         """
         検索メトリクスを更新
@@ -118,7 +118,11 @@ def check_and_initialize_services() -> dict:
             if "embedding_service" not in st.session_state and services_status["openai_api"]:
                 try:
                     from services.embeddings import EmbeddingService
-                    st.session_state.embedding_service = EmbeddingService(api_key=openai_key)
+                    from services.embedding_cache import EmbeddingCache
+                    st.session_state.embedding_service = EmbeddingService(
+                        api_key=openai_key,
+                        cache=EmbeddingCache()
+                    )
                     services_status["embedding_service"] = True
                     logger.info("EmbeddingService初期化完了")
                 except Exception as e:
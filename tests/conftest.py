@@ -8,9 +8,13 @@ import pytest
 from unittest.mock import Mock, patch, MagicMock
 from typing import Generator, Dict, Any
 import tempfile
+import gc
+import mmap
 import os
 from pathlib import Path
 
+import numpy as np
+
 # テスト用環境変数設定
 @pytest.fixture(autouse=True)
 def setup_test_env():
@@ -55,6 +59,11 @@ def mock_claude_client():
 @pytest.fixture
 def mock_supabase_client():
     """Supabase クライアントモック（接続プール対応）"""
+    from services.vector_store import clear_shared_clients
+    
+    # 共有クライアントに前テストのモックが残らないよう破棄
+    clear_shared_clients()
+    
     with patch('supabase.create_client') as mock_create_client, \
          patch('supabase._async.client.create_client') as mock_create_async_client:
         
@@ -110,6 +119,8 @@ def mock_supabase_client():
         mock_create_async_client.return_value = mock_async_client
         
         yield mock_client
+    
+    clear_shared_clients()
 
 # 接続プールモック
 @pytest.fixture  
@@ -142,16 +153,21 @@ def mock_connection_pool(mock_supabase_client):
         yield mock_pool
 
 # spaCyモック
+@pytest.fixture(scope="session")
+def _session_spacy_nlp():
+    """spaCy NLPモック本体（セッションで1回だけ構築）"""
+    mock_nlp = Mock()
+    mock_doc = Mock()
+    mock_doc.sents = [Mock(text="テスト文1。"), Mock(text="テスト文2。")]
+    mock_nlp.return_value = mock_doc
+    return mock_nlp
+
 @pytest.fixture
-def mock_spacy():
-    """spaCy モック"""
-    with patch('spacy.load') as mock_load:
-        mock_nlp = Mock()
-        mock_doc = Mock()
-        mock_doc.sents = [Mock(text="テスト文1。"), Mock(text="テスト文2。")]
-        mock_nlp.return_value = mock_doc
-        mock_load.return_value = mock_nlp
-        yield mock_nlp
+def mock_spacy(_session_spacy_nlp):
+    """spaCy モック（パッチはテスト単位、呼び出し記録はテスト後にリセット）"""
+    with patch('spacy.load', return_value=_session_spacy_nlp):
+        yield _session_spacy_nlp
+    _session_spacy_nlp.reset_mock()
 
 @pytest.fixture
 def mock_spacy_nlp():
@@ -180,56 +196,62 @@ def mock_spacy_nlp():
     return mock_nlp
 
 # PyMuPDFモック
+@pytest.fixture(scope="session")
+def _session_fitz_document():
+    """PyMuPDF Documentモック本体（セッションで1回だけ構築）"""
+    mock_doc = Mock()
+    mock_page = Mock()
+    def mock_get_text(mode="text"):
+        if mode == "dict":
+            return {
+                "blocks": [
+                    {
+                        "lines": [
+                            {
+                                "spans": [
+                                    {
+                                        "text": "サンプルPDFテキスト",
+                                        "bbox": [100, 750, 500, 770],
+                                        "size": 12.0,
+                                        "font": "Arial"
+                                    }
+                                ]
+                            }
+                        ]
+                    }
+                ]
+            }
+        else:
+            return "サンプルPDFテキスト"
+    
+    mock_page.get_text = mock_get_text
+    mock_page.number = 0
+    mock_page.rect = Mock(width=595, height=842)
+    mock_page.get_text_blocks.return_value = [
+        (100, 750, 500, 770, "テストテキスト1", 0, 0),
+        (100, 700, 500, 720, "テストテキスト2", 0, 1)
+    ]
+    mock_doc.__len__ = Mock(return_value=1)
+    mock_doc.__getitem__ = Mock(return_value=mock_page)
+    mock_doc.page_count = 1
+    mock_doc.metadata = {
+        "title": "テスト文書",
+        "author": "テスト作成者",
+        "subject": "テスト用PDF"
+    }
+    
+    # close メソッドのモック
+    mock_doc.close = Mock()
+    return mock_doc
+
 @pytest.fixture
-def mock_fitz():
-    """PyMuPDF (fitz) モック"""
-    with patch('fitz.open') as mock_open:
-        mock_doc = Mock()
-        mock_page = Mock()
-        def mock_get_text(mode="text"):
-            if mode == "dict":
-                return {
-                    "blocks": [
-                        {
-                            "lines": [
-                                {
-                                    "spans": [
-                                        {
-                                            "text": "サンプルPDFテキスト",
-                                            "bbox": [100, 750, 500, 770],
-                                            "size": 12.0,
-                                            "font": "Arial"
-                                        }
-                                    ]
-                                }
-                            ]
-                        }
-                    ]
-                }
-            else:
-                return "サンプルPDFテキスト"
-        
-        mock_page.get_text = mock_get_text
-        mock_page.number = 0
-        mock_page.rect = Mock(width=595, height=842)
-        mock_page.get_text_blocks.return_value = [
-            (100, 750, 500, 770, "テストテキスト1", 0, 0),
-            (100, 700, 500, 720, "テストテキスト2", 0, 1)
-        ]
-        mock_doc.__len__ = Mock(return_value=1)
-        mock_doc.__getitem__ = Mock(return_value=mock_page)
-        mock_doc.page_count = 1
-        mock_doc.metadata = {
-            "title": "テスト文書",
-            "author": "テスト作成者",
-            "subject": "テスト用PDF"
-        }
-        mock_open.return_value = mock_doc
-        
-        # close メソッドのモック
-        mock_doc.close = Mock()
-        
-        yield mock_doc
+def mock_fitz(_session_fitz_document):
+    """PyMuPDF (fitz) モック（パッチはテスト単位、呼び出し記録はテスト後にリセット）"""
+    with patch('fitz.open', return_value=_session_fitz_document):
+        yield _session_fitz_document
+    _session_fitz_document.reset_mock()
+    _session_fitz_document.__getitem__.reset_mock()
+    _session_fitz_document.__len__.reset_mock()
 
 @pytest.fixture 
 def mock_fitz_document():
@@ -262,11 +284,30 @@ def mock_fitz_document():
     return mock_doc
 
 # テスト用PDFファイル
+# 最小限のPDFヘッダー（実際のPDF処理テストには適さないが、ファイル形式テストには使用可能）
+SAMPLE_PDF_BYTES = b"%PDF-1.4\n%Test PDF content\n%%EOF"
+
 @pytest.fixture
 def sample_pdf_bytes():
     """サンプルPDFバイトデータ"""
-    # 最小限のPDFヘッダー（実際のPDF処理テストには適さないが、ファイル形式テストには使用可能）
-    return b"%PDF-1.4\n%Test PDF content\n%%EOF"
+    return SAMPLE_PDF_BYTES
+
+@pytest.fixture(scope="session")
+def parsed_sample_pdf(_session_fitz_document, _session_spacy_nlp):
+    """
+    サンプルPDFの処理結果（セッションで1回だけ解析）
+
+    PDF処理そのものを検証しないテスト向け。共有オブジェクトのため変更しないこと
+    """
+    from services.pdf_processor import PDFProcessor
+
+    with patch('fitz.open', return_value=_session_fitz_document), \
+            patch('spacy.load', return_value=_session_spacy_nlp):
+        result = PDFProcessor().process_pdf(SAMPLE_PDF_BYTES, "sample.pdf")
+
+    _session_fitz_document.reset_mock()
+    _session_spacy_nlp.reset_mock()
+    return result
 
 @pytest.fixture
 def real_sample_pdf_bytes():
@@ -286,6 +327,46 @@ def test_pdf_files(temp_dir):
     from tests.fixtures.sample_data import create_test_pdf_files
     return create_test_pdf_files(temp_dir)
 
+# 大容量PDFバイトデータ（メモリマップ）
+LARGE_PDF_PAYLOAD_SIZE = 1_000_000
+
+@pytest.fixture(scope="session")
+def large_pdf_mmap(tmp_path_factory):
+    """セッションで1回だけ書き出した約1MBのPDFを読み取り専用でメモリマップ"""
+    pdf_path = tmp_path_factory.mktemp("pdf") / "large.pdf"
+    pdf_path.write_bytes(b"%PDF-1.4\n" + os.urandom(LARGE_PDF_PAYLOAD_SIZE) + b"\n%%EOF")
+    with open(pdf_path, "rb") as pdf_file:
+        mapped = mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ)
+    yield mapped
+    # モックの呼び出し記録が循環参照でmemoryviewを保持している場合があるため先に回収
+    gc.collect()
+    mapped.close()
+
+# 共有埋め込みベクトル（読み取り専用）
+@pytest.fixture(scope="session")
+def shared_embedding():
+    """テスト間で共有する1536次元埋め込み（読み取り専用float32配列）"""
+    from models.embedding import OPENAI_EMBEDDING_DIMENSION
+    embedding = np.full(OPENAI_EMBEDDING_DIMENSION, 0.1, dtype=np.float32)
+    embedding.setflags(write=False)
+    return embedding
+
+# 連番埋め込み行列ファクトリ
+@pytest.fixture(scope="session")
+def ramp_embeddings():
+    """
+    i行目の全要素が base + i * step の埋め込み行列を生成する関数
+
+    行ごとにリストを組み立てず、ブロードキャストで連続配列を一度に確保する
+    """
+    from models.embedding import OPENAI_EMBEDDING_DIMENSION
+
+    def build(count, step, base=0.1):
+        offsets = base + np.arange(count, dtype=np.float32)[:, None] * np.float32(step)
+        return np.broadcast_to(offsets, (count, OPENAI_EMBEDDING_DIMENSION)).astype(np.float32)
+
+    return build
+
 # テスト用一時ディレクトリ
 @pytest.fixture
 def temp_dir():
@@ -94,27 +94,29 @@ class TestSupabaseIntegration:
         assert store.supabase_url == "https://test.supabase.co"
         assert store.supabase_key == "test-key"
     
-    def test_vector_search_with_large_dataset(self, mock_supabase_client):
+    def test_vector_search_with_large_dataset(
+        self, mock_supabase_client, ramp_embeddings, shared_embedding
+    ):
         """大量データでのベクトル検索統合テスト"""
         store = VectorStore("https://test.supabase.co", "test-key")
         
         # 大量のテストデータ準備
-        test_chunks = []
-        for i in range(100):
-            chunk = {
+        embeddings = ramp_embeddings(100, 0.001)
+        test_chunks = [
+            {
                 "content": f"テストコンテンツ{i}",
                 "page_number": i % 10 + 1,
-                "embedding": [0.1 + i * 0.001] * 1536
+                "embedding": embedding
             }
-            test_chunks.append(chunk)
+            for i, embedding in enumerate(embeddings)
+        ]
         
         # データ保存
         document_id = "test-doc-id"
         store.store_chunks(test_chunks, document_id)
         
         # 検索実行
-        query_embedding = [0.1] * 1536
-        results = store.similarity_search(query_embedding, k=10)
+        results = store.similarity_search(shared_embedding, k=10)
         
         assert isinstance(results, list)
         assert len(results) <= 10  # 指定したk値以下
\ No newline at end of file
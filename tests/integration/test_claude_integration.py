@@ -374,7 +374,7 @@ class TestPerformanceIntegration:
         import os
         
         process = psutil.Process(os.getpid())
-        initial_memory = process.memory_info().rss / 1024 / 1024  # MB
+        initial_memory = process.memory_full_info().uss / 1024 / 1024  # MB
         
         mock_response = Mock()
         mock_response.content = "メモリテスト回答"
@@ -385,7 +385,7 @@ class TestPerformanceIntegration:
             for i in range(50):
                 performance_claude_service.generate_response(f"質問{i}", [f"コンテキスト{i}"])
         
-        final_memory = process.memory_info().rss / 1024 / 1024  # MB
+        final_memory = process.memory_full_info().uss / 1024 / 1024  # MB
         memory_increase = final_memory - initial_memory
         
         # メモリ使用量検証（50MB以下の増加）
@@ -222,8 +222,7 @@ class TestPerformanceRequirements:
     @patch('openai.OpenAI')
     def test_memory_efficiency(self, mock_openai):
         """パフォーマンス: メモリ効率性"""
-        import psutil
-        import os
+        import tracemalloc
         
         mock_response = Mock()
         mock_response.data = [Mock(embedding=[0.1] * 1536)]
@@ -234,20 +233,25 @@ class TestPerformanceRequirements:
         
         service = EmbeddingService("sk-test123456789")
         
-        # メモリ使用量測定開始
-        process = psutil.Process(os.getpid())
-        initial_memory = process.memory_info().rss / 1024 / 1024  # MB
-        
-        # 100回の埋め込み生成
-        for i in range(100):
-            service.generate_embedding(f"Memory test {i}")
+        # メモリ使用量測定開始（割り当て元の行単位で増加量を追跡）
+        tracemalloc.start()
+        try:
+            before = tracemalloc.take_snapshot()
+            
+            # 100回の埋め込み生成
+            for i in range(100):
+                service.generate_embedding(f"Memory test {i}")
+            
+            # メモリ使用量測定終了
+            after = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
         
-        # メモリ使用量測定終了
-        final_memory = process.memory_info().rss / 1024 / 1024  # MB
-        memory_increase = final_memory - initial_memory
+        top_stats = after.compare_to(before, "lineno")[:10]
+        memory_increase = sum(stat.size_diff for stat in top_stats)
         
-        # メモリ使用量増加が100MB以下であることを確認
-        assert memory_increase < 100
+        # 上位10行の増加量が5MB以下であることを確認（失敗時は割り当て元を表示）
+        assert memory_increase < 5 * 1024 * 1024, "\n".join(str(stat) for stat in top_stats)
 
 
 class TestAsyncIntegration:
@@ -421,13 +425,15 @@ class TestSupabaseIntegrationFlow:
     @patch('openai.OpenAI')
     def test_batch_supabase_storage_large_dataset(self, mock_openai, mock_vector_store):
         """統合: 大量データのバッチSupabase保存"""
-        # 大量データ用のモック
-        mock_response = Mock()
-        mock_response.data = [Mock(embedding=[0.1] * 1536) for _ in range(100)]
-        mock_response.usage.total_tokens = 1000
+        # 大量データ用のモック（入力件数ぶんの埋め込みを返す）
+        def create(input, model):
+            response = Mock()
+            response.data = [Mock(embedding=[0.1] * 1536) for _ in input]
+            response.usage.total_tokens = 10 * len(input)
+            return response
         
         mock_client = mock_openai.return_value
-        mock_client.embeddings.create.return_value = mock_response
+        mock_client.embeddings.create.side_effect = create
         
         mock_store_instance = mock_vector_store.return_value
         mock_store_instance.store_document.return_value = "large-dataset-test"
@@ -33,7 +33,7 @@ class TestPDFProcessorIntegration:
 class TestVectorStoreIntegration:
     """ベクトルストア統合テスト"""
     
-    def test_document_lifecycle(self, mock_supabase_client):
+    def test_document_lifecycle(self, mock_supabase_client, ramp_embeddings, shared_embedding):
         """文書ライフサイクル統合テスト"""
         store = VectorStore("https://test.supabase.co", "test-key")
         
@@ -45,20 +45,19 @@ class TestVectorStoreIntegration:
         }
         document_id = store.store_document(document_data)
         
-        # 2. チャンク保存
+        # 2. チャンク保存（埋め込みは1つのfloat32行列の行ビュー）
         chunks = [
             {
                 "content": f"テストチャンク{i}",
                 "page_number": i % 5 + 1,
-                "embedding": [0.1 + i * 0.01] * 1536
+                "embedding": embedding
             }
-            for i in range(10)
+            for i, embedding in enumerate(ramp_embeddings(10, 0.01))
         ]
         store.store_chunks(chunks, document_id)
         
         # 3. 検索実行
-        query_embedding = [0.1] * 1536
-        results = store.similarity_search(query_embedding)
+        results = store.similarity_search(shared_embedding)
         
         # 4. 文書一覧確認
         documents = store.get_documents()
@@ -78,16 +77,15 @@ class TestFullSystemIntegration:
     def test_pdf_to_search_pipeline(
         self, 
         sample_pdf_bytes, 
-        mock_fitz, 
-        mock_spacy, 
+        parsed_sample_pdf, 
         mock_supabase_client,
-        mock_openai_client
+        mock_openai_client,
+        shared_embedding
     ):
         """PDF処理から検索までの完全パイプラインテスト"""
-        # 1. PDF処理
-        processor = PDFProcessor()
+        # 1. PDF処理（解析はtest_full_pdf_processing_pipelineで検証済みのため共有結果を使用）
+        processing_result = parsed_sample_pdf
         filename = "full_pipeline_test.pdf"
-        processing_result = processor.process_pdf(sample_pdf_bytes, filename)
         
         # 2. ベクトルストア保存
         store = VectorStore("https://test.supabase.co", "test-key")
@@ -107,7 +105,7 @@ class TestFullSystemIntegration:
                 "content": chunk.content,
                 "page_number": chunk.page_number,
                 "token_count": chunk.token_count,
-                "embedding": [0.1] * 1536  # モック埋め込み
+                "embedding": shared_embedding  # モック埋め込み（共有・読み取り専用）
             }
             chunks_with_embeddings.append(chunk_data)
         
@@ -115,8 +113,7 @@ class TestFullSystemIntegration:
         store.store_chunks(chunks_with_embeddings, document_id)
         
         # 3. 検索実行
-        query_embedding = [0.1] * 1536
-        search_results = store.similarity_search(query_embedding)
+        search_results = store.similarity_search(shared_embedding)
         
         # 結果検証
         assert processing_result.total_chunks > 0
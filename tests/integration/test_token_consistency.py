@@ -280,6 +280,23 @@ class TestTokenCountEdgeCases:
             assert base_count == service_count
             assert base_count > 0  # 特殊文字でも何らかのトークンが生成される
 
+    def test_repeated_text_uses_cached_count(self):
+        """同一テキストの再カウントはエンコードを省略しても結果が一致するテスト"""
+        mock_encoding = Mock()
+        mock_encoding.encode.side_effect = lambda text: list(range(len(text)))
+        
+        first_counter = TokenCounter()
+        second_counter = TokenCounter("text-embedding-3-large")
+        first_counter.encoding = mock_encoding
+        second_counter.encoding = mock_encoding
+        
+        text = "キャッシュ対象のテンプレートテキストです。"
+        
+        # 同一エンコーディングを使うカウンター間でキャッシュを共有
+        assert first_counter.count_tokens(text) == len(text)
+        assert second_counter.count_tokens(text) == len(text)
+        assert mock_encoding.encode.call_count == 1
+
 
 # 統合テスト用のマーカー
 pytestmark = pytest.mark.integration
\ No newline at end of file
@@ -5,8 +5,9 @@ Issue #53: Embedding Data Model のパフォーマンス要件検証
 """
 
 import pytest
+import asyncio
 import time
-import statistics
+import numpy as np
 from typing import List, Dict, Any
 from unittest.mock import Mock, patch
 
@@ -18,63 +19,72 @@ from models.embedding import (
 )
 from utils.tokenizer import TokenCounter
 
+# 計測はperf_counter_ns（単調・ナノ秒分解能）で行い、閾値もナノ秒で比較
+NS_PER_MS = 1_000_000
+
+
+def assert_benchmark_mean_below(benchmark, threshold_ns: int) -> None:
+    """pytest-benchmarkの平均実行時間が閾値（ナノ秒）未満であることを確認"""
+    # --benchmark-disable 時は統計が収集されないため判定しない
+    if benchmark.stats is None:
+        return
+    assert benchmark.stats["mean"] * 1e9 < threshold_ns
+
+
+@pytest.fixture
+def batch_results(request, shared_embedding):
+    """バッチ作成用のEmbeddingResult一覧（計測区間外で構築）"""
+    return [
+        EmbeddingResult(
+            text=f"バッチテストテキスト{i}",
+            embedding=shared_embedding,
+            token_count=50 + i,
+            model="text-embedding-3-small"
+        )
+        for i in range(request.param)
+    ]
+
 
 class TestEmbeddingResultPerformance:
     """EmbeddingResult パフォーマンステスト"""
     
-    def test_embedding_result_creation_performance(self):
+    def test_embedding_result_creation_performance(self, benchmark, shared_embedding):
         """EmbeddingResult 作成性能テスト"""
-        # 大量のEmbeddingResultを作成して時間測定
-        creation_times = []
+        text = "テストテキスト" * 10  # 長めのテキスト
         
-        for i in range(100):
-            text = f"テストテキスト{i}" * 10  # 長めのテキスト
-            embedding = [0.1 + i * 0.0001] * OPENAI_EMBEDDING_DIMENSION
-            
-            start_time = time.time()
-            result = EmbeddingResult(
+        result = benchmark(
+            lambda: EmbeddingResult(
                 text=text,
-                embedding=embedding,
-                token_count=50 + i,
+                embedding=shared_embedding,
+                token_count=50,
                 model="text-embedding-3-small"
             )
-            creation_time = time.time() - start_time
-            creation_times.append(creation_time)
-            
-            # オブジェクトが正常に作成されていることを確認
-            assert result.text == text
-            assert len(result.embedding) == OPENAI_EMBEDDING_DIMENSION
+        )
         
-        # パフォーマンス要件
-        avg_creation_time = statistics.mean(creation_times)
-        max_creation_time = max(creation_times)
+        # オブジェクトが正常に作成されていることを確認
+        assert result.text == text
+        assert len(result.embedding) == OPENAI_EMBEDDING_DIMENSION
         
-        assert avg_creation_time < 0.01  # 平均10ms以内
-        assert max_creation_time < 0.1   # 最大100ms以内
+        # パフォーマンス要件
+        assert_benchmark_mean_below(benchmark, 10 * NS_PER_MS)  # 平均10ms以内
     
-    def test_embedding_validation_performance(self):
+    def test_embedding_validation_performance(self, benchmark, shared_embedding):
         """埋め込み検証性能テスト"""
-        # 異なるサイズの埋め込みで検証時間測定
-        validation_times = []
-        
         text = "テスト用テキストデータ"
-        embedding = [0.1] * OPENAI_EMBEDDING_DIMENSION
         
-        for i in range(50):
-            start_time = time.time()
+        def create_and_validate():
             result = EmbeddingResult(
                 text=text,
-                embedding=embedding,
+                embedding=shared_embedding,
                 token_count=20,
                 model="text-embedding-3-small"
             )
             result.validate()  # 明示的な検証呼び出し
-            validation_time = time.time() - start_time
-            validation_times.append(validation_time)
+        
+        benchmark(create_and_validate)
         
         # パフォーマンス要件
-        avg_validation_time = statistics.mean(validation_times)
-        assert avg_validation_time < 0.005  # 平均5ms以内
+        assert_benchmark_mean_below(benchmark, 5 * NS_PER_MS)  # 平均5ms以内
     
     def test_supabase_format_conversion_performance(self):
         """Supabase形式変換性能テスト"""
@@ -85,19 +95,19 @@ class TestEmbeddingResultPerformance:
         for i in range(100):
             result = EmbeddingResult(
                 text=f"変換テストテキスト{i}",
-                embedding=[0.1 + i * 0.0001] * OPENAI_EMBEDDING_DIMENSION,
+                embedding=np.full(OPENAI_EMBEDDING_DIMENSION, 0.1 + i * 0.0001, dtype=np.float32),
                 token_count=30 + i,
                 model="text-embedding-3-small"
             )
             results.append(result)
         
         # 変換時間測定
-        start_time = time.time()
+        start = time.perf_counter_ns()
         supabase_data = [result.to_supabase_format() for result in results]
-        conversion_time = time.time() - start_time
+        conversion_ns = time.perf_counter_ns() - start
         
         # パフォーマンス要件
-        assert conversion_time < 1.0  # 1秒以内
+        assert conversion_ns < 1000 * NS_PER_MS  # 1秒以内
         assert len(supabase_data) == 100
         
         # 変換結果の正当性確認
@@ -107,7 +117,7 @@ class TestEmbeddingResultPerformance:
             assert "token_count" in data
             assert len(data["embedding"]) == OPENAI_EMBEDDING_DIMENSION
     
-    def test_cost_calculation_performance(self):
+    def test_cost_calculation_performance(self, shared_embedding):
         """コスト計算性能テスト"""
         # 大量のコスト計算性能テスト
         results = []
@@ -115,19 +125,19 @@ class TestEmbeddingResultPerformance:
         for i in range(1000):
             result = EmbeddingResult(
                 text=f"コスト計算テストテキスト{i}",
-                embedding=[0.1] * OPENAI_EMBEDDING_DIMENSION,
+                embedding=shared_embedding,
                 token_count=100 + i,
                 model="text-embedding-3-small"
             )
             results.append(result)
         
         # コスト計算時間測定
-        start_time = time.time()
+        start = time.perf_counter_ns()
         costs = [result.calculate_cost() for result in results]
-        calculation_time = time.time() - start_time
+        calculation_ns = time.perf_counter_ns() - start
         
         # パフォーマンス要件
-        assert calculation_time < 0.1  # 100ms以内
+        assert calculation_ns < 100 * NS_PER_MS  # 100ms以内
         assert len(costs) == 1000
         assert all(cost > 0 for cost in costs)
 
@@ -135,42 +145,28 @@ class TestEmbeddingResultPerformance:
 class TestEmbeddingBatchPerformance:
     """EmbeddingBatch パフォーマンステスト"""
     
-    def test_batch_creation_performance(self):
+    @pytest.mark.parametrize("batch_results", [100, 500, 1000], indirect=True)
+    def test_batch_creation_performance(self, benchmark, batch_results):
         """バッチ作成性能テスト"""
-        # 大きなバッチ作成の性能測定
-        batch_sizes = [100, 500, 1000]
+        batch_size = len(batch_results)
         
-        for batch_size in batch_sizes:
-            # テストデータ準備
-            results = []
-            for i in range(batch_size):
-                result = EmbeddingResult(
-                    text=f"バッチテストテキスト{i}",
-                    embedding=[0.1 + i * 0.0001] * OPENAI_EMBEDDING_DIMENSION,
-                    token_count=50 + i,
-                    model="text-embedding-3-small"
-                )
-                results.append(result)
-            
-            # バッチ作成時間測定
-            start_time = time.time()
-            batch = EmbeddingBatch(results)
-            creation_time = time.time() - start_time
-            
-            # パフォーマンス要件（バッチサイズに応じて調整）
-            expected_max_time = batch_size * 0.001  # 1ms per item
-            assert creation_time < expected_max_time
-            assert len(batch.results) == batch_size
-            assert batch.total_tokens > 0
+        batch = benchmark.pedantic(
+            EmbeddingBatch, args=(batch_results,), rounds=20, iterations=1, warmup_rounds=1
+        )
+        
+        # パフォーマンス要件（バッチサイズに応じて調整）
+        assert_benchmark_mean_below(benchmark, batch_size * NS_PER_MS)  # 1ms per item
+        assert len(batch.results) == batch_size
+        assert batch.total_tokens > 0
     
-    def test_batch_statistics_performance(self):
+    def test_batch_statistics_performance(self, shared_embedding):
         """バッチ統計計算性能テスト"""
         # 大きなバッチの統計計算性能測定
         results = []
         for i in range(500):
             result = EmbeddingResult(
                 text=f"統計テストテキスト{i}",
-                embedding=[0.1] * OPENAI_EMBEDDING_DIMENSION,
+                embedding=shared_embedding,
                 token_count=80 + i % 50,  # トークン数にバリエーション
                 model="text-embedding-3-small"
             )
@@ -179,24 +175,48 @@ class TestEmbeddingBatchPerformance:
         batch = EmbeddingBatch(results)
         
         # 統計計算時間測定
-        start_time = time.time()
+        start = time.perf_counter_ns()
         stats = batch.get_statistics()
-        calculation_time = time.time() - start_time
+        calculation_ns = time.perf_counter_ns() - start
         
         # パフォーマンス要件
-        assert calculation_time < 0.1  # 100ms以内
+        assert calculation_ns < 100 * NS_PER_MS  # 100ms以内
         assert stats["count"] == 500
         assert stats["total_tokens"] > 0
         assert stats["avg_tokens"] > 0
     
-    def test_supabase_bulk_format_performance(self):
+    def test_batch_validation_performance(self, shared_embedding):
+        """バッチ一括検証性能テスト"""
+        results = []
+        for i in range(500):
+            result = EmbeddingResult(
+                text=f"一括検証テストテキスト{i}",
+                embedding=shared_embedding,
+                token_count=40 + i % 20,
+                model="text-embedding-3-small"
+            )
+            results.append(result)
+
+        batch = EmbeddingBatch(results)
+
+        # 一括検証時間測定（行列構築を含む）
+        start = time.perf_counter_ns()
+        is_valid = batch.validate_all()
+        validation_ns = time.perf_counter_ns() - start
+
+        # パフォーマンス要件
+        assert validation_ns < 100 * NS_PER_MS  # 100ms以内
+        assert is_valid is True
+        assert batch.embedding_matrix.shape == (500, OPENAI_EMBEDDING_DIMENSION)
+
+    def test_supabase_bulk_format_performance(self, shared_embedding):
         """Supabaseバルク形式変換性能テスト"""
         # 大量データのバルク変換性能測定
         results = []
         for i in range(200):
             result = EmbeddingResult(
                 text=f"バルク変換テストテキスト{i}",
-                embedding=[0.1] * OPENAI_EMBEDDING_DIMENSION,
+                embedding=shared_embedding,
                 token_count=60 + i,
                 model="text-embedding-3-small"
             )
@@ -205,12 +225,12 @@ class TestEmbeddingBatchPerformance:
         batch = EmbeddingBatch(results)
         
         # バルク変換時間測定
-        start_time = time.time()
+        start = time.perf_counter_ns()
         bulk_data = batch.to_supabase_bulk_format()
-        conversion_time = time.time() - start_time
+        conversion_ns = time.perf_counter_ns() - start
         
         # パフォーマンス要件
-        assert conversion_time < 0.5  # 500ms以内
+        assert conversion_ns < 500 * NS_PER_MS  # 500ms以内
         assert len(bulk_data) == 200
         assert all("embedding" in item for item in bulk_data)
     
@@ -225,7 +245,7 @@ class TestEmbeddingBatchPerformance:
             dimension = 1536 if model == "text-embedding-3-small" else 3072
             result = EmbeddingResult(
                 text=f"モデル別テストテキスト{i}",
-                embedding=[0.1] * dimension,
+                embedding=np.full(dimension, 0.1, dtype=np.float32),
                 token_count=70 + i,
                 model=model
             )
@@ -234,12 +254,12 @@ class TestEmbeddingBatchPerformance:
         batch = EmbeddingBatch(results)
         
         # 内訳計算時間測定
-        start_time = time.time()
+        start = time.perf_counter_ns()
         breakdown = batch.get_model_breakdown()
-        calculation_time = time.time() - start_time
+        calculation_ns = time.perf_counter_ns() - start
         
         # パフォーマンス要件
-        assert calculation_time < 0.2  # 200ms以内
+        assert calculation_ns < 200 * NS_PER_MS  # 200ms以内
         assert len(breakdown) == 2  # 2つのモデル
         assert "text-embedding-3-small" in breakdown
         assert "text-embedding-3-large" in breakdown
@@ -263,16 +283,16 @@ class TestTokenCounterPerformance:
         counting_times = []
         
         for text in test_texts:
-            start_time = time.time()
+            start = time.perf_counter_ns()
             token_count = counter.count_tokens(text)
-            counting_time = time.time() - start_time
-            counting_times.append(counting_time)
+            counting_ns = time.perf_counter_ns() - start
+            counting_times.append(counting_ns)
             
             assert token_count > 0
             assert isinstance(token_count, int)
         
         # パフォーマンス要件
-        assert all(t < 0.1 for t in counting_times)  # 各計算100ms以内
+        assert all(t < 100 * NS_PER_MS for t in counting_times)  # 各計算100ms以内
     
     def test_batch_token_counting_performance(self):
         """バッチトークンカウント性能テスト"""
@@ -281,40 +301,44 @@ class TestTokenCounterPerformance:
         # 大量テキストのバッチカウント
         texts = [f"バッチテストテキスト{i}です。" for i in range(100)]
         
-        start_time = time.time()
+        start = time.perf_counter_ns()
         token_counts = counter.count_tokens_batch(texts)
-        batch_time = time.time() - start_time
+        batch_ns = time.perf_counter_ns() - start
         
         # パフォーマンス要件
-        assert batch_time < 1.0  # 1秒以内
+        assert batch_ns < 1000 * NS_PER_MS  # 1秒以内
         assert len(token_counts) == 100
         assert all(count > 0 for count in token_counts)
 
+    def test_async_batch_token_counting_performance(self):
+        """非同期バッチトークンカウント性能テスト"""
+        counter = TokenCounter("text-embedding-3-small")
+
+        texts = [f"非同期バッチテストテキスト{i}です。" for i in range(100)]
+
+        start = time.perf_counter_ns()
+        token_counts = asyncio.run(counter.count_tokens_batch_async(texts))
+        batch_ns = time.perf_counter_ns() - start
+
+        # パフォーマンス要件（同期版と同じ結果）
+        assert batch_ns < 1000 * NS_PER_MS  # 1秒以内
+        assert token_counts == counter.count_tokens_batch(texts)
+
 
 class TestEmbeddingCostCalculatorPerformance:
     """EmbeddingCostCalculator パフォーマンステスト"""
     
-    def test_cost_calculation_performance(self):
+    def test_cost_calculation_performance(self, benchmark):
         """コスト計算性能テスト"""
         calculator = EmbeddingCostCalculator()
         
-        # 大量のコスト計算
-        calculations = []
-        for i in range(1000):
-            token_count = 100 + i
-            model = "text-embedding-3-small"
-            
-            start_time = time.time()
-            cost = calculator.calculate_cost(token_count, model)
-            calc_time = time.time() - start_time
-            calculations.append(calc_time)
-            
-            assert cost > 0
-            assert isinstance(cost, float)
+        cost = benchmark(calculator.calculate_cost, 100, "text-embedding-3-small")
+        
+        assert cost > 0
+        assert isinstance(cost, float)
         
         # パフォーマンス要件
-        avg_calc_time = statistics.mean(calculations)
-        assert avg_calc_time < 0.001  # 平均1ms以内
+        assert_benchmark_mean_below(benchmark, NS_PER_MS)  # 平均1ms以内
     
     def test_batch_cost_calculation_performance(self):
         """バッチコスト計算性能テスト"""
@@ -328,12 +352,12 @@ class TestEmbeddingCostCalculatorPerformance:
                 "model": "text-embedding-3-small"
             })
         
-        start_time = time.time()
+        start = time.perf_counter_ns()
         total_cost = calculator.calculate_batch_cost(batch_items)
-        calc_time = time.time() - start_time
+        calc_ns = time.perf_counter_ns() - start
         
         # パフォーマンス要件
-        assert calc_time < 0.5  # 500ms以内
+        assert calc_ns < 500 * NS_PER_MS  # 500ms以内
         assert total_cost > 0
         assert isinstance(total_cost, float)
     
@@ -344,12 +368,12 @@ class TestEmbeddingCostCalculatorPerformance:
         # 大量テキストのコスト推定
         texts = [f"コスト推定テストテキスト{i}です。" * 5 for i in range(100)]
         
-        start_time = time.time()
+        start = time.perf_counter_ns()
         cost_estimate = calculator.estimate_batch_cost(texts, "text-embedding-3-small")
-        estimation_time = time.time() - start_time
+        estimation_ns = time.perf_counter_ns() - start
         
         # パフォーマンス要件
-        assert estimation_time < 2.0  # 2秒以内（トークンカウント含む）
+        assert estimation_ns < 2000 * NS_PER_MS  # 2秒以内（トークンカウント含む）
         assert cost_estimate["texts_count"] == 100
         assert cost_estimate["estimated_cost_usd"] > 0
         assert len(cost_estimate["token_breakdown"]) == 100
@@ -358,7 +382,7 @@ class TestEmbeddingCostCalculatorPerformance:
 class TestMemoryEfficiency:
     """メモリ効率性テスト"""
     
-    def test_large_batch_memory_efficiency(self):
+    def test_large_batch_memory_efficiency(self, shared_embedding):
         """大きなバッチのメモリ効率テスト"""
         # Streamlit Cloud制約: 1GB メモリ
         # 大きなバッチでもメモリ効率的に動作するかテスト
@@ -371,7 +395,7 @@ class TestMemoryEfficiency:
                 for i in range(batch_size):
                     result = EmbeddingResult(
                         text=f"メモリテストテキスト{i}",
-                        embedding=[0.1] * OPENAI_EMBEDDING_DIMENSION,
+                        embedding=shared_embedding,
                         token_count=50,
                         model="text-embedding-3-small"
                     )
@@ -397,7 +421,7 @@ class TestMemoryEfficiency:
             large_embeddings = []
             for i in range(100):
                 # text-embedding-3-large (3072次元) をシミュレート
-                embedding = [0.1 + i * 0.0001] * 3072
+                embedding = np.full(3072, 0.1 + i * 0.0001, dtype=np.float32)
                 result = EmbeddingResult(
                     text=f"大きな埋め込みテストテキスト{i}",
                     embedding=embedding,
@@ -5,29 +5,44 @@
 """
 
 import pytest
+import asyncio
+import os
 import time
-from unittest.mock import Mock, patch
-from services.pdf_processor import PDFProcessor
+import tracemalloc
+import numpy as np
+from unittest.mock import Mock, AsyncMock, patch
+from services.pdf_processor import PDFProcessor, PDFBatchProcessor
 from services.vector_store import VectorStore
 from services.embeddings import EmbeddingService
 
+# 計測はperf_counter_ns（単調・ナノ秒分解能）で行い、閾値もナノ秒で比較
+NS_PER_SEC = 1_000_000_000
 
+# 実PDF・実spaCyを使うプロセス並列テストは統合テスト有効時のみ実行
+INTEGRATION_TEST_ENABLED = os.getenv("RUN_INTEGRATION_TESTS", "false").lower() == "true"
+
+
+@pytest.fixture(scope="module")
+def query_embedding():
+    """検索用クエリ埋め込み（モジュール内で1つのfloat32配列を共有）"""
+    from models.embedding import OPENAI_EMBEDDING_DIMENSION
+    return np.full(OPENAI_EMBEDDING_DIMENSION, 0.1, dtype=np.float32)
+
+
+@pytest.mark.xdist_group("pdf_perf")
 class TestPDFProcessingPerformance:
     """PDF処理パフォーマンステスト"""
     
-    def test_large_pdf_processing_time(self, mock_fitz, mock_spacy):
+    def test_large_pdf_processing_time(self, mock_fitz, mock_spacy, large_pdf_mmap):
         """大きなPDF処理時間テスト"""
         processor = PDFProcessor()
         
-        # 大きなPDFファイルをシミュレート
-        large_pdf_bytes = b"%PDF-1.4\n" + b"large content " * 10000 + b"\n%%EOF"
-        
-        start_time = time.time()
-        result = processor.process_pdf(large_pdf_bytes, "large_test.pdf")
-        processing_time = time.time() - start_time
+        start = time.perf_counter_ns()
+        result = processor.process_pdf(large_pdf_mmap, "large_test.pdf")
+        processing_ns = time.perf_counter_ns() - start
         
         # パフォーマンス要件確認
-        assert processing_time < 30.0  # 30秒以内
+        assert processing_ns < 30 * NS_PER_SEC  # 30秒以内
         assert result.processing_time > 0
         assert result.total_chunks > 0
     
@@ -41,56 +56,101 @@ class TestPDFProcessingPerformance:
             pdf_bytes = f"%PDF-1.4\ntest content {i}\n%%EOF".encode()
             pdf_files.append((pdf_bytes, f"test_{i}.pdf"))
         
-        start_time = time.time()
-        results = []
-        
-        # 順次処理（並行処理の実装は将来的に）
-        for pdf_bytes, filename in pdf_files:
-            result = processor.process_pdf(pdf_bytes, filename)
-            results.append(result)
+        serial_results = [
+            processor.process_pdf(pdf_bytes, filename)
+            for pdf_bytes, filename in pdf_files
+        ]
         
-        total_time = time.time() - start_time
+        # 並行処理（モックはプロセス境界を越えないためスレッドワーカーで実行）
+        batch_processor = PDFBatchProcessor(processor)
+        start = time.perf_counter_ns()
+        results = batch_processor.process_files(
+            pdf_files, workers=min(5, os.cpu_count() or 1)
+        )
+        total_ns = time.perf_counter_ns() - start
         
         # パフォーマンス要件
-        assert total_time < 60.0  # 1分以内
+        assert total_ns < 60 * NS_PER_SEC  # 1分以内
         assert len(results) == 5
         assert all(r.total_chunks > 0 for r in results)
+        
+        # 入力順が保持され、逐次処理と同一の結果
+        for result, serial in zip(results, serial_results):
+            assert result.chunks == serial.chunks
+            assert result.total_pages == serial.total_pages
+    
+    @pytest.mark.integration
+    @pytest.mark.skipif(
+        not INTEGRATION_TEST_ENABLED,
+        reason="統合テストが無効化されています（RUN_INTEGRATION_TESTS=true で実行）"
+    )
+    def test_multiple_pdf_process_pool_processing(self):
+        """複数PDFプロセス並列処理テスト（実fitz・実spaCy）"""
+        import fitz
+        
+        # 実際にパース可能なPDFを生成
+        document = fitz.open()
+        for page_index in range(3):
+            page = document.new_page()
+            page.insert_text((72, 72), f"第{page_index + 1}章 プロセス並列処理のテスト本文です。")
+        pdf_bytes = document.tobytes()
+        document.close()
+        
+        pdf_files = [(pdf_bytes, f"process_{i}.pdf") for i in range(5)]
+        
+        # CPUバウンドな解析をGILの外で並列実行
+        batch_processor = PDFBatchProcessor(use_processes=True)
+        start = time.perf_counter_ns()
+        results = batch_processor.process_files(
+            pdf_files, workers=min(5, os.cpu_count() or 1)
+        )
+        total_ns = time.perf_counter_ns() - start
+        
+        assert total_ns < 120 * NS_PER_SEC  # 2分以内
+        assert [r.total_pages for r in results] == [3] * 5
+        assert all(
+            chunk.filename == filename
+            for result, (_, filename) in zip(results, pdf_files)
+            for chunk in result.chunks
+        )
 
 
+@pytest.mark.xdist_group("vector_perf")
 class TestVectorSearchPerformance:
     """ベクトル検索パフォーマンステスト"""
     
-    def test_similarity_search_response_time(self, mock_supabase_client):
+    def test_similarity_search_response_time(
+        self, mock_supabase_client, ramp_embeddings, query_embedding
+    ):
         """類似検索応答時間テスト"""
         store = VectorStore("https://test.supabase.co", "test-key")
         
-        # 大量のテストデータを準備
-        test_chunks = []
-        for i in range(1000):
-            chunk = {
+        # 大量のテストデータを準備（埋め込みは1つの連続配列の行ビュー）
+        embeddings = ramp_embeddings(1000, 0.0001)
+        test_chunks = [
+            {
                 "content": f"テストコンテンツ{i}",
-                "embedding": [0.1 + i * 0.0001] * 1536
+                "embedding": embedding
             }
-            test_chunks.append(chunk)
+            for i, embedding in enumerate(embeddings)
+        ]
         
         # データ保存
         store.store_chunks(test_chunks, "performance-test-doc")
         
         # 検索性能測定
-        query_embedding = [0.1] * 1536
         search_times = []
         
         for _ in range(10):  # 10回検索実行
-            start_time = time.time()
+            start = time.perf_counter_ns()
             results = store.similarity_search(query_embedding, k=5)
-            search_time = time.time() - start_time
-            search_times.append(search_time)
+            search_times.append(time.perf_counter_ns() - start)
         
-        avg_search_time = sum(search_times) / len(search_times)
+        avg_search_ns = sum(search_times) / len(search_times)
         
         # パフォーマンス要件
-        assert avg_search_time < 2.0  # 平均2秒以内
-        assert max(search_times) < 5.0  # 最大5秒以内
+        assert avg_search_ns < 2 * NS_PER_SEC  # 平均2秒以内
+        assert max(search_times) < 5 * NS_PER_SEC  # 最大5秒以内
     
     def test_batch_embedding_performance(self, mock_openai_client):
         """バッチ埋め込み生成性能テスト"""
@@ -99,29 +159,53 @@ class TestVectorSearchPerformance:
         # 大量のテキストを準備
         texts = [f"テストテキスト{i}です。" for i in range(100)]
         
-        start_time = time.time()
+        start = time.perf_counter_ns()
         result = service.create_batch_embeddings(texts)
-        processing_time = time.time() - start_time
+        processing_ns = time.perf_counter_ns() - start
         
         # パフォーマンス要件
-        assert processing_time < 30.0  # 30秒以内
+        assert processing_ns < 30 * NS_PER_SEC  # 30秒以内
         assert len(result.embeddings) == len(texts)
         
         # スループット計算
-        throughput = len(texts) / processing_time
+        throughput = len(texts) * NS_PER_SEC / processing_ns
         assert throughput > 1.0  # 1テキスト/秒以上
 
 
+    @patch('services.embeddings.EMBEDDING_BATCH_SIZE', 25)
+    @patch('openai.AsyncOpenAI')
+    def test_async_batch_embedding_requests_run_concurrently(self, mock_async_openai):
+        """非同期バッチ埋め込みのリクエスト並行実行テスト"""
+        request_latency = 0.2  # 1リクエストあたりの模擬API応答時間
+        
+        async def create(input, model):
+            await asyncio.sleep(request_latency)
+            return Mock(data=[Mock(embedding=[0.1] * 1536) for _ in input])
+        
+        mock_async_openai.return_value.embeddings.create = AsyncMock(side_effect=create)
+        service = EmbeddingService("sk-test123456789", async_mode=True)
+        texts = [f"テストテキスト{i}です。" for i in range(100)]
+        
+        start = time.perf_counter_ns()
+        result = asyncio.run(service.create_batch_embeddings_async(texts))
+        processing_ns = time.perf_counter_ns() - start
+        
+        # 4リクエストが並行実行され、逐次実行（4 × 応答時間）より短い
+        assert len(result.results) == len(texts)
+        assert mock_async_openai.return_value.embeddings.create.await_count == 4
+        assert processing_ns < request_latency * 4 * NS_PER_SEC
+
+
 class TestMemoryUsage:
     """メモリ使用量テスト"""
     
-    def test_pdf_processing_memory_efficiency(self, mock_fitz, mock_spacy):
+    def test_pdf_processing_memory_efficiency(self, mock_fitz, mock_spacy, large_pdf_mmap):
         """PDF処理メモリ効率テスト"""
         processor = PDFProcessor()
         
         # Streamlit Cloud制約: 1GB メモリ
         # 大きなファイルでもメモリ効率的に処理できるかテスト
-        large_pdf_bytes = b"%PDF-1.4\n" + b"content " * 100000 + b"\n%%EOF"
+        large_pdf_bytes = large_pdf_mmap
         
         try:
             result = processor.process_pdf(large_pdf_bytes, "memory_test.pdf")
@@ -130,14 +214,25 @@ class TestMemoryUsage:
             assert result.total_chunks > 0
         except MemoryError:
             pytest.fail("メモリ不足エラーが発生しました")
+        
+        # ストリーミング処理: ページ単位で逐次生成し、入力サイズに比例して確保しない
+        tracemalloc.start()
+        try:
+            chunk_count = sum(
+                1 for _ in processor.iter_chunks(large_pdf_bytes, "memory_test.pdf")
+            )
+            _, peak_bytes = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        
+        assert chunk_count == result.total_chunks
+        assert peak_bytes < len(large_pdf_bytes)
     
-    def test_vector_store_memory_efficient_search(self, mock_supabase_client):
+    def test_vector_store_memory_efficient_search(self, mock_supabase_client, query_embedding):
         """ベクトルストアメモリ効率検索テスト"""
         store = VectorStore("https://test.supabase.co", "test-key")
         
         # 大量検索でもメモリ効率的に動作するかテスト
-        query_embedding = [0.1] * 1536
-        
         try:
             # 複数回検索実行
             for _ in range(50):
@@ -147,11 +242,14 @@ class TestMemoryUsage:
             pytest.fail("メモリ不足エラーが発生しました")
 
 
+@pytest.mark.xdist_group("vector_perf")
 class TestScalabilityBenchmark:
     """スケーラビリティベンチマーク"""
     
     @pytest.mark.slow
-    def test_document_volume_scalability(self, mock_supabase_client):
+    def test_document_volume_scalability(
+        self, mock_supabase_client, ramp_embeddings, query_embedding
+    ):
         """文書量スケーラビリティテスト"""
         store = VectorStore("https://test.supabase.co", "test-key")
         
@@ -160,36 +258,32 @@ class TestScalabilityBenchmark:
         performance_results = []
         
         for doc_count in document_counts:
-            # テストデータ準備
-            chunks = []
-            for i in range(doc_count * 10):  # 1文書あたり10チャンク
-                chunk = {
-                    "content": f"文書{i//10}_チャンク{i%10}",
-                    "embedding": [0.1 + i * 0.00001] * 1536
-                }
-                chunks.append(chunk)
+            # テストデータ準備（1文書あたり10チャンク、埋め込みは行列のまま保存）
+            embeddings = ramp_embeddings(doc_count * 10, 0.00001)
+            contents = [f"文書{i//10}_チャンク{i%10}" for i in range(doc_count * 10)]
             
             # 保存時間測定
-            start_time = time.time()
-            store.store_chunks(chunks, f"scalability-test-{doc_count}")
-            store_time = time.time() - start_time
+            start = time.perf_counter_ns()
+            store.store_chunks_columnar(
+                f"scalability-test-{doc_count}", "scalability.pdf", contents, embeddings
+            )
+            store_ns = time.perf_counter_ns() - start
             
             # 検索時間測定
-            query_embedding = [0.1] * 1536
-            start_time = time.time()
+            start = time.perf_counter_ns()
             results = store.similarity_search(query_embedding, k=5)
-            search_time = time.time() - start_time
+            search_ns = time.perf_counter_ns() - start
             
             performance_results.append({
                 "document_count": doc_count,
-                "store_time": store_time,
-                "search_time": search_time
+                "store_ns": store_ns,
+                "search_ns": search_ns
             })
         
         # スケーラビリティ要件確認
         for result in performance_results:
-            assert result["store_time"] < 60.0  # 1分以内
-            assert result["search_time"] < 5.0   # 5秒以内
+            assert result["store_ns"] < 60 * NS_PER_SEC  # 1分以内
+            assert result["search_ns"] < 5 * NS_PER_SEC   # 5秒以内
         
         # パフォーマンス劣化が線形以下であることを確認
         # （実装では詳細な分析を行う）
\ No newline at end of file
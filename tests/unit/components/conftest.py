@@ -0,0 +1,146 @@
+"""
+コンポーネントテスト共通フィクスチャ
+
+チャットインターフェーステストで共有するサービスモック
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import Mock, AsyncMock
+
+from models.chat import ChatSession, ChatMessage, MessageRole
+from services.vector_store import VectorStore, SearchResult
+
+# ストリーミング応答スタブが返すチャンク
+STREAM_CHUNKS = [{"content": "テスト"}, {"content": "レスポンス"}]
+
+# similarity_search スタブの既定戻り値（全モックで共有するため変更不可のタプル）
+EMPTY_SEARCH_RESULTS = ()
+
+
+def _make_async_gen_stub(items):
+    """
+    呼び出すたびに items を順に返す非同期ジェネレーター関数を作成
+
+    await検証が不要な箇所ではAsyncMockより軽量なため、こちらを使用する
+    """
+    async def _stub(*args, **kwargs):
+        for item in items:
+            yield item
+    return _stub
+
+def _build_claude_service_mock() -> Mock:
+    """spec付きClaude サービスモックを構築"""
+    # Anthropic SDK等の読み込みが重いため、収集時ではなく初回使用時にインポートする
+    from services.claude_llm import ClaudeService
+
+    service = Mock(spec=ClaudeService)
+    service.astream_response = _make_async_gen_stub(STREAM_CHUNKS)
+    return service
+
+def _build_vector_store_mock() -> Mock:
+    """spec付きベクターストアモックを構築"""
+    store = Mock(spec=VectorStore)
+    store.similarity_search.return_value = EMPTY_SEARCH_RESULTS
+    return store
+
+@pytest.fixture(scope="session")
+def chat_interface_module():
+    """
+    components.chat_interface モジュール（初回使用時に1回だけインポート）
+
+    Streamlit・LLMクライアントの読み込みを収集時に行わないよう遅延させる
+    """
+    import components.chat_interface
+
+    return components.chat_interface
+
+# spec付きモックはテストごとに生成する（copy.copyでの複製は子モックを共有し、
+# 呼び出し記録やside_effectがテスト間で漏れるため使用しない）
+@pytest.fixture
+def mock_claude_service():
+    """モックClaude サービス"""
+    return _build_claude_service_mock()
+
+@pytest.fixture
+def mock_vector_store():
+    """モックベクターストア"""
+    return _build_vector_store_mock()
+
+# 共有インスタンス用（呼び出し記録は利用側のフィクスチャでテストごとにリセットする）
+@pytest.fixture(scope="module")
+def shared_claude_service():
+    """モックClaude サービス（モジュール内で共有）"""
+    return _build_claude_service_mock()
+
+@pytest.fixture(scope="module")
+def shared_vector_store():
+    """モックベクターストア（モジュール内で共有）"""
+    return _build_vector_store_mock()
+
+# 文書参照作成テスト用の検索結果（セッションで1回だけ構築、変更しないこと）
+@pytest.fixture(scope="session")
+def short_search_result():
+    """抜粋が切り詰められない短い検索結果"""
+    return SearchResult(
+        content="これは短いコンテンツです",
+        filename="test1.pdf",
+        page_number=1,
+        similarity_score=0.95,
+        metadata={"chunk_id": "chunk-001"}
+    )
+
+@pytest.fixture(scope="session")
+def long_search_result():
+    """抜粋が200文字で切り詰められる長い検索結果"""
+    return SearchResult(
+        content="これは非常に長いコンテンツです。" * 20,  # 200文字超
+        filename="test2.pdf",
+        page_number=5,
+        similarity_score=0.87,
+        metadata={"chunk_id": "chunk-002"}
+    )
+
+# 統合テスト用サービス（エラー注入のためテストごとに構築）
+@pytest.fixture
+def mock_services():
+    """統合テスト用のモックサービス"""
+    # 使用する属性はすべて明示的に設定するため、クラス走査が必要なspecは付けない
+    claude_service = Mock()
+    vector_store = Mock()
+    
+    # 非同期ストリーミングのモック（エラー注入でside_effectを設定するためAsyncMockを使用）
+    claude_service.astream_response = AsyncMock(
+        return_value=_make_async_gen_stub(STREAM_CHUNKS)()
+    )
+    
+    # ベクター検索のモック
+    vector_store.similarity_search = Mock(return_value=[
+        SearchResult(
+            content="テストコンテンツ",
+            filename="test.pdf",
+            page_number=1,
+            similarity_score=0.9,
+            metadata={"chunk_id": "chunk-test"}
+        )
+    ])
+    
+    return claude_service, vector_store
+
+# チャット履歴準備テスト用セッション（セッションで1回だけ構築、変更しないこと）
+@pytest.fixture(scope="session")
+def ten_user_message_session():
+    """ユーザーメッセージを10件含むチャットセッション"""
+    session = ChatSession()
+    session.add_messages(
+        ChatMessage(role=MessageRole.USER, content=f"ユーザーメッセージ{i}") for i in range(10)
+    )
+    return session
+
+@pytest.fixture(scope="session")
+def sync_event_loop():
+    """同期コードから非同期処理を駆動するイベントループ（セッションで1つを共有）"""
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
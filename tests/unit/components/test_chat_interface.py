@@ -5,15 +5,10 @@ TDD Red-Green-Refactorサイクルでチャット機能をテスト
 """
 
 import pytest
-from unittest.mock import Mock, patch, AsyncMock, MagicMock
-import asyncio
-from datetime import datetime
+from unittest.mock import Mock, patch
 from types import SimpleNamespace
 
-from components.chat_interface import AdvancedChatInterface, chat_interface_component
-from models.chat import ChatSession, ChatMessage, DocumentReference, MessageRole
-from services.claude_llm import ClaudeService
-from services.vector_store import VectorStore
+from models.chat import ChatSession, ChatMessage, MessageRole
 
 
 class MockSessionState:
@@ -45,27 +40,40 @@ class MockSessionState:
         self._state[key] = value
 
 
+@pytest.fixture
+def mock_st(chat_interface_module):
+    """components.chat_interface.st をMagicMock1つで置き換える"""
+    with patch.object(chat_interface_module, 'st') as m:
+        m.session_state = MockSessionState()
+        yield m
+
+
+def _make_bare_interface(chat_interface_module, claude_service, vector_store):
+    """__init__（セッション状態初期化）を通さずにチャットインターフェースを構築"""
+    AdvancedChatInterface = chat_interface_module.AdvancedChatInterface
+    interface = AdvancedChatInterface.__new__(AdvancedChatInterface)
+    interface.claude_service = claude_service
+    interface.vector_store = vector_store
+    interface.citation_display = Mock()
+    return interface
+
+
+@pytest.fixture(scope="module")
+def _shared_chat_interface(chat_interface_module, shared_claude_service, shared_vector_store):
+    """チャットインターフェースインスタンス本体（モジュールで1回だけ構築）"""
+    return chat_interface_module.AdvancedChatInterface(shared_claude_service, shared_vector_store)
+
+
+@pytest.mark.xdist_group("chat_interface")
 class TestAdvancedChatInterface:
     """高度なチャットインターフェーステスト"""
     
     @pytest.fixture
-    def mock_claude_service(self):
-        """モックClaude サービス"""
-        service = Mock(spec=ClaudeService)
-        service.astream_response = AsyncMock()
-        return service
-    
-    @pytest.fixture
-    def mock_vector_store(self):
-        """モックベクターストア"""
-        store = Mock(spec=VectorStore)
-        store.similarity_search = Mock(return_value=[])
-        return store
-    
-    @pytest.fixture
-    def chat_interface(self, mock_claude_service, mock_vector_store):
-        """チャットインターフェースインスタンス"""
-        return AdvancedChatInterface(mock_claude_service, mock_vector_store)
+    def chat_interface(self, _shared_chat_interface):
+        """チャットインターフェースインスタンス（呼び出し記録はテスト後にリセット）"""
+        yield _shared_chat_interface
+        _shared_chat_interface.claude_service.reset_mock()
+        _shared_chat_interface.vector_store.reset_mock()
     
     @pytest.fixture
     def mock_session_state(self):
@@ -76,55 +84,48 @@ class TestAdvancedChatInterface:
         mock_state.streaming_response = None
         return mock_state
     
-    def test_initialization(self, mock_claude_service, mock_vector_store):
+    def test_initialization(self, chat_interface_module, mock_claude_service, mock_vector_store):
         """初期化テスト"""
-        interface = AdvancedChatInterface(mock_claude_service, mock_vector_store)
+        interface = chat_interface_module.AdvancedChatInterface(mock_claude_service, mock_vector_store)
         
         assert interface.claude_service == mock_claude_service
         assert interface.vector_store == mock_vector_store
         assert interface.citation_display is not None
     
-    @patch('components.chat_interface.st.session_state', new_callable=MockSessionState)
-    def test_initialize_session_state(self, mock_session_state, chat_interface):
+    def test_initialize_session_state(self, chat_interface, mock_st):
         """セッション状態初期化テスト"""
         chat_interface._initialize_session_state()
         
-        assert "chat_session" in mock_session_state
-        assert "chat_history" in mock_session_state
-        assert "streaming_response" in mock_session_state
-        assert isinstance(mock_session_state["chat_session"], ChatSession)
+        assert "chat_session" in mock_st.session_state
+        assert "chat_history" in mock_st.session_state
+        assert "streaming_response" in mock_st.session_state
+        assert isinstance(mock_st.session_state["chat_session"], ChatSession)
     
-    @patch('components.chat_interface.st.session_state', new_callable=MockSessionState)
-    @patch('streamlit.success')
-    @patch('streamlit.rerun')
-    def test_start_new_chat(self, mock_rerun, mock_success, mock_session_state, chat_interface):
+    def test_start_new_chat(self, chat_interface, mock_st):
         """新しいチャット開始テスト"""
         # 既存のセッションを設定
         old_session = ChatSession()
         old_session.add_message(ChatMessage(role=MessageRole.USER, content="古いメッセージ"))
-        mock_session_state["chat_session"] = old_session
+        mock_st.session_state["chat_session"] = old_session
         
         chat_interface._start_new_chat()
         
         # 新しいセッションが作成されたことを確認
-        new_session = mock_session_state["chat_session"]
+        new_session = mock_st.session_state["chat_session"]
         assert isinstance(new_session, ChatSession)
         assert new_session.get_message_count() == 0
         assert new_session != old_session
         
         # UIフィードバックが呼ばれたことを確認
-        mock_success.assert_called_once_with("新しいチャットを開始しました")
-        mock_rerun.assert_called_once()
+        mock_st.success.assert_called_once_with("新しいチャットを開始しました")
+        mock_st.rerun.assert_called_once()
     
-    @patch('components.chat_interface.st.session_state', new_callable=MockSessionState)
-    @patch('streamlit.success')
-    @patch('streamlit.rerun')
-    def test_clear_chat_history(self, mock_rerun, mock_success, mock_session_state, chat_interface):
+    def test_clear_chat_history(self, chat_interface, mock_st):
         """チャット履歴クリアテスト"""
         # メッセージを含むセッションを設定
         session = ChatSession()
         session.add_message(ChatMessage(role=MessageRole.USER, content="テストメッセージ"))
-        mock_session_state["chat_session"] = session
+        mock_st.session_state["chat_session"] = session
         
         assert session.get_message_count() == 1
         
@@ -134,31 +135,12 @@ class TestAdvancedChatInterface:
         assert session.get_message_count() == 0
         
         # UIフィードバックが呼ばれたことを確認
-        mock_success.assert_called_once_with("チャット履歴をクリアしました")
-        mock_rerun.assert_called_once()
+        mock_st.success.assert_called_once_with("チャット履歴をクリアしました")
+        mock_st.rerun.assert_called_once()
     
-    def test_create_document_references(self, chat_interface):
+    def test_create_document_references(self, chat_interface, short_search_result, long_search_result):
         """文書参照作成テスト"""
-        # モック検索結果
-        mock_result1 = Mock()
-        mock_result1.filename = "test1.pdf"
-        mock_result1.page_number = 1
-        mock_result1.content = "これは短いコンテンツです"
-        mock_result1.metadata = {
-            "chunk_id": "chunk-001"
-        }
-        mock_result1.similarity_score = 0.95
-        
-        mock_result2 = Mock()
-        mock_result2.filename = "test2.pdf"
-        mock_result2.page_number = 5
-        mock_result2.content = "これは非常に長いコンテンツです。" * 20  # 200文字超
-        mock_result2.metadata = {
-            "chunk_id": "chunk-002"
-        }
-        mock_result2.similarity_score = 0.87
-        
-        search_results = [mock_result1, mock_result2]
+        search_results = [short_search_result, long_search_result]
         
         references = chat_interface._create_document_references(search_results)
         
@@ -181,20 +163,30 @@ class TestAdvancedChatInterface:
         assert len(ref2.excerpt) <= 203  # 200文字 + "..."
         assert ref2.excerpt.endswith("...")
     
-    @patch('components.chat_interface.st.session_state', new_callable=MockSessionState)
-    def test_prepare_chat_history(self, mock_session_state, chat_interface):
-        """チャット履歴準備テスト"""
-        # セッションに複数のメッセージを追加
-        session = ChatSession()
-        messages = [
-            ChatMessage(role=MessageRole.USER, content=f"ユーザーメッセージ{i}")
-            for i in range(10)
-        ]
+    def test_create_document_references_empty(self, chat_interface):
+        """空の検索結果での文書参照作成テスト"""
+        references = chat_interface._create_document_references([])
+        assert len(references) == 0
+    
+    def test_create_document_references_missing_metadata(self, chat_interface):
+        """メタデータ不足での文書参照作成テスト"""
+        # similarity_score等を持たない素のオブジェクト（Mockの属性削除は使わない）
+        result = SimpleNamespace(page_content="テストコンテンツ", metadata={})  # 空のメタデータ
         
-        for msg in messages:
-            session.add_message(msg)
+        references = chat_interface._create_document_references([result])
         
-        mock_session_state["chat_session"] = session
+        assert len(references) == 1
+        ref = references[0]
+        assert ref.filename == "不明なファイル"
+        assert ref.page_number == 0
+        assert ref.chunk_id == ""
+        assert ref.similarity_score == 0.0
+        assert ref.excerpt == "テストコンテンツ"
+    
+    def test_prepare_chat_history(self, chat_interface, ten_user_message_session, mock_st):
+        """チャット履歴準備テスト"""
+        # 複数のメッセージを含むセッション（読み取りのみのため共有インスタンスを使用）
+        mock_st.session_state["chat_session"] = ten_user_message_session
         
         chat_history = chat_interface._prepare_chat_history()
         
@@ -208,14 +200,13 @@ class TestAdvancedChatInterface:
             assert msg.role == "user"
             assert msg.content == f"ユーザーメッセージ{i + 5}"  # 5番目から8番目のメッセージ
     
-    @patch('components.chat_interface.st.session_state', new_callable=MockSessionState)
-    def test_prepare_chat_history_few_messages(self, mock_session_state, chat_interface):
+    def test_prepare_chat_history_few_messages(self, chat_interface, mock_st):
         """少数メッセージでの履歴準備テスト"""
         session = ChatSession()
         session.add_message(ChatMessage(role=MessageRole.USER, content="メッセージ1"))
         session.add_message(ChatMessage(role=MessageRole.ASSISTANT, content="回答1"))
         
-        mock_session_state["chat_session"] = session
+        mock_st.session_state["chat_session"] = session
         
         chat_history = chat_interface._prepare_chat_history()
         
@@ -223,10 +214,15 @@ class TestAdvancedChatInterface:
         assert len(chat_history) == 1
         assert chat_history[0].content == "メッセージ1"
     
-    @patch('components.chat_interface.st.session_state', new_callable=MockSessionState)
-    @patch('streamlit.metric')
-    @patch('streamlit.markdown')
-    def test_display_chat_statistics(self, mock_markdown, mock_metric, mock_session_state, chat_interface):
+    def test_prepare_chat_history_empty_session(self, chat_interface, mock_st):
+        """空セッションでの履歴準備テスト"""
+        mock_st.session_state["chat_session"] = ChatSession()
+        
+        chat_history = chat_interface._prepare_chat_history()
+        
+        assert len(chat_history) == 0
+    
+    def test_display_chat_statistics(self, chat_interface, mock_st):
         """チャット統計表示テスト"""
         # セッションにメッセージを追加
         session = ChatSession()
@@ -234,166 +230,100 @@ class TestAdvancedChatInterface:
         session.add_message(ChatMessage(role=MessageRole.ASSISTANT, content="アシスタント1"))
         session.add_message(ChatMessage(role=MessageRole.USER, content="ユーザー2"))
         
-        mock_session_state["chat_session"] = session
+        mock_st.session_state["chat_session"] = session
         
         chat_interface._display_chat_statistics()
         
         # 統計情報が表示されたことを確認
-        assert mock_metric.call_count >= 3
+        assert mock_st.metric.call_count >= 3
         
         # メトリック呼び出しの確認
-        metric_calls = [call[0] for call in mock_metric.call_args_list]
+        metric_calls = [call[0] for call in mock_st.metric.call_args_list]
         assert ("メッセージ数", 3) in metric_calls
         assert ("ユーザーメッセージ", 2) in metric_calls
         assert ("アシスタントメッセージ", 1) in metric_calls
     
-    def test_run_async_generator_success(self, chat_interface):
-        """非同期ジェネレーター実行成功テスト"""
-        # モック非同期ジェネレーター
-        async def mock_async_gen():
-            yield {"content": "chunk1"}
-            yield {"content": "chunk2"}
-            yield {"content": "chunk3"}
-        
-        loop = asyncio.new_event_loop()
-        results = list(chat_interface._run_async_generator(mock_async_gen(), loop))
-        loop.close()
-        
-        assert len(results) == 3
-        assert results[0]["content"] == "chunk1"
-        assert results[1]["content"] == "chunk2"
-        assert results[2]["content"] == "chunk3"
-    
-    def test_run_async_generator_empty(self, chat_interface):
-        """空の非同期ジェネレーター実行テスト"""
-        async def empty_async_gen():
+    @pytest.mark.parametrize("items, error", [
+        ([{"content": "chunk1"}, {"content": "chunk2"}, {"content": "chunk3"}], None),
+        ([], None),
+        ([{"content": "chunk1"}], Exception("テストエラー")),
+    ], ids=["success", "empty", "error"])
+    def test_run_async_generator(self, chat_interface, sync_event_loop, items, error):
+        """非同期ジェネレーター実行テスト（成功・空・エラー）"""
+        async def async_gen():
+            for item in items:
+                yield item
+            if error is not None:
+                raise error
+        
+        if error is not None:
+            with pytest.raises(Exception) as exc_info:
+                list(chat_interface._run_async_generator(async_gen(), sync_event_loop))
+            assert "テストエラー" in str(exc_info.value)
             return
-            yield  # 到達しないコード
-        
-        loop = asyncio.new_event_loop()
-        results = list(chat_interface._run_async_generator(empty_async_gen(), loop))
-        loop.close()
-        
-        assert len(results) == 0
-    
-    def test_run_async_generator_error(self, chat_interface):
-        """非同期ジェネレーターエラーテスト"""
-        async def error_async_gen():
-            yield {"content": "chunk1"}
-            raise Exception("テストエラー")
-        
-        loop = asyncio.new_event_loop()
         
-        with pytest.raises(Exception) as exc_info:
-            list(chat_interface._run_async_generator(error_async_gen(), loop))
+        results = list(chat_interface._run_async_generator(async_gen(), sync_event_loop))
         
-        loop.close()
-        assert "テストエラー" in str(exc_info.value)
+        assert results == items
 
 
+@pytest.mark.xdist_group("chat_interface")
 class TestLegacyChatInterface:
     """レガシーチャットインターフェーステスト"""
     
-    @patch('components.chat_interface.st.session_state', new_callable=MockSessionState)
-    @patch('streamlit.subheader')
-    @patch('streamlit.chat_input')
-    def test_chat_interface_component_no_input(self, mock_chat_input, mock_subheader, mock_session_state):
+    def test_chat_interface_component_no_input(self, chat_interface_module, mock_st):
         """入力なしのチャットインターフェーステスト"""
-        mock_chat_input.return_value = None
+        mock_st.chat_input.return_value = None
         
-        result = chat_interface_component()
+        result = chat_interface_module.chat_interface_component()
         
         assert result is None
-        mock_subheader.assert_called_once_with("💬 文書検索チャット")
-        assert "chat_history" in mock_session_state
-        assert mock_session_state["chat_history"] == []
+        mock_st.subheader.assert_called_once_with("💬 文書検索チャット")
+        assert "chat_history" in mock_st.session_state
+        assert mock_st.session_state["chat_history"] == []
     
-    @patch('components.chat_interface.st.session_state', new_callable=MockSessionState)
-    @patch('streamlit.subheader')
-    @patch('streamlit.chat_input')
-    @patch('streamlit.chat_message')
-    def test_chat_interface_component_with_input(self, mock_chat_message, mock_chat_input, mock_subheader, mock_session_state):
+    def test_chat_interface_component_with_input(self, chat_interface_module, mock_st):
         """入力ありのチャットインターフェーステスト"""
         user_input = "テスト質問"
-        mock_chat_input.return_value = user_input
+        mock_st.chat_input.return_value = user_input
         
-        # チャットメッセージのモック設定
-        mock_chat_message.return_value.__enter__ = Mock()
-        mock_chat_message.return_value.__exit__ = Mock(return_value=None)
-        
-        result = chat_interface_component()
+        result = chat_interface_module.chat_interface_component()
         
         assert result == user_input
-        assert len(mock_session_state["chat_history"]) == 1
-        assert mock_session_state["chat_history"][0] == {
+        assert len(mock_st.session_state["chat_history"]) == 1
+        assert mock_st.session_state["chat_history"][0] == {
             "role": "user",
             "content": user_input
         }
     
-    @patch('components.chat_interface.st.session_state', new_callable=MockSessionState)
-    @patch('streamlit.subheader')
-    @patch('streamlit.chat_input')
-    @patch('streamlit.chat_message')
-    @patch('streamlit.markdown')
-    @patch('streamlit.expander')
-    def test_chat_interface_component_with_history(self, mock_expander, mock_markdown, mock_chat_message, mock_chat_input, mock_subheader, mock_session_state):
+    def test_chat_interface_component_with_history(self, chat_interface_module, mock_st):
         """履歴ありのチャットインターフェーステスト"""
         # 既存の履歴を設定
-        mock_session_state["chat_history"] = [
+        mock_st.session_state["chat_history"] = [
             {"role": "user", "content": "過去の質問"},
             {"role": "assistant", "content": "過去の回答", "sources": ["source1.pdf", "source2.pdf"]}
         ]
         
-        mock_chat_input.return_value = None
-        
-        # モック設定
-        mock_chat_message.return_value.__enter__ = Mock()
-        mock_chat_message.return_value.__exit__ = Mock(return_value=None)
-        mock_expander.return_value.__enter__ = Mock()
-        mock_expander.return_value.__exit__ = Mock(return_value=None)
+        mock_st.chat_input.return_value = None
         
-        result = chat_interface_component()
+        result = chat_interface_module.chat_interface_component()
         
         assert result is None
         
         # チャット履歴が表示されたことを確認
-        assert mock_chat_message.call_count == 2  # user + assistant
-        assert mock_markdown.call_count >= 2  # 各メッセージの内容
-        mock_expander.assert_called_once_with("📚 参考文書")
+        assert mock_st.chat_message.call_count == 2  # user + assistant
+        assert mock_st.markdown.call_count >= 2  # 各メッセージの内容
+        mock_st.expander.assert_called_once_with("📚 参考文書")
 
 
+@pytest.mark.xdist_group("chat_interface")
 class TestChatInterfaceIntegration:
     """チャットインターフェース統合テスト"""
     
-    @pytest.fixture
-    def mock_services(self):
-        """統合テスト用のモックサービス"""
-        claude_service = Mock(spec=ClaudeService)
-        vector_store = Mock(spec=VectorStore)
-        
-        # 非同期ストリーミングのモック
-        async def mock_astream():
-            yield {"content": "テスト"}
-            yield {"content": "レスポンス"}
-        
-        claude_service.astream_response = AsyncMock(return_value=mock_astream())
-        
-        # ベクター検索のモック
-        mock_result = Mock()
-        mock_result.filename = "test.pdf"
-        mock_result.page_number = 1
-        mock_result.content = "テストコンテンツ"
-        mock_result.metadata = {"chunk_id": "chunk-test"}
-        mock_result.similarity_score = 0.9
-        vector_store.similarity_search = Mock(return_value=[mock_result])
-        
-        return claude_service, vector_store
-    
-    @patch('components.chat_interface.st.session_state', new_callable=MockSessionState)
-    def test_full_chat_flow_integration(self, mock_session_state, mock_services):
+    def test_full_chat_flow_integration(self, chat_interface_module, mock_services, mock_st):
         """完全なチャットフロー統合テスト"""
         claude_service, vector_store = mock_services
-        interface = AdvancedChatInterface(claude_service, vector_store)
+        interface = chat_interface_module.AdvancedChatInterface(claude_service, vector_store)
         
         # セッション状態初期化
         interface._initialize_session_state()
@@ -413,16 +343,57 @@ class TestChatInterfaceIntegration:
         assert references[0].similarity_score == 0.9
         
         # チャット履歴準備テスト
-        session = mock_session_state["chat_session"]
+        session = mock_st.session_state["chat_session"]
         session.add_message(ChatMessage(role=MessageRole.USER, content="統合テスト質問"))
         
         chat_history = interface._prepare_chat_history()
         assert len(chat_history) == 0  # 最新メッセージは除外される
     
-    def test_error_handling_integration(self, mock_services):
+    def test_document_reference_creation_integration(self, chat_interface_module, mock_services):
+        """文書参照作成統合テスト"""
+        interface = _make_bare_interface(chat_interface_module, *mock_services)
+        
+        # 文書参照作成テスト
+        mock_result = Mock()
+        mock_result.page_content = "統合テストコンテンツ"
+        mock_result.metadata = {"filename": "integration.pdf", "page_number": 10}
+        mock_result.similarity_score = 0.9
+        
+        references = interface._create_document_references([mock_result])
+        
+        assert len(references) == 1
+        assert references[0].filename == "integration.pdf"
+        assert references[0].similarity_score == 0.9
+        assert references[0].excerpt == "統合テストコンテンツ"
+    
+    def test_chat_history_conversion_integration(self, chat_interface_module, mock_services, mock_st):
+        """チャット履歴変換統合テスト"""
+        interface = _make_bare_interface(chat_interface_module, *mock_services)
+        
+        # セッションに様々なタイプのメッセージを追加
+        session = ChatSession()
+        session.add_messages([
+            ChatMessage(role=MessageRole.USER, content="ユーザー質問1"),
+            ChatMessage(role=MessageRole.ASSISTANT, content="アシスタント回答1"),
+            ChatMessage(role=MessageRole.USER, content="ユーザー質問2"),
+            ChatMessage(role=MessageRole.ASSISTANT, content="アシスタント回答2"),
+            ChatMessage(role=MessageRole.USER, content="現在の質問"),
+        ])
+        mock_st.session_state["chat_session"] = session
+        
+        chat_history = interface._prepare_chat_history()
+        
+        # 最後のメッセージを除く4つが変換される
+        assert len(chat_history) == 4
+        assert chat_history[0].content == "ユーザー質問1"
+        assert chat_history[1].content == "アシスタント回答1"
+        assert chat_history[2].content == "ユーザー質問2"
+        assert chat_history[3].content == "アシスタント回答2"
+    
+    def test_error_handling_integration(self, chat_interface_module, mock_services, sync_event_loop):
         """エラーハンドリング統合テスト"""
         claude_service, vector_store = mock_services
-        interface = AdvancedChatInterface(claude_service, vector_store)
+        interface = chat_interface_module.AdvancedChatInterface(claude_service, vector_store)
         
         # ベクター検索エラーをシミュレート
         vector_store.similarity_search.side_effect = Exception("検索エラー")
@@ -436,7 +407,4 @@ class TestChatInterfaceIntegration:
         
         # エラーが適切に処理されることを確認
         with pytest.raises(Exception):
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(claude_service.astream_response("test", [], []))
-            loop.close()
\ No newline at end of file
+            sync_event_loop.run_until_complete(claude_service.astream_response("test", [], []))
\ No newline at end of file
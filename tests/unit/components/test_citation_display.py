@@ -5,15 +5,61 @@ TDD Red-Green-Refactorサイクルで引用表示機能をテスト
 """
 
 import pytest
-from unittest.mock import patch, Mock
+from unittest.mock import patch
 from typing import List
 
 from components.citation_display import (
-    CitationDisplay, CitationGroup, StreamlitCitationWidget, create_sample_references
+    CitationDisplay, CitationGroup, StreamlitCitationWidget, create_sample_references,
+    _truncate_text_cached
 )
+import components.citation_display as citation_display_module
 from models.chat import DocumentReference
 
 
+@pytest.fixture(autouse=True)
+def mock_st():
+    """components.citation_display.st をMagicMock1つで置き換える（全テストで実Streamlitを呼ばない）"""
+    with patch.object(citation_display_module, 'st') as m:
+        yield m
+
+
+@pytest.fixture(scope="module")
+def _citation_sample_references():
+    """引用表示テスト用の文書参照データ（モジュールで共有するため変更不可のタプル）"""
+    return (
+        DocumentReference(
+            filename="マニュアル.pdf",
+            page_number=10,
+            chunk_id="chunk-001",
+            similarity_score=0.95,
+            excerpt="これは重要な情報です。新入社員は必ず確認してください。"
+        ),
+        DocumentReference(
+            filename="マニュアル.pdf",
+            page_number=11,
+            chunk_id="chunk-002",
+            similarity_score=0.87,
+            excerpt="追加の情報です。研修期間中に学習する内容について説明します。"
+        ),
+        DocumentReference(
+            filename="規程.pdf",
+            page_number=5,
+            chunk_id="chunk-003",
+            similarity_score=0.82,
+            excerpt="規程に関する重要事項です。必ず遵守してください。"
+        )
+    )
+
+
+@pytest.fixture(scope="module")
+def _widget_sample_references():
+    """ウィジェットテスト用の文書参照データ（モジュールで共有するため変更不可のタプル）"""
+    return (
+        DocumentReference("test.pdf", 1, "chunk1", 0.9, "text1"),
+        DocumentReference("test.pdf", 2, "chunk2", 0.8, "text2"),
+    )
+
+
 class TestCitationDisplay:
     """引用表示コンポーネントテスト"""
     
@@ -23,31 +69,9 @@ class TestCitationDisplay:
         return CitationDisplay(theme="default")
     
     @pytest.fixture
-    def sample_references(self):
+    def sample_references(self, _citation_sample_references):
         """サンプル文書参照データ"""
-        return [
-            DocumentReference(
-                filename="マニュアル.pdf",
-                page_number=10,
-                chunk_id="chunk-001",
-                similarity_score=0.95,
-                excerpt="これは重要な情報です。新入社員は必ず確認してください。"
-            ),
-            DocumentReference(
-                filename="マニュアル.pdf",
-                page_number=11,
-                chunk_id="chunk-002",
-                similarity_score=0.87,
-                excerpt="追加の情報です。研修期間中に学習する内容について説明します。"
-            ),
-            DocumentReference(
-                filename="規程.pdf",
-                page_number=5,
-                chunk_id="chunk-003",
-                similarity_score=0.82,
-                excerpt="規程に関する重要事項です。必ず遵守してください。"
-            )
-        ]
+        return _citation_sample_references
     
     def test_citation_display_initialization(self):
         """CitationDisplay初期化テスト"""
@@ -62,29 +86,21 @@ class TestCitationDisplay:
         display_detailed = CitationDisplay(theme="detailed")
         assert display_detailed.theme == "detailed"
     
-    @patch('streamlit.info')
-    def test_display_references_empty_list(self, mock_info, citation_display):
+    def test_display_references_empty_list(self, citation_display, mock_st):
         """空の参照リストでの表示テスト"""
         citation_display.display_references([])
         
-        mock_info.assert_called_once_with("参照文書はありません")
+        mock_st.info.assert_called_once_with("参照文書はありません")
     
-    @patch('streamlit.markdown')
-    @patch('streamlit.expander')
-    def test_display_references_with_data(self, mock_expander, mock_markdown, citation_display, sample_references):
+    def test_display_references_with_data(self, citation_display, sample_references, mock_st):
         """データありでの参照表示テスト"""
-        # モックエクスパンダーのセットアップ
-        mock_expander_context = Mock()
-        mock_expander.return_value.__enter__.return_value = mock_expander_context
-        mock_expander.return_value.__exit__.return_value = None
-        
         citation_display.display_references(sample_references)
         
         # markdownが呼ばれたことを確認
-        assert mock_markdown.called
+        assert mock_st.markdown.called
         
         # 呼び出し内容を検証
-        markdown_calls = [call[0][0] for call in mock_markdown.call_args_list]
+        markdown_calls = [call[0][0] for call in mock_st.markdown.call_args_list]
         
         # ファイル名が含まれていることを確認
         assert any("マニュアル.pdf" in call for call in markdown_calls)
@@ -171,16 +187,15 @@ class TestCitationDisplay:
         assert truncated.endswith("...")
         assert " " in truncated[:-3]  # "..."を除いた部分に空白があることを確認
     
-    @patch('streamlit.markdown')
-    def test_display_compact_references(self, mock_markdown, citation_display, sample_references):
+    def test_display_compact_references(self, citation_display, sample_references, mock_st):
         """コンパクト参照表示テスト"""
         citation_display.display_compact_references(sample_references)
         
         # markdownが呼ばれたことを確認
-        mock_markdown.assert_called_once()
+        mock_st.markdown.assert_called_once()
         
         # 呼び出し内容を検証
-        call_content = mock_markdown.call_args[0][0]
+        call_content = mock_st.markdown.call_args[0][0]
         assert "参照文書:" in call_content
         assert "マニュアル.pdf" in call_content
         assert "規程.pdf" in call_content
@@ -192,18 +207,16 @@ class TestCitationDisplay:
         # 例外が発生しないことを確認
         citation_display.display_compact_references([])
     
-    @patch('streamlit.bar_chart')
-    @patch('streamlit.subheader')
-    def test_display_similarity_histogram(self, mock_subheader, mock_bar_chart, citation_display, sample_references):
+    def test_display_similarity_histogram(self, citation_display, sample_references, mock_st):
         """類似度ヒストグラム表示テスト"""
         citation_display.display_similarity_histogram(sample_references)
         
         # サブヘッダーとバーチャートが呼ばれたことを確認
-        mock_subheader.assert_called_once_with("類似度分布")
-        mock_bar_chart.assert_called_once()
+        mock_st.subheader.assert_called_once_with("類似度分布")
+        mock_st.bar_chart.assert_called_once()
         
         # バーチャートのデータを検証
-        chart_data = mock_bar_chart.call_args[0][0]
+        chart_data = mock_st.bar_chart.call_args[0][0]
         assert "類似度範囲" in chart_data
         assert "文書数" in chart_data
         
@@ -212,6 +225,19 @@ class TestCitationDisplay:
         assert counts[0] == 1  # 0.9-1.0: 0.95のみ
         assert counts[1] == 2  # 0.8-0.9: 0.87, 0.82
     
+    def test_display_similarity_histogram_boundaries(self, citation_display, mock_st):
+        """類似度ヒストグラムの境界値テスト（境界値は上の帯、0.5未満は最下位の帯）"""
+        references = [
+            DocumentReference("test.pdf", i, f"chunk{i}", score, "text")
+            for i, score in enumerate([1.0, 0.9, 0.89999, 0.7, 0.6, 0.5, 0.1])
+        ]
+        
+        citation_display.display_similarity_histogram(references)
+        
+        chart_data = mock_st.bar_chart.call_args[0][0]
+        assert chart_data["類似度範囲"] == ["0.9-1.0", "0.8-0.9", "0.7-0.8", "0.6-0.7", "0.5-0.6", "0.4-0.5"]
+        assert chart_data["文書数"] == [2, 1, 1, 1, 1, 1]
+    
     def test_display_similarity_histogram_empty(self, citation_display):
         """空リストでのヒストグラム表示テスト"""
         # 例外が発生しないことを確認
@@ -245,44 +271,28 @@ class TestStreamlitCitationWidget:
     """StreamlitCitationWidgetテスト"""
     
     @pytest.fixture
-    def sample_references(self):
+    def sample_references(self, _widget_sample_references):
         """サンプル文書参照データ"""
-        return [
-            DocumentReference("test.pdf", 1, "chunk1", 0.9, "text1"),
-            DocumentReference("test.pdf", 2, "chunk2", 0.8, "text2")
-        ]
+        return _widget_sample_references
     
-    @patch('streamlit.sidebar')
-    @patch('streamlit.subheader')
-    def test_render_citation_sidebar(self, mock_subheader, mock_sidebar, sample_references):
+    def test_render_citation_sidebar(self, sample_references, mock_st):
         """サイドバー引用表示テスト"""
-        # サイドバーコンテキストをモック
-        mock_sidebar_context = Mock()
-        mock_sidebar.__enter__.return_value = mock_sidebar_context
-        mock_sidebar.__exit__.return_value = None
-        
         StreamlitCitationWidget.render_citation_sidebar(sample_references)
         
         # サイドバーが使用されたことを確認
-        mock_sidebar.__enter__.assert_called_once()
+        mock_st.sidebar.__enter__.assert_called_once()
     
     def test_render_citation_sidebar_empty(self):
         """空リストでのサイドバー表示テスト"""
         # 例外が発生しないことを確認
         StreamlitCitationWidget.render_citation_sidebar([])
     
-    @patch('streamlit.expander')
-    def test_render_citation_expander(self, mock_expander, sample_references):
+    def test_render_citation_expander(self, sample_references, mock_st):
         """エクスパンダー引用表示テスト"""
-        # エクスパンダーコンテキストをモック
-        mock_expander_context = Mock()
-        mock_expander.return_value.__enter__.return_value = mock_expander_context
-        mock_expander.return_value.__exit__.return_value = None
-        
         StreamlitCitationWidget.render_citation_expander(sample_references, expanded=True)
         
         # エクスパンダーが呼ばれたことを確認（複数回呼ばれる可能性があるため、最初の呼び出しをチェック）
-        first_call = mock_expander.call_args_list[0]
+        first_call = mock_st.expander.call_args_list[0]
         assert first_call[0][0] == "📄 参照文書 (2件)"
         assert first_call[1]["expanded"] == True
     
@@ -375,3 +385,15 @@ class TestCitationDisplayEdgeCases:
         long_text = "This is a long text"
         truncated = citation_display._truncate_text(long_text, 5)
         assert len(truncated) <= 8  # 5 + "..."
+    
+    def test_truncate_text_uses_cache(self, citation_display):
+        """同じ抜粋の切り詰めはキャッシュから返されるテスト"""
+        text = "キャッシュ確認用の長い抜粋テキストです。" * 5
+        citation_display._truncate_text(text, 20)
+        hits_before = _truncate_text_cached.cache_info().hits
+        
+        # 別インスタンスからの呼び出しでもキャッシュを共有する
+        truncated = CitationDisplay(theme="compact")._truncate_text(text, 20)
+        
+        assert truncated == text[:20] + "..."
+        assert _truncate_text_cached.cache_info().hits == hits_before + 1
@@ -0,0 +1,27 @@
+"""
+モデルテスト共通フィクスチャ
+
+変更されない参照データはセッションで共有し、状態を変更するチャット履歴はテストごとに構築する
+"""
+
+import pytest
+
+from models.chat import ChatHistory, DocumentReference
+
+
+@pytest.fixture(scope="session")
+def sample_document_references():
+    """文書参照データ（file1.pdf を重複して含む。読み取り専用のためタプルで共有）"""
+    return (
+        DocumentReference("file1.pdf", 1, "chunk1", 0.9, "text1"),
+        DocumentReference("file2.pdf", 2, "chunk2", 0.8, "text2"),
+        DocumentReference("file1.pdf", 3, "chunk3", 0.7, "text3"),
+    )
+
+@pytest.fixture
+def two_session_history():
+    """セッションを2つ作成済みのチャット履歴（現在のセッションは2つ目）"""
+    history = ChatHistory()
+    session1 = history.create_new_session("セッション1")
+    session2 = history.create_new_session("セッション2")
+    return history, session1, session2
@@ -6,6 +6,8 @@ TDD Red-Green-Refactorサイクルでチャット機能をテスト
 
 import pytest
 from datetime import datetime, timedelta
+from unittest.mock import patch
+
 from models.chat import (
     ChatMessage, ChatSession, ChatHistory, DocumentReference, MessageRole
 )
@@ -58,34 +60,22 @@ class TestChatMessage:
         assert message.role == MessageRole.ASSISTANT
         assert message.timestamp == custom_time
     
-    def test_add_reference(self):
+    def test_add_reference(self, sample_document_references):
         """文書参照追加テスト"""
         message = ChatMessage(content="テスト")
-        ref = DocumentReference(
-            filename="doc.pdf",
-            page_number=2,
-            chunk_id="chunk-456",
-            similarity_score=0.85,
-            excerpt="参照テキスト"
-        )
+        ref = sample_document_references[1]
         
         message.add_reference(ref)
         
         assert len(message.references) == 1
-        assert message.references[0] == ref
+        assert message.references[0] is ref
     
-    def test_get_referenced_files(self):
+    def test_get_referenced_files(self, sample_document_references):
         """参照ファイル一覧取得テスト"""
         message = ChatMessage(content="テスト")
         
-        # 複数の参照を追加（重複あり）
-        refs = [
-            DocumentReference("file1.pdf", 1, "chunk1", 0.9, "text1"),
-            DocumentReference("file2.pdf", 2, "chunk2", 0.8, "text2"),
-            DocumentReference("file1.pdf", 3, "chunk3", 0.7, "text3"),  # 重複
-        ]
-        
-        for ref in refs:
+        # 複数の参照を追加（file1.pdf は重複）
+        for ref in sample_document_references:
             message.add_reference(ref)
         
         files = message.get_referenced_files()
@@ -119,16 +109,15 @@ class TestChatSession:
         session = ChatSession()
         initial_updated_at = session.updated_at
         
-        # 少し待ってからメッセージ追加
-        import time
-        time.sleep(0.001)
-        
+        # 実時間を待たずに、1秒後の時刻でメッセージ追加
         message = ChatMessage(content="テスト")
-        session.add_message(message)
+        with patch("models.chat.datetime") as mock_datetime:
+            mock_datetime.now.return_value = initial_updated_at + timedelta(seconds=1)
+            session.add_message(message)
         
         assert session.updated_at > initial_updated_at
         assert len(session.messages) == 1
-        assert session.messages[0] == message
+        assert session.messages[0] is message
     
     def test_title_auto_update_from_first_user_message(self):
         """最初のユーザーメッセージからタイトル自動更新テスト"""
@@ -159,6 +148,25 @@ class TestChatSession:
         # タイトルは変更されない
         assert session.title == "新しいチャット"
     
+    def test_add_messages_bulk(self):
+        """メッセージ一括追加テスト（タイトルは最初のユーザーメッセージから）"""
+        session = ChatSession()
+        initial_updated_at = session.updated_at
+        
+        messages = [
+            ChatMessage(content="アシスタントの挨拶", role=MessageRole.ASSISTANT),
+            ChatMessage(content="最初の質問", role=MessageRole.USER),
+            ChatMessage(content="次の質問", role=MessageRole.USER),
+        ]
+        with patch("models.chat.datetime") as mock_datetime:
+            mock_datetime.now.return_value = initial_updated_at + timedelta(seconds=1)
+            session.add_messages(messages)
+        
+        mock_datetime.now.assert_called_once()
+        assert [m.id for m in session.messages] == [m.id for m in messages]
+        assert session.updated_at > initial_updated_at
+        assert session.title == "最初の質問"
+    
     def test_get_message_count(self):
         """メッセージ数取得テスト"""
         session = ChatSession()
@@ -183,43 +191,32 @@ class TestChatSession:
         session.add_message(message1)
         session.add_message(message2)
         
-        assert session.get_last_message() == message2
+        assert session.get_last_message() is message2
     
-    def test_get_user_messages(self):
-        """ユーザーメッセージのみ取得テスト"""
+    @pytest.mark.parametrize("role, getter", [
+        (MessageRole.USER, "get_user_messages"),
+        (MessageRole.ASSISTANT, "get_assistant_messages"),
+    ], ids=["user", "assistant"])
+    def test_get_messages_by_role(self, role, getter):
+        """ロール別メッセージ取得テスト"""
         session = ChatSession()
         
-        user_msg1 = ChatMessage(content="ユーザー1", role=MessageRole.USER)
-        assistant_msg = ChatMessage(content="アシスタント", role=MessageRole.ASSISTANT)
-        user_msg2 = ChatMessage(content="ユーザー2", role=MessageRole.USER)
-        
-        session.add_message(user_msg1)
-        session.add_message(assistant_msg)
-        session.add_message(user_msg2)
-        
-        user_messages = session.get_user_messages()
-        assert len(user_messages) == 2
-        assert user_msg1 in user_messages
-        assert user_msg2 in user_messages
-        assert assistant_msg not in user_messages
-    
-    def test_get_assistant_messages(self):
-        """アシスタントメッセージのみ取得テスト"""
-        session = ChatSession()
-        
-        user_msg = ChatMessage(content="ユーザー", role=MessageRole.USER)
-        assistant_msg1 = ChatMessage(content="アシスタント1", role=MessageRole.ASSISTANT)
-        assistant_msg2 = ChatMessage(content="アシスタント2", role=MessageRole.ASSISTANT)
-        
-        session.add_message(user_msg)
-        session.add_message(assistant_msg1)
-        session.add_message(assistant_msg2)
-        
-        assistant_messages = session.get_assistant_messages()
-        assert len(assistant_messages) == 2
-        assert assistant_msg1 in assistant_messages
-        assert assistant_msg2 in assistant_messages
-        assert user_msg not in assistant_messages
+        messages_by_role = {
+            MessageRole.USER: [
+                ChatMessage(content="ユーザー1", role=MessageRole.USER),
+                ChatMessage(content="ユーザー2", role=MessageRole.USER),
+            ],
+            MessageRole.ASSISTANT: [
+                ChatMessage(content="アシスタント1", role=MessageRole.ASSISTANT),
+                ChatMessage(content="アシスタント2", role=MessageRole.ASSISTANT),
+            ],
+        }
+        user_msgs = messages_by_role[MessageRole.USER]
+        assistant_msgs = messages_by_role[MessageRole.ASSISTANT]
+        session.add_messages([user_msgs[0], assistant_msgs[0], user_msgs[1], assistant_msgs[1]])
+        
+        # 対象ロールのメッセージのみが追加順で返される
+        assert [m.id for m in getattr(session, getter)()] == [m.id for m in messages_by_role[role]]
     
     def test_clear_messages(self):
         """メッセージクリアテスト"""
@@ -230,10 +227,10 @@ class TestChatSession:
         assert session.get_message_count() == 2
         
         initial_updated_at = session.updated_at
-        import time
-        time.sleep(0.001)
         
-        session.clear_messages()
+        with patch("models.chat.datetime") as mock_datetime:
+            mock_datetime.now.return_value = initial_updated_at + timedelta(seconds=1)
+            session.clear_messages()
         
         assert session.get_message_count() == 0
         assert session.updated_at > initial_updated_at
@@ -256,7 +253,7 @@ class TestChatHistory:
         session = history.create_new_session("テストセッション")
         
         assert len(history.sessions) == 1
-        assert history.sessions[0] == session
+        assert history.sessions[0] is session
         assert history.current_session_id == session.id
         assert session.title == "テストセッション"
     
@@ -279,103 +276,93 @@ class TestChatHistory:
         session = history.create_new_session()
         current = history.get_current_session()
         
-        assert current == session
+        assert current is session
     
-    def test_get_session_by_id(self):
+    def test_get_session_by_id(self, two_session_history):
         """IDでのセッション取得テスト"""
-        history = ChatHistory()
-        
-        session1 = history.create_new_session("セッション1")
-        session2 = history.create_new_session("セッション2")
+        history, session1, session2 = two_session_history
         
         # 正しいIDで取得
         found = history.get_session_by_id(session1.id)
-        assert found == session1
+        assert found is session1
         
         # 存在しないIDで取得
         not_found = history.get_session_by_id("存在しないID")
         assert not_found is None
     
-    def test_delete_session(self):
+    def test_delete_session(self, two_session_history):
         """セッション削除テスト"""
-        history = ChatHistory()
-        
-        session1 = history.create_new_session("セッション1")
-        session2 = history.create_new_session("セッション2")
+        history, session1, session2 = two_session_history
         
         # 現在のセッションを削除
         result = history.delete_session(session2.id)
         
         assert result is True
         assert len(history.sessions) == 1
-        assert history.sessions[0] == session1
+        assert history.sessions[0] is session1
         assert history.current_session_id is None  # 現在のセッションIDがクリア
         
         # 存在しないセッションを削除
         result = history.delete_session("存在しないID")
         assert result is False
     
-    def test_delete_non_current_session(self):
+    def test_delete_non_current_session(self, two_session_history):
         """現在以外のセッション削除テスト"""
-        history = ChatHistory()
-        
-        session1 = history.create_new_session("セッション1")
-        session2 = history.create_new_session("セッション2")  # これが現在のセッション
+        history, session1, session2 = two_session_history  # session2が現在のセッション
         
         # 現在以外のセッションを削除
         result = history.delete_session(session1.id)
         
         assert result is True
         assert len(history.sessions) == 1
-        assert history.sessions[0] == session2
+        assert history.sessions[0] is session2
         assert history.current_session_id == session2.id  # current_session_idは変更されない
     
     def test_get_recent_sessions(self):
         """最近のセッション取得テスト"""
         history = ChatHistory()
         
-        # 複数のセッションを作成（時間差あり）
+        # 複数のセッションを作成（updated_atを1秒ずつずらして設定し、実時間は待たない）
+        base_time = datetime(2024, 1, 1)
         sessions = []
         for i in range(5):
             session = history.create_new_session(f"セッション{i}")
+            session.updated_at = base_time + timedelta(seconds=i)
             sessions.append(session)
-            import time
-            time.sleep(0.001)  # わずかな時間差を作る
         
         # 最新3つを取得
         recent = history.get_recent_sessions(limit=3)
         
         assert len(recent) == 3
         # 新しい順に並んでいることを確認
-        assert recent[0] == sessions[-1]  # 最新
-        assert recent[1] == sessions[-2]
-        assert recent[2] == sessions[-3]
+        assert recent[0].id == sessions[-1].id  # 最新
+        assert recent[1].id == sessions[-2].id
+        assert recent[2].id == sessions[-3].id
     
-    def test_get_recent_sessions_with_updated_times(self):
+    def test_get_recent_sessions_with_updated_times(self, two_session_history):
         """更新時間を考慮した最近のセッション取得テスト"""
-        history = ChatHistory()
-        
-        session1 = history.create_new_session("セッション1")
-        session2 = history.create_new_session("セッション2")
-        
-        import time
-        time.sleep(0.001)
+        history, session1, session2 = two_session_history
         
-        # session1に新しいメッセージを追加（updated_atが更新される）
-        session1.add_message(ChatMessage(content="新しいメッセージ"))
+        # session1に新しいメッセージを追加（updated_atがsession2より後の時刻に更新される）
+        with patch("models.chat.datetime") as mock_datetime:
+            mock_datetime.now.return_value = session2.updated_at + timedelta(seconds=1)
+            session1.add_message(ChatMessage(content="新しいメッセージ"))
         
         recent = history.get_recent_sessions(limit=2)
         
         # session1が最新になっているはず
-        assert recent[0] == session1
-        assert recent[1] == session2
+        assert recent[0].id == session1.id
+        assert recent[1].id == session2.id
 
 
 class TestMessageRole:
     """メッセージロールテスト"""
     
-    def test_message_role_values(self):
+    @pytest.mark.parametrize("member, value", [
+        (MessageRole.USER, "user"),
+        (MessageRole.ASSISTANT, "assistant"),
+        (MessageRole.SYSTEM, "system"),
+    ])
+    def test_message_role_values(self, member, value):
         """メッセージロール値テスト"""
-        assert MessageRole.USER.value == "user"
-        assert MessageRole.ASSISTANT.value == "assistant"
-        assert MessageRole.SYSTEM.value == "system"
\ No newline at end of file
+        assert member.value == value
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""
+Document Data Model テスト
+
+文書・チャンクモデルの集計メソッドの検証
+"""
+
+import uuid
+
+import pytest
+from unittest.mock import patch
+
+from models.document import (
+    Document,
+    DocumentChunk,
+    ChunkPosition,
+    SearchResult,
+    UUID_POOL_SIZE,
+)
+
+
+class TestDocumentChunk:
+    """DocumentChunk テストクラス"""
+
+    def test_chunk_models_use_slots(self):
+        """正常: チャンク関連モデルはインスタンス辞書を持たない"""
+        chunk = DocumentChunk(content="テスト", start_pos=ChunkPosition(0.0, 0.0, 10.0, 5.0))
+        result = SearchResult(chunk=chunk, similarity_score=0.9, rank=1)
+
+        for instance in (chunk, chunk.start_pos, result):
+            assert not hasattr(instance, "__dict__")
+
+        with pytest.raises(AttributeError):
+            chunk.unknown_field = "不正"
+
+
+    def test_document_chunk_default_ids(self):
+        """正常: 既定IDは一意なUUID4文字列"""
+        chunk_ids = [DocumentChunk().id for _ in range(UUID_POOL_SIZE + 10)]
+
+        assert all(len(chunk_id) == 36 for chunk_id in chunk_ids)
+        assert all(uuid.UUID(chunk_id).version == 4 for chunk_id in chunk_ids[:20])
+        assert len(set(chunk_ids)) == len(chunk_ids)
+
+
+class TestDocument:
+    """Document テストクラス"""
+
+    def test_document_add_chunk(self):
+        """正常: 追加したチャンクに文書IDが設定される"""
+        document = Document()
+        chunk = DocumentChunk(content="テスト", token_count=10)
+
+        document.add_chunk(chunk)
+
+        assert document.chunks == [chunk]
+        assert chunk.document_id == document.id
+
+    def test_document_extend_chunks(self):
+        """正常: 一括追加で文書ID・集計が反映され、更新日時は1回だけ更新される"""
+        document = Document()
+        chunks = (DocumentChunk(page_number=i % 2 + 1, token_count=3) for i in range(4))
+
+        with patch("models.document.datetime") as mock_datetime:
+            document.extend_chunks(chunks)
+
+        mock_datetime.now.assert_called_once()
+        assert len(document.chunks) == 4
+        assert all(chunk.document_id == document.id for chunk in document.chunks)
+        assert document.get_total_tokens() == 12
+        assert len(document.get_chunks_by_page(2)) == 2
+
+    def test_document_get_total_tokens(self):
+        """正常: 追加チャンクの総トークン数"""
+        document = Document()
+        for token_count in (10, 15, 20):
+            document.add_chunk(DocumentChunk(content="テスト", token_count=token_count))
+
+        assert document.get_total_tokens() == 45
+
+    def test_document_get_chunks_by_page(self):
+        """正常: ページ別チャンク取得"""
+        document = Document()
+        for page_number in (1, 1, 2, 2, 3):
+            document.add_chunk(DocumentChunk(content="テスト", page_number=page_number))
+
+        assert len(document.get_chunks_by_page(1)) == 2
+        assert len(document.get_chunks_by_page(2)) == 2
+        assert len(document.get_chunks_by_page(3)) == 1
+        assert document.get_chunks_by_page(4) == []
+
+    def test_document_index_follows_direct_chunk_changes(self):
+        """正常: 初期チャンクやchunksへの直接操作も集計に反映される"""
+        document = Document(chunks=[DocumentChunk(token_count=5, page_number=1)])
+        document.chunks.append(DocumentChunk(token_count=7, page_number=2))
+
+        assert document.get_total_tokens() == 12
+        assert len(document.get_chunks_by_page(2)) == 1
+
+        document.chunks.pop()
+
+        assert document.get_total_tokens() == 5
+        assert document.get_chunks_by_page(2) == []
+
+    def test_document_index_follows_chunks_reassignment(self):
+        """正常: chunksリストの差し替えが集計に反映される"""
+        document = Document(chunks=[DocumentChunk(token_count=5, page_number=1)])
+        assert document.get_total_tokens() == 5
+
+        document.chunks = [
+            DocumentChunk(token_count=3, page_number=2),
+            DocumentChunk(token_count=4, page_number=2),
+        ]
+
+        assert document.get_total_tokens() == 7
+        assert document.get_chunks_by_page(1) == []
+        assert len(document.get_chunks_by_page(2)) == 2
+
+    def test_document_index_follows_chunk_replacement(self):
+        """正常: 要素の置換・挿入・削除が集計に反映される"""
+        document = Document(chunks=[
+            DocumentChunk(token_count=5, page_number=1),
+            DocumentChunk(token_count=6, page_number=1),
+        ])
+        assert document.get_total_tokens() == 11
+
+        document.chunks[0] = DocumentChunk(token_count=10, page_number=3)
+
+        assert document.get_total_tokens() == 16
+        assert len(document.get_chunks_by_page(1)) == 1
+        assert len(document.get_chunks_by_page(3)) == 1
+
+        document.chunks.insert(0, DocumentChunk(token_count=4, page_number=2))
+        del document.chunks[1]
+
+        assert document.get_total_tokens() == 10
+        assert document.get_chunks_by_page(3) == []
+
+    def test_document_accessors_do_not_rebuild_index(self):
+        """正常: 変更がなければ取得時に集計インデックスを再構築しない"""
+        document = Document()
+        document.extend_chunks(DocumentChunk(token_count=1, page_number=1) for _ in range(3))
+        document.get_total_tokens()
+
+        with patch.object(Document, "_index_chunk") as mock_index_chunk:
+            assert document.get_total_tokens() == 3
+            assert len(document.get_chunks_by_page(1)) == 3
+
+        mock_index_chunk.assert_not_called()
+
+    def test_document_extend_chunks_indexes_only_new_chunks(self):
+        """正常: 一括追加は既存チャンクを再集計せず追加分のみ反映する"""
+        document = Document()
+        document.extend_chunks(DocumentChunk(token_count=1, page_number=1) for _ in range(3))
+        assert document.get_total_tokens() == 3
+
+        new_chunks = [DocumentChunk(token_count=2, page_number=2) for _ in range(2)]
+        with patch.object(Document, "_index_chunk", wraps=document._index_chunk) as mock_index_chunk:
+            document.extend_chunks(new_chunks)
+            assert document.get_total_tokens() == 7
+
+        assert [call.args[0] for call in mock_index_chunk.call_args_list] == new_chunks
+        assert document.get_chunks_by_page(2) == new_chunks
+
+    def test_get_chunks_by_page_returns_copy(self):
+        """正常: 取得結果を変更しても内部インデックスに影響しない"""
+        document = Document()
+        document.add_chunk(DocumentChunk(page_number=1))
+
+        document.get_chunks_by_page(1).clear()
+
+        assert len(document.get_chunks_by_page(1)) == 1
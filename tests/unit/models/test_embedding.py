@@ -19,7 +19,9 @@ import time
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from unittest.mock import Mock, patch
+import json
 import math
+import numpy as np
 
 # 実装予定のモジュールインポート（現在は未実装）
 try:
@@ -116,6 +118,74 @@ class TestEmbeddingResult:
         assert result.model == "text-embedding-3-small"
         assert isinstance(result.created_at, datetime)
     
+    def test_embedding_result_stores_float32_array(self):
+        """リスト入力がfloat32配列として保持されることのテスト"""
+        result = EmbeddingResult(
+            text="配列保持テスト",
+            embedding=[0.1] * OPENAI_EMBEDDING_DIMENSION,
+            token_count=3,
+            model="text-embedding-3-small"
+        )
+
+        assert isinstance(result.embedding, np.ndarray)
+        assert result.embedding.dtype == np.float32
+        assert result.embedding.shape == (OPENAI_EMBEDDING_DIMENSION,)
+
+        # Supabase形式ではリストに変換される
+        supabase_data = result.to_supabase_format()
+        assert isinstance(supabase_data["embedding"], list)
+        assert len(supabase_data["embedding"]) == OPENAI_EMBEDDING_DIMENSION
+
+    def test_embedding_result_cost_memoized_until_updated(self):
+        """コスト計算結果を保持し、token_count・model変更後は再計算されることのテスト"""
+        result = EmbeddingResult(
+            text="コスト再計算テスト",
+            embedding=[0.1] * OPENAI_EMBEDDING_DIMENSION,
+            token_count=1000,
+            model="text-embedding-3-small"
+        )
+
+        first_cost = result.calculate_cost()
+        assert first_cost == pytest.approx(0.00002)
+        assert result.calculate_cost() is first_cost
+        result.token_count = 2000
+        assert result.calculate_cost() == pytest.approx(0.00004)
+        result.model = "text-embedding-3-large"
+        assert result.calculate_cost() == pytest.approx(0.00026)
+
+    def test_embedding_result_uses_slots(self):
+        """__slots__により任意属性を追加できないことのテスト"""
+        result = EmbeddingResult(
+            text="スロットテスト",
+            embedding=[0.1] * OPENAI_EMBEDDING_DIMENSION,
+            token_count=3,
+            model="text-embedding-3-small"
+        )
+
+        assert not hasattr(result, "__dict__")
+        result.response_time = 0.5  # 定義済みフィールドは更新可能
+        assert result.response_time == 0.5
+        with pytest.raises(AttributeError):
+            result.unknown_attribute = "value"
+
+    def test_embedding_result_equality(self):
+        """埋め込みベクトルを含む値の等価比較のテスト"""
+        created_at = datetime(2024, 1, 1)
+        kwargs = dict(
+            text="等価比較テスト",
+            token_count=3,
+            model="text-embedding-3-small",
+            created_at=created_at
+        )
+        first = EmbeddingResult(embedding=[0.1] * OPENAI_EMBEDDING_DIMENSION, **kwargs)
+        same = EmbeddingResult(embedding=[0.1] * OPENAI_EMBEDDING_DIMENSION, **kwargs)
+        different = EmbeddingResult(embedding=[0.2] * OPENAI_EMBEDDING_DIMENSION, **kwargs)
+
+        assert first == same
+        assert first != different
+        assert first in [different, same]
+        assert first != "等価比較テスト"
+
     def test_embedding_result_invalid_dimension(self):
         """無効な次元数での検証テスト"""
         invalid_embedding = [0.1] * 512  # 間違った次元数
@@ -223,7 +293,95 @@ class TestEmbeddingBatch:
         assert len(batch.results) == 0
         assert batch.total_tokens == 0
         assert batch.estimated_cost == 0.0
-    
+
+    def test_embedding_batch_statistics_values(self):
+        """バッチ統計値（NumPy集計）の正当性テスト"""
+        valid_embedding = np.full(OPENAI_EMBEDDING_DIMENSION, 0.1, dtype=np.float32)
+        results = [
+            EmbeddingResult(text="短い", embedding=valid_embedding, token_count=2),
+            EmbeddingResult(text="長いテキストサンプル", embedding=valid_embedding, token_count=8)
+        ]
+
+        stats = EmbeddingBatch(results).get_statistics()
+
+        assert stats["count"] == 2
+        assert stats["total_tokens"] == 10
+        assert stats["avg_tokens"] == 5.0
+        assert stats["std_tokens"] == 3.0
+        assert stats["min_tokens"] == 2
+        assert stats["max_tokens"] == 8
+        assert stats["models_used"] == ["text-embedding-3-small"]
+
+    def test_embedding_batch_validate_all(self):
+        """バッチ一括検証テスト"""
+        small = [
+            EmbeddingResult(
+                text=f"文書{i}",
+                embedding=np.full(OPENAI_EMBEDDING_DIMENSION, 0.1, dtype=np.float32),
+                token_count=3
+            )
+            for i in range(3)
+        ]
+        large = EmbeddingResult(
+            text="大モデル",
+            embedding=np.full(3072, 0.1, dtype=np.float32),
+            token_count=4,
+            model="text-embedding-3-large"
+        )
+
+        batch = EmbeddingBatch(small)
+        assert batch.validate_all() is True
+        assert batch.embedding_matrix.shape == (3, OPENAI_EMBEDDING_DIMENSION)
+
+        # 次元数混在時はモデル別に検証
+        assert EmbeddingBatch(small + [large]).validate_all() is True
+
+        # 生成後に混入した無限大値を検出
+        small[1].embedding[5] = np.inf
+        with pytest.raises(EmbeddingValidationError, match="結果 1 の埋め込みにNaNまたは無限大値"):
+            EmbeddingBatch(small).validate_all()
+
+    def test_embedding_batch_to_supabase_bulk_json(self):
+        """バルクJSON直列化テスト"""
+        results = [
+            EmbeddingResult(
+                text=f"文書{i}",
+                embedding=np.full(OPENAI_EMBEDDING_DIMENSION, 0.1, dtype=np.float32),
+                token_count=3
+            )
+            for i in range(3)
+        ]
+
+        records = json.loads(EmbeddingBatch(results).to_supabase_bulk_json())
+
+        assert len(records) == 3
+        assert records[0]["text"] == "文書0"
+        assert records[0]["token_count"] == 3
+        assert len(records[0]["embedding"]) == OPENAI_EMBEDDING_DIMENSION
+        assert abs(records[0]["embedding"][0] - 0.1) < 1e-6
+
+    def test_embedding_batch_to_columnar(self):
+        """列指向変換とバルク形式の一致テスト"""
+        results = [
+            EmbeddingResult(
+                text=f"列指向{i}",
+                embedding=np.full(OPENAI_EMBEDDING_DIMENSION, 0.1 * (i + 1), dtype=np.float32),
+                token_count=10 + i,
+                response_time=0.2 if i == 0 else None
+            )
+            for i in range(3)
+        ]
+        batch = EmbeddingBatch(results)
+
+        columns = batch.to_columnar()
+        assert columns["texts"] == ["列指向0", "列指向1", "列指向2"]
+        assert columns["embeddings"].shape == (3, OPENAI_EMBEDDING_DIMENSION)
+        assert columns["token_counts"].tolist() == [10, 11, 12]
+        assert columns["models"] == ["text-embedding-3-small"] * 3
+
+        # バルク形式は各結果の単体変換と同一
+        assert batch.to_supabase_bulk_format() == [result.to_supabase_format() for result in results]
+
     def test_embedding_batch_creation(self):
         """EmbeddingBatch作成テスト（実装後）"""
         # 実装されたら以下のテストが有効になる
@@ -367,7 +525,28 @@ class TestEmbeddingCostCalculator:
         # 正常に初期化できることを確認
         calculator = EmbeddingCostCalculator()
         assert calculator.model_costs == OPENAI_EMBEDDING_MODELS
-    
+
+    def test_batch_cost_matches_single_costs(self):
+        """バッチコストが個別コストの合計と一致することのテスト"""
+        calculator = EmbeddingCostCalculator()
+        batch_items = [
+            {"tokens": 1000, "model": "text-embedding-3-small"},
+            {"tokens": 500, "model": "text-embedding-3-large"},
+            {"tokens": 1500, "model": "text-embedding-3-small"}
+        ]
+
+        total_cost = calculator.calculate_batch_cost(batch_items)
+        expected = sum(
+            calculator.calculate_cost(item["tokens"], item["model"])
+            for item in batch_items
+        )
+
+        assert abs(total_cost - expected) < 1e-12
+        assert calculator.calculate_batch_cost([]) == 0.0
+
+        with pytest.raises(EmbeddingValidationError, match="サポートされていないモデルです"):
+            calculator.calculate_batch_cost([{"tokens": 10, "model": "invalid-model"}])
+
     def test_cost_calculation_small_model(self):
         """小モデルコスト計算テスト（実装後）"""
         # 実装されたら以下のテストが有効になる
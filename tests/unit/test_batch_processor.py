@@ -386,14 +386,14 @@ class TestMemoryManagement:
         texts = [f"Memory test with longer text content {i} " * 100 for i in range(100)]
         
         process = psutil.Process(os.getpid())
-        initial_memory = process.memory_info().rss / 1024 / 1024  # MB
+        initial_memory = process.memory_full_info().uss / 1024 / 1024  # MB
         
         with patch.object(processor, '_process_batch_with_retry', new_callable=AsyncMock) as mock_process:
             mock_process.return_value = ([Mock(text=text, embedding=[0.1]*1536) for text in texts[:10]], [])
             
             await processor.process_batch(texts)
             
-            final_memory = process.memory_info().rss / 1024 / 1024  # MB
+            final_memory = process.memory_full_info().uss / 1024 / 1024  # MB
             memory_increase = final_memory - initial_memory
             
             # Issue要件: 500MB以下
@@ -405,7 +405,7 @@ class TestMemoryManagement:
         texts = [f"Cleanup test {i}" for i in range(50)]
         
         process = psutil.Process(os.getpid())
-        before_memory = process.memory_info().rss
+        before_memory = process.memory_full_info().uss
         
         with patch.object(processor, '_process_batch_with_retry', new_callable=AsyncMock) as mock_process:
             mock_process.return_value = ([Mock(text=text, embedding=[0.1]*1536) for text in texts], [])
@@ -417,7 +417,7 @@ class TestMemoryManagement:
             import gc
             gc.collect()
             
-            after_memory = process.memory_info().rss
+            after_memory = process.memory_full_info().uss
             memory_diff = (after_memory - before_memory) / 1024 / 1024  # MB
             
             # メモリリークがないことを確認（差分が小さい）
@@ -0,0 +1,68 @@
+"""
+チャンク近似重複排除 テスト
+
+MinHash LSHによる近似重複チャンクの集約検証
+"""
+
+import pytest
+import numpy as np
+
+from services.chunk_dedup import ChunkDeduplicator
+
+
+class TestChunkDeduplicator:
+    """ChunkDeduplicator テストクラス"""
+
+    def test_signature_is_deterministic(self):
+        """正常: 同一テキストの署名は常に一致する"""
+        deduplicator = ChunkDeduplicator()
+        signature = deduplicator.signature("社員研修では会社の価値観を学びます。")
+
+        assert signature.shape == (128,)
+        assert np.array_equal(
+            signature, ChunkDeduplicator().signature("社員研修では会社の価値観を学びます。")
+        )
+
+    def test_deduplicate_collapses_identical_chunks(self):
+        """正常: 同一チャンクは最初の出現へ集約される"""
+        texts = [
+            "大規模文書のチャンク: この部分では重要な情報について説明します。",
+            "Security policy requires strong passwords.",
+            "大規模文書のチャンク: この部分では重要な情報について説明します。",
+        ]
+
+        unique_indices, mapping = ChunkDeduplicator().deduplicate(texts)
+
+        assert unique_indices == [0, 1]
+        assert mapping == [0, 1, 0]
+
+    def test_deduplicate_keeps_distinct_chunks(self):
+        """正常: 内容の異なるチャンクは集約されない"""
+        texts = [
+            "就業規則では勤務時間と休暇の取得方法について説明します。",
+            "経費精算は月末までに申請書を提出してください。",
+            "Employee training covers company values and work processes.",
+        ]
+
+        unique_indices, mapping = ChunkDeduplicator().deduplicate(texts)
+
+        assert unique_indices == [0, 1, 2]
+        assert mapping == [0, 1, 2]
+
+    def test_lower_threshold_collapses_near_duplicates(self):
+        """正常: 閾値を下げると番号違いのテンプレートチャンクも集約される"""
+        texts = [
+            f"大規模文書のチャンク{i}: この部分では重要な情報について説明します。"
+            for i in range(20)
+        ]
+
+        unique_indices, mapping = ChunkDeduplicator(threshold=0.7).deduplicate(texts)
+
+        assert len(unique_indices) < len(texts)
+        assert len(mapping) == len(texts)
+        assert all(0 <= position < len(unique_indices) for position in mapping)
+
+    def test_invalid_threshold(self):
+        """異常: 不正な閾値"""
+        with pytest.raises(ValueError, match="thresholdは0より大きく1以下である必要があります"):
+            ChunkDeduplicator(threshold=0)
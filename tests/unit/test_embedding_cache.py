@@ -0,0 +1,64 @@
+"""
+埋め込みキャッシュ テスト
+
+コンテンツハッシュキーによるキャッシュ登録・取得・LRU破棄の検証
+"""
+
+import pytest
+import numpy as np
+
+from services.embedding_cache import EmbeddingCache, make_cache_key
+
+
+class TestMakeCacheKey:
+    """キャッシュキー生成テスト"""
+
+    def test_key_depends_on_model_and_content(self):
+        """正常: モデル名と内容の両方でキーが変わる"""
+        key = make_cache_key("text-embedding-3-small", "テスト")
+
+        assert len(key) == 64
+        assert key == make_cache_key("text-embedding-3-small", "テスト")
+        assert key != make_cache_key("text-embedding-3-large", "テスト")
+        assert key != make_cache_key("text-embedding-3-small", "テスト2")
+
+
+class TestEmbeddingCache:
+    """EmbeddingCache テストクラス"""
+
+    def test_set_and_get(self):
+        """正常: 登録した埋め込みをfloat32配列として取得できる"""
+        cache = EmbeddingCache()
+        cache.set("text-embedding-3-small", "キャッシュ対象", [0.1] * 1536, 12)
+
+        embedding, token_count = cache.get("text-embedding-3-small", "キャッシュ対象")
+
+        assert embedding.dtype == np.float32
+        assert embedding.shape == (1536,)
+        assert np.allclose(embedding, 0.1)
+        assert token_count == 12
+
+    def test_get_miss_returns_none(self):
+        """正常: 未登録キーはNoneを返し、統計に反映される"""
+        cache = EmbeddingCache()
+
+        assert cache.get("text-embedding-3-small", "未登録") is None
+        assert cache.get_stats()["misses"] == 1
+
+    def test_lru_eviction(self):
+        """正常: 上限超過時に最も古く参照されたエントリを破棄"""
+        cache = EmbeddingCache(max_entries=2)
+        cache.set("m", "a", [0.1], 1)
+        cache.set("m", "b", [0.2], 1)
+        cache.get("m", "a")  # aを最近参照に更新
+        cache.set("m", "c", [0.3], 1)
+
+        assert len(cache) == 2
+        assert cache.get("m", "b") is None
+        assert cache.get("m", "a") is not None
+        assert cache.get("m", "c") is not None
+
+    def test_invalid_max_entries(self):
+        """異常: 不正な最大件数"""
+        with pytest.raises(ValueError, match="max_entriesは正の整数である必要があります"):
+            EmbeddingCache(max_entries=0)
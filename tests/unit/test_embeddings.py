@@ -10,6 +10,7 @@ from unittest.mock import Mock, patch, AsyncMock
 import asyncio
 from typing import List, Dict, Any
 import time
+import numpy as np
 
 from services.embeddings import (
     EmbeddingService, 
@@ -17,6 +18,8 @@ from services.embeddings import (
     BatchEmbeddingResult,
     EmbeddingError
 )
+from services.embedding_cache import EmbeddingCache
+from services.chunk_dedup import ChunkDeduplicator
 
 
 class TestEmbeddingService:
@@ -126,7 +129,26 @@ class TestEmbeddingGeneration:
         assert len(result.embedding) == 1536
         assert result.token_count == 15
         assert result.model == "text-embedding-3-small"
-    
+
+    @patch('openai.OpenAI')
+    def test_generate_embedding_cache_hit_skips_api(self, mock_openai):
+        """正常: キャッシュヒット時はAPIを呼び出さない"""
+        mock_response = Mock()
+        mock_response.data = [Mock(embedding=[0.3] * 1536)]
+        mock_response.usage.total_tokens = 8
+
+        mock_client = mock_openai.return_value
+        mock_client.embeddings.create.return_value = mock_response
+
+        service = EmbeddingService("sk-test123456789", cache=EmbeddingCache())
+        first = service.generate_embedding("キャッシュ対象テキスト")
+        second = service.generate_embedding("キャッシュ対象テキスト")
+
+        mock_client.embeddings.create.assert_called_once()
+        assert second.token_count == first.token_count == 8
+        assert second.response_time == 0.0
+        assert (second.embedding == first.embedding).all()
+
     def test_generate_embedding_empty_text(self, service):
         """異常: 空テキストでの埋め込み生成失敗"""
         with pytest.raises(ValueError, match="テキストが空です"):
@@ -398,6 +420,197 @@ class TestBatchEmbeddingGeneration:
             model="text-embedding-3-small"
         )
     
+    @patch('openai.OpenAI')
+    def test_batch_generate_embeddings_deduplicates_near_duplicates(self, mock_openai):
+        """正常: 近似重複テキストは代表のみ埋め込みを生成し結果を共有"""
+        mock_response = Mock()
+        mock_response.data = [
+            Mock(embedding=[0.1] * 1536),
+            Mock(embedding=[0.2] * 1536)
+        ]
+        mock_response.usage.total_tokens = 20
+        
+        mock_client = mock_openai.return_value
+        mock_client.embeddings.create.return_value = mock_response
+        
+        service = EmbeddingService("sk-test123456789", deduplicator=ChunkDeduplicator())
+        duplicate = "就業規則では勤務時間と休暇の取得方法について詳しく説明しています。"
+        texts = [duplicate, "セキュリティポリシーでは強力なパスワードが必要です。", duplicate]
+        result = service.generate_batch_embeddings(texts)
+        
+        mock_client.embeddings.create.assert_called_once_with(
+            input=texts[:2],
+            model="text-embedding-3-small"
+        )
+        assert len(result.embeddings) == 3
+        assert result.embeddings[0] == result.embeddings[2] == [0.1] * 1536
+        assert result.embeddings[1] == [0.2] * 1536
+    
+    @patch('openai.OpenAI')
+    def test_batch_generate_embeddings_uses_cache(self, mock_openai):
+        """正常: キャッシュ済みテキストは送信せず、生成した埋め込みをキャッシュに登録"""
+        mock_client = mock_openai.return_value
+        mock_client.embeddings.create.side_effect = self._embeddings_per_input(
+            lambda text: float(text[-1]) / 10
+        )
+        
+        service = EmbeddingService("sk-test123456789", cache=EmbeddingCache())
+        service.generate_batch_embeddings(["テキスト1", "テキスト2"])
+        result = service.generate_batch_embeddings(["テキスト2", "テキスト3", "テキスト1"])
+        
+        assert mock_client.embeddings.create.call_args.kwargs["input"] == ["テキスト3"]
+        assert [embedding[0] for embedding in result.embeddings] == pytest.approx([0.2, 0.3, 0.1])
+        assert service.cache.get(service.model, "テキスト3") is not None
+        
+        # 全件ヒット時はAPIを呼び出さない
+        mock_client.embeddings.create.reset_mock()
+        result = service.generate_batch_embeddings(["テキスト3", "テキスト1"])
+        mock_client.embeddings.create.assert_not_called()
+        assert result.total_tokens == 0
+    
+    @staticmethod
+    def _embeddings_per_input(value_of):
+        """入力件数ぶんの埋め込みを返すcreateモック用side_effect"""
+        def create(input, model):
+            response = Mock()
+            response.data = [Mock(embedding=[value_of(text)] * 1536) for text in input]
+            return response
+        return create
+    
+    @patch('openai.OpenAI')
+    def test_create_batch_embeddings_single_request(self, mock_openai):
+        """正常: 短いテキストは1リクエストにまとめ、入力順とトークン数を保持"""
+        mock_client = mock_openai.return_value
+        mock_client.embeddings.create.side_effect = self._embeddings_per_input(
+            lambda text: float(text[-1]) / 10
+        )
+        
+        service = EmbeddingService("sk-test123456789")
+        texts = ["テキスト1", "テキスト2", "テキスト3"]
+        batch = service.create_batch_embeddings(texts)
+        
+        mock_client.embeddings.create.assert_called_once_with(
+            input=texts,
+            model="text-embedding-3-small"
+        )
+        assert [r.text for r in batch.results] == texts
+        assert [r.embedding[0] for r in batch.results] == pytest.approx([0.1, 0.2, 0.3])
+        assert [r.token_count for r in batch.results] == [
+            service.token_counter.count_tokens(text) for text in texts
+        ]
+    
+    @patch('openai.OpenAI')
+    def test_create_batch_embeddings_averages_long_text_spans(self, mock_openai):
+        """正常: 長文はスパン分割して各スパンの埋め込みの平均をL2正規化"""
+        service = EmbeddingService("sk-test123456789")
+        long_text = "就業規則について説明します。" * 200
+        spans = service.token_counter.split_into_spans(long_text, 512)
+        span_values = {span: (i + 1) / 10 for i, span in enumerate(spans)}
+        
+        mock_client = mock_openai.return_value
+        mock_client.embeddings.create.side_effect = self._embeddings_per_input(
+            lambda text: span_values.get(text, 0.5)
+        )
+        
+        batch = service.create_batch_embeddings(["短いテキスト", long_text])
+        
+        assert len(spans) > 1
+        assert mock_client.embeddings.create.call_args.kwargs["input"] == ["短いテキスト"] + spans
+        assert len(batch.results) == 2
+        assert batch.results[1].text == long_text
+        assert "".join(spans) == long_text
+        # 全要素が同値のスパンベクトルの平均を正規化すると各要素は1/sqrt(次元数)
+        embedding = batch.results[1].embedding
+        assert np.linalg.norm(embedding) == pytest.approx(1.0, rel=1e-5)
+        assert embedding[0] == pytest.approx(1 / np.sqrt(len(embedding)), rel=1e-5)
+    
+    @patch('openai.OpenAI')
+    def test_create_batch_embeddings_uses_cache(self, mock_openai):
+        """正常: キャッシュ済みテキストは送信せず、未ヒット分のみ埋め込みを生成"""
+        mock_client = mock_openai.return_value
+        mock_client.embeddings.create.side_effect = self._embeddings_per_input(
+            lambda text: float(text[-1]) / 10
+        )
+        
+        service = EmbeddingService("sk-test123456789", cache=EmbeddingCache())
+        service.create_batch_embeddings(["テキスト1", "テキスト2"])
+        batch = service.create_batch_embeddings(["テキスト2", "テキスト3", "テキスト1"])
+        
+        assert mock_client.embeddings.create.call_args.kwargs["input"] == ["テキスト3"]
+        assert [r.text for r in batch.results] == ["テキスト2", "テキスト3", "テキスト1"]
+        assert [r.embedding[0] for r in batch.results] == pytest.approx([0.2, 0.3, 0.1])
+        
+        # 全件ヒット時はAPIを呼び出さない
+        mock_client.embeddings.create.reset_mock()
+        service.create_batch_embeddings(["テキスト3", "テキスト1"])
+        mock_client.embeddings.create.assert_not_called()
+    
+    @patch('openai.OpenAI')
+    def test_create_batch_embeddings_deduplicates_near_duplicates(self, mock_openai):
+        """正常: 近似重複は代表のみ送信し、埋め込みを共有しつつトークン数は各自の値を保持"""
+        mock_client = mock_openai.return_value
+        mock_client.embeddings.create.side_effect = self._embeddings_per_input(
+            lambda text: 0.1 if text.startswith("就業") else 0.2
+        )
+        
+        service = EmbeddingService("sk-test123456789", deduplicator=ChunkDeduplicator())
+        duplicate = "就業規則では勤務時間と休暇の取得方法について詳しく説明しています。"
+        near_duplicate = duplicate + " "
+        other = "セキュリティポリシーでは強力なパスワードが必要です。"
+        batch = service.create_batch_embeddings([duplicate, other, near_duplicate])
+        
+        assert mock_client.embeddings.create.call_args.kwargs["input"] == [duplicate, other]
+        assert [r.text for r in batch.results] == [duplicate, other, near_duplicate]
+        assert [r.embedding[0] for r in batch.results] == pytest.approx([0.1, 0.2, 0.1])
+        assert batch.results[2].token_count == service.token_counter.count_tokens(near_duplicate)
+    
+    @patch('openai.AsyncOpenAI')
+    @pytest.mark.asyncio
+    async def test_create_batch_embeddings_async_deduplicates(self, mock_async_openai):
+        """正常: 非同期バッチも近似重複は代表のみ送信"""
+        create = self._embeddings_per_input(lambda text: 0.1)
+        mock_client = mock_async_openai.return_value
+        mock_client.embeddings.create = AsyncMock(side_effect=create)
+        
+        service = EmbeddingService("sk-test123456789", async_mode=True, deduplicator=ChunkDeduplicator())
+        duplicate = "就業規則では勤務時間と休暇の取得方法について詳しく説明しています。"
+        batch = await service.create_batch_embeddings_async([duplicate, duplicate])
+        
+        assert mock_client.embeddings.create.await_args.kwargs["input"] == [duplicate]
+        assert len(batch.results) == 2
+    
+    @patch('openai.AsyncOpenAI')
+    @pytest.mark.asyncio
+    async def test_create_batch_embeddings_async_uses_cache(self, mock_async_openai):
+        """正常: 非同期バッチもキャッシュ未ヒット分のみ送信"""
+        create = self._embeddings_per_input(lambda text: float(text[-1]) / 10)
+        mock_client = mock_async_openai.return_value
+        mock_client.embeddings.create = AsyncMock(side_effect=create)
+        
+        service = EmbeddingService("sk-test123456789", async_mode=True, cache=EmbeddingCache())
+        await service.create_batch_embeddings_async(["テキスト1"])
+        batch = await service.create_batch_embeddings_async(["テキスト1", "テキスト2"])
+        
+        assert mock_client.embeddings.create.await_args.kwargs["input"] == ["テキスト2"]
+        assert [r.embedding[0] for r in batch.results] == pytest.approx([0.1, 0.2])
+    
+    @patch('services.embeddings.EMBEDDING_BATCH_SIZE', 2)
+    @patch('openai.AsyncOpenAI')
+    @pytest.mark.asyncio
+    async def test_create_batch_embeddings_async_concurrent_requests(self, mock_async_openai):
+        """正常: 非同期バッチはリクエスト単位で並行送信し入力順を保持"""
+        create = self._embeddings_per_input(lambda text: float(text[-1]) / 10)
+        mock_client = mock_async_openai.return_value
+        mock_client.embeddings.create = AsyncMock(side_effect=create)
+        
+        service = EmbeddingService("sk-test123456789", async_mode=True)
+        texts = [f"テキスト{i}" for i in range(1, 6)]
+        batch = await service.create_batch_embeddings_async(texts)
+        
+        assert mock_client.embeddings.create.await_count == 3
+        assert [r.text for r in batch.results] == texts
+        assert [r.embedding[0] for r in batch.results] == pytest.approx([0.1, 0.2, 0.3, 0.4, 0.5])
+    
     def test_batch_generate_embeddings_empty_list(self, service):
         """異常: 空リストでのバッチ埋め込み生成失敗"""
         with pytest.raises(ValueError, match="テキストリストが空です"):
@@ -452,6 +665,18 @@ class TestValidationAndUtilities:
         """正常: ゼロトークンコスト計算"""
         cost = service.calculate_embedding_cost(0)
         assert cost == 0.0
+    
+    def test_calculate_cosine_similarity_ndarray_and_zero_vector(self, service):
+        """正常: ndarray入力のコサイン類似度とゼロベクトルの扱い"""
+        import numpy as np
+        
+        embedding1 = np.array([3.0, 4.0] + [0.0] * 1534, dtype=np.float32)
+        embedding2 = [4.0, 3.0] + [0.0] * 1534
+        
+        similarity = service.calculate_cosine_similarity(embedding1, embedding2)
+        assert isinstance(similarity, float)
+        assert similarity == pytest.approx(0.96)
+        assert service.calculate_cosine_similarity(embedding1, [0.0] * 1536) == 0.0
 
 
 class TestErrorScenarios:
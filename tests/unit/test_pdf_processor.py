@@ -11,7 +11,7 @@ from pathlib import Path
 import tempfile
 from services.pdf_processor import (
     PDFProcessor, PDFProcessingError, DocumentChunk, 
-    Document, Page, TextBlock, ProcessingResult
+    Document, Page, TextBlock, ProcessingResult, PDFBatchProcessor
 )
 
 
@@ -89,6 +89,47 @@ class TestPDFProcessorSetup:
         # mock_logger.error.assert_called()
 
 
+class TestPDFProcessorStreaming:
+    """iter_chunks ストリーミング処理テスト"""
+    
+    def test_iter_chunks_matches_process_pdf(self, sample_pdf_bytes, mock_fitz, mock_spacy):
+        """正常: process_pdfと同一のチャンクを逐次生成しページ処理後にcloseする"""
+        processor = PDFProcessor()
+        expected = processor.process_pdf(sample_pdf_bytes, "stream.pdf").chunks
+        mock_fitz.close.reset_mock()
+        
+        chunks = processor.iter_chunks(sample_pdf_bytes, "stream.pdf")
+        
+        assert not isinstance(chunks, list)
+        assert list(chunks) == expected
+        mock_fitz.close.assert_called_once()
+    
+    def test_process_pdf_accepts_buffer_without_copy(self, sample_pdf_bytes, mock_fitz, mock_spacy):
+        """正常: memoryviewはコピーせずそのままPyMuPDFへ渡される"""
+        processor = PDFProcessor()
+        buffer = memoryview(sample_pdf_bytes)
+        
+        with patch('fitz.open', return_value=mock_fitz) as mock_open:
+            result = processor.process_pdf(buffer, "buffer.pdf")
+        
+        assert result.total_chunks > 0
+        assert mock_open.call_args.kwargs["stream"] is buffer
+    
+    def test_iter_chunks_invalid_pdf(self):
+        """異常: 無効なPDFはPDFProcessingError"""
+        processor = PDFProcessor()
+        
+        with pytest.raises(PDFProcessingError, match="無効なPDFファイルです"):
+            list(processor.iter_chunks(b"invalid", "invalid.pdf"))
+    
+    def test_iter_chunks_file_not_found(self, temp_dir):
+        """異常: 存在しないパス"""
+        processor = PDFProcessor()
+        
+        with pytest.raises(FileNotFoundError):
+            list(processor.iter_chunks(temp_dir / "missing.pdf"))
+
+
 class TestDocumentChunk:
     """DocumentChunkテストクラス"""
     
@@ -141,4 +182,34 @@ class TestDocumentChunk:
         assert chunk.page_number == 5
         assert chunk.chapter_number == 2
         assert chunk.section_name == "第2章"
-        assert chunk.token_count == 25
\ No newline at end of file
+        assert chunk.token_count == 25
+
+
+class TestPDFBatchProcessor:
+    """PDFBatchProcessor テストクラス"""
+    
+    def test_process_files_preserves_order(self, temp_dir, sample_pdf_bytes, mock_fitz, mock_spacy):
+        """正常: パス・バイト入力を並列処理し、入力順で結果を返す"""
+        pdf_path = temp_dir / "from_path.pdf"
+        pdf_path.write_bytes(sample_pdf_bytes)
+        inputs = [pdf_path] + [(sample_pdf_bytes, f"batch_{i}.pdf") for i in range(3)]
+        completed = []
+        
+        results = PDFBatchProcessor().process_files(
+            inputs, workers=2, callback=lambda name, result: completed.append(name)
+        )
+        
+        assert [r.chunks[0].filename for r in results] == [
+            "from_path.pdf", "batch_0.pdf", "batch_1.pdf", "batch_2.pdf"
+        ]
+        assert sorted(completed) == sorted(r.chunks[0].filename for r in results)
+    
+    def test_process_files_propagates_error(self, mock_fitz, mock_spacy):
+        """異常: 無効なPDFが含まれる場合はPDFProcessingError"""
+        with pytest.raises(PDFProcessingError, match="無効なPDFファイルです"):
+            PDFBatchProcessor().process_files([(b"invalid", "invalid.pdf")])
+    
+    def test_process_files_invalid_workers(self, mock_spacy):
+        """異常: 不正なワーカー数"""
+        with pytest.raises(ValueError, match="workersは正の整数である必要があります"):
+            PDFBatchProcessor().process_files([], workers=0)
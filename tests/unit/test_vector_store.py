@@ -9,6 +9,9 @@ from unittest.mock import Mock, patch
 from services.vector_store import VectorStore, VectorStoreError, SearchResult, DocumentRecord
 import uuid
 
+# テストで共有するUUID（モジュール読み込み時に1回だけ生成）
+TEST_DOCUMENT_ID = str(uuid.uuid4())
+
 
 class TestVectorStore:
     """ベクトルストアテストクラス"""
@@ -68,7 +71,7 @@ class TestVectorStore:
             }
         ]
         
-        document_id = str(uuid.uuid4())
+        document_id = TEST_DOCUMENT_ID
         
         # エラーが発生しないことを確認
         store.store_chunks(chunks, document_id)
@@ -130,7 +133,7 @@ class TestVectorStore:
         """文書削除成功テスト"""
         store = VectorStore("https://test.supabase.co", "test-key")
         
-        document_id = str(uuid.uuid4())
+        document_id = TEST_DOCUMENT_ID
         
         # エラーが発生しないことを確認
         store.delete_document(document_id)
@@ -141,7 +144,7 @@ class TestVectorStore:
         mock_supabase_client.table.return_value.delete.return_value.eq.return_value.execute.side_effect = Exception("Delete error")
         
         store = VectorStore("https://test.supabase.co", "test-key")
-        document_id = str(uuid.uuid4())
+        document_id = TEST_DOCUMENT_ID
         
         with pytest.raises(VectorStoreError):
             store.delete_document(document_id)
@@ -173,7 +176,7 @@ class TestDocumentRecord:
     def test_document_record_creation(self):
         """DocumentRecord作成テスト"""
         record = DocumentRecord(
-            id=str(uuid.uuid4()),
+            id=TEST_DOCUMENT_ID,
             filename="test.pdf",
             original_filename="テスト.pdf",
             upload_date="2024-01-15T10:00:00Z",
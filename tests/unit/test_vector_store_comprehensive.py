@@ -197,14 +197,14 @@ class TestVectorStoreStoreChunks:
         document_id = str(uuid.uuid4())
         
         mock_result = Mock()
-        self.mock_client.table.return_value.insert.return_value.execute.return_value = mock_result
+        self.mock_client.table.return_value.upsert.return_value.execute.return_value = mock_result
         
         self.store.store_chunks(valid_chunks, document_id)
         
         # メソッド呼び出しの確認
         self.mock_client.table.assert_called_once_with("document_chunks")
-        self.mock_client.table.return_value.insert.assert_called_once()
-        self.mock_client.table.return_value.insert.return_value.execute.assert_called_once()
+        self.mock_client.table.return_value.upsert.assert_called_once()
+        self.mock_client.table.return_value.upsert.return_value.execute.assert_called_once()
     
     def test_store_chunks_no_client(self):
         """クライアント未初期化のテスト"""
@@ -5,9 +5,22 @@
 """
 
 import pytest
+import sys
 import asyncio
-from unittest.mock import Mock, patch
-from services.vector_store import VectorStore, VectorStoreError, SearchResult
+import numpy as np
+from unittest.mock import Mock, AsyncMock, patch
+from services.vector_store import (
+    VectorStore,
+    VectorStoreError,
+    SearchResult,
+    COPY_MIN_RECORDS,
+    DOCUMENT_CHUNK_COPY_COLUMNS,
+    encode_pgvector,
+    decode_pgvector,
+    get_shared_client,
+    clear_shared_clients,
+    reciprocal_rank_fusion,
+)
 
 
 class TestBulkInsertEmbeddingsGreen:
@@ -46,7 +59,9 @@ class TestBulkInsertEmbeddingsGreen:
         
         # 検証
         assert result is True
-        mock_supabase_client.table.assert_called_with("document_chunks")
+        mock_supabase_client.table.assert_any_call("document_chunks")
+        # チャンク保存後に文書の状態をcompletedへ更新
+        mock_supabase_client.table.assert_called_with("documents")
     
     @pytest.mark.asyncio
     async def test_bulk_insert_embeddings_empty_error(self, mock_supabase_client):
@@ -101,6 +116,551 @@ class TestBulkInsertEmbeddingsGreen:
         # 1000件のバルク挿入が成功することを確認（接続プール経由）
         # 具体的なモック呼び出し詳細は接続プールによって抽象化される
 
+    @pytest.mark.asyncio
+    async def test_bulk_insert_embeddings_split_into_chunks(self, mock_supabase_client, mock_connection_pool):
+        """TDD Green: バルク挿入がチャンク単位に分割されるテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key")
+
+        # 全テーブル操作を単一のモックで記録
+        mock_table = Mock()
+        mock_supabase_client.table.side_effect = None
+        mock_supabase_client.table.return_value = mock_table
+
+        embedding_results = [Mock(embedding=[0.1] * 1536) for _ in range(120)]
+        document_chunks = [
+            {"content": f"分割テスト{i}", "filename": "split.pdf", "token_count": 10}
+            for i in range(120)
+        ]
+
+        result = await store.bulk_insert_embeddings(embedding_results, document_chunks)
+
+        assert result is True
+        # documents(dict)を除き、チャンクはBULK_INSERT_CHUNK_SIZE件ずつupsert
+        chunk_batches = [
+            call.args[0] for call in mock_table.upsert.call_args_list
+            if isinstance(call.args[0], list)
+        ]
+        assert sorted(len(batch) for batch in chunk_batches) == [20, 50, 50]
+
+    @pytest.mark.asyncio
+    async def test_bulk_insert_embeddings_retries_failed_batch_with_same_ids(self, mock_supabase_client, mock_connection_pool):
+        """TDD Green: 失敗したバッチのみを同じIDで再送し、孤立文書・重複チャンクを作らないテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key")
+
+        mock_table = Mock()
+        mock_supabase_client.table.side_effect = None
+        mock_supabase_client.table.return_value = mock_table
+        mock_table.upsert.return_value.execute.side_effect = [Mock(), Exception("timeout"), Mock()]
+
+        embedding_results = [Mock(embedding=[0.1] * 1536) for _ in range(3)]
+        document_chunks = [
+            {"content": f"再試行テスト{i}", "filename": "retry.pdf", "token_count": 10}
+            for i in range(3)
+        ]
+
+        with patch("services.vector_store.asyncio.sleep", new=AsyncMock()):
+            result = await store.bulk_insert_embeddings(embedding_results, document_chunks)
+
+        assert result is True
+        payloads = [call.args[0] for call in mock_table.upsert.call_args_list]
+        documents = [payload for payload in payloads if isinstance(payload, dict)]
+        chunk_batches = [payload for payload in payloads if isinstance(payload, list)]
+        assert len(documents) == 1
+        assert len(chunk_batches) == 2
+        assert chunk_batches[0] == chunk_batches[1]
+        assert all(record["document_id"] == documents[0]["id"] for record in chunk_batches[0])
+        assert all(call.kwargs["on_conflict"] == "id" for call in mock_table.upsert.call_args_list)
+
+    @pytest.mark.asyncio
+    async def test_bulk_insert_embeddings_completes_document_after_chunks(self, mock_supabase_client, mock_connection_pool):
+        """TDD Green: 文書は処理中として作成し、全チャンク保存後にcompletedへ更新するテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key")
+
+        mock_table = Mock()
+        mock_supabase_client.table.side_effect = None
+        mock_supabase_client.table.return_value = mock_table
+
+        embedding_results = [Mock(embedding=[0.1] * 1536) for _ in range(3)]
+        document_chunks = [
+            {"content": f"状態テスト{i}", "filename": "status.pdf", "token_count": 10}
+            for i in range(3)
+        ]
+
+        result = await store.bulk_insert_embeddings(embedding_results, document_chunks)
+
+        assert result is True
+        document = mock_table.upsert.call_args_list[0].args[0]
+        assert document["processing_status"] == "processing"
+        mock_table.update.assert_called_once_with({"processing_status": "completed"})
+        mock_table.update.return_value.eq.assert_called_once_with("id", document["id"])
+
+    @pytest.mark.asyncio
+    async def test_bulk_insert_embeddings_invalid_row_writes_nothing(self, mock_supabase_client, mock_connection_pool):
+        """TDD Green: 行単位の検証エラーでは文書レコードを作成しないテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key")
+
+        mock_table = Mock()
+        mock_supabase_client.table.side_effect = None
+        mock_supabase_client.table.return_value = mock_table
+
+        embedding_results = [Mock(embedding=[0.1] * 1536) for _ in range(2)]
+        document_chunks = [
+            {"content": "ファイル名あり", "filename": "valid.pdf"},
+            {"content": "ファイル名なし"},
+        ]
+
+        with pytest.raises(VectorStoreError):
+            await store.bulk_insert_embeddings(embedding_results, document_chunks)
+
+        mock_table.upsert.assert_not_called()
+        mock_table.update.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_bulk_insert_embeddings_batch_failure_marks_document_failed(self, mock_supabase_client, mock_connection_pool):
+        """TDD Green: チャンク保存失敗時は文書をfailedとし、completedにしないテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key")
+
+        mock_table = Mock()
+        mock_supabase_client.table.side_effect = None
+        mock_supabase_client.table.return_value = mock_table
+
+        def upsert(records, on_conflict):
+            result = Mock()
+            if isinstance(records, list):
+                result.execute.side_effect = Exception("chunk write failed")
+            return result
+
+        mock_table.upsert.side_effect = upsert
+
+        embedding_results = [Mock(embedding=[0.1] * 1536) for _ in range(3)]
+        document_chunks = [
+            {"content": f"失敗テスト{i}", "filename": "failed.pdf", "token_count": 10}
+            for i in range(3)
+        ]
+
+        with patch("services.vector_store.asyncio.sleep", new=AsyncMock()):
+            with pytest.raises(VectorStoreError, match="chunk write failed"):
+                await store.bulk_insert_embeddings(embedding_results, document_chunks)
+
+        mock_table.update.assert_called_once_with({"processing_status": "failed"})
+
+    @pytest.mark.asyncio
+    async def test_bulk_insert_embeddings_reports_all_invalid_rows(self, mock_supabase_client, mock_connection_pool):
+        """TDD Green: 空コンテンツの全インデックスを親レコード作成前に報告するテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key")
+
+        mock_table = Mock()
+        mock_supabase_client.table.side_effect = None
+        mock_supabase_client.table.return_value = mock_table
+
+        embedding_results = [Mock(embedding=[0.1] * 1536) for _ in range(5)]
+        document_chunks = [
+            {"content": "" if i in (1, 3) else f"事前検証{i}", "filename": "precheck.pdf"}
+            for i in range(5)
+        ]
+
+        with pytest.raises(VectorStoreError, match=r"contentは空でない文字列である必要があります: インデックス \[1, 3\]"):
+            await store.bulk_insert_embeddings(embedding_results, document_chunks)
+
+        mock_table.upsert.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_bulk_insert_embeddings_reports_invalid_dimensions(self, mock_supabase_client, mock_connection_pool):
+        """TDD Green: 次元数不一致の埋め込みを一括で報告するテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key")
+
+        embedding_results = [Mock(embedding=[0.1] * (128 if i == 2 else 1536)) for i in range(3)]
+        document_chunks = [{"content": f"次元検証{i}", "filename": "dim.pdf"} for i in range(3)]
+
+        with pytest.raises(VectorStoreError, match=r"1536次元である必要があります: インデックス \[2\]"):
+            await store.bulk_insert_embeddings(embedding_results, document_chunks)
+
+    @pytest.mark.asyncio
+    async def test_bulk_insert_embeddings_ndarray_converted_to_lists(self, mock_supabase_client, mock_connection_pool):
+        """TDD Green: ndarray埋め込みがリストへ一括変換されて送信されるテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key")
+
+        mock_table = Mock()
+        mock_supabase_client.table.side_effect = None
+        mock_supabase_client.table.return_value = mock_table
+
+        embedding_results = [
+            Mock(embedding=np.full(1536, 0.1 * (i + 1), dtype=np.float32)) for i in range(3)
+        ]
+        document_chunks = [
+            {"content": f"変換テスト{i}", "filename": "convert.pdf", "token_count": 10}
+            for i in range(3)
+        ]
+
+        result = await store.bulk_insert_embeddings(embedding_results, document_chunks)
+
+        assert result is True
+        records = [
+            record
+            for call in mock_table.upsert.call_args_list
+            if isinstance(call.args[0], list)
+            for record in call.args[0]
+        ]
+        assert [record["content"] for record in records] == ["変換テスト0", "変換テスト1", "変換テスト2"]
+        assert all(isinstance(record["embedding"], list) for record in records)
+        assert records[2]["embedding"][0] == pytest.approx(0.3)
+
+    @pytest.mark.asyncio
+    async def test_bulk_insert_embeddings_uses_copy_when_database_url_set(self, mock_supabase_client, mock_connection_pool):
+        """TDD Green: database_url設定時は大量レコードをCOPYで挿入するテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key", database_url="postgresql://localhost:5432/postgres")
+
+        mock_table = Mock()
+        mock_supabase_client.table.side_effect = None
+        mock_supabase_client.table.return_value = mock_table
+
+        mock_conn = AsyncMock()
+        mock_asyncpg = Mock()
+        mock_asyncpg.connect = AsyncMock(return_value=mock_conn)
+
+        embedding_results = [Mock(embedding=[0.1] * 1536) for _ in range(COPY_MIN_RECORDS)]
+        document_chunks = [
+            {"content": f"COPYテスト{i}", "filename": "copy.pdf", "token_count": 10}
+            for i in range(COPY_MIN_RECORDS)
+        ]
+
+        with patch.dict(sys.modules, {"asyncpg": mock_asyncpg}):
+            result = await store.bulk_insert_embeddings(embedding_results, document_chunks)
+
+        assert result is True
+        mock_conn.copy_records_to_table.assert_awaited_once()
+        copy_kwargs = mock_conn.copy_records_to_table.call_args.kwargs
+        assert len(copy_kwargs["records"]) == COPY_MIN_RECORDS
+        assert copy_kwargs["columns"] == list(DOCUMENT_CHUNK_COPY_COLUMNS)
+        mock_conn.close.assert_awaited_once()
+        # チャンクはREST挿入されない（documents親レコードのみ）
+        assert not any(isinstance(call.args[0], list) for call in mock_table.upsert.call_args_list)
+
+    @pytest.mark.asyncio
+    async def test_bulk_insert_embeddings_copy_failure_falls_back_to_rest(self, mock_supabase_client, mock_connection_pool):
+        """TDD Green: COPY失敗時はREST挿入にフォールバックするテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key", database_url="postgresql://localhost:5432/postgres")
+
+        mock_table = Mock()
+        mock_supabase_client.table.side_effect = None
+        mock_supabase_client.table.return_value = mock_table
+
+        mock_asyncpg = Mock()
+        mock_asyncpg.connect = AsyncMock(side_effect=OSError("connection refused"))
+
+        embedding_results = [Mock(embedding=[0.1] * 1536) for _ in range(COPY_MIN_RECORDS)]
+        document_chunks = [
+            {"content": f"フォールバック{i}", "filename": "fallback.pdf", "token_count": 10}
+            for i in range(COPY_MIN_RECORDS)
+        ]
+
+        with patch.dict(sys.modules, {"asyncpg": mock_asyncpg}):
+            result = await store.bulk_insert_embeddings(embedding_results, document_chunks)
+
+        assert result is True
+        chunk_batches = [
+            call.args[0] for call in mock_table.upsert.call_args_list
+            if isinstance(call.args[0], list)
+        ]
+        assert sum(len(batch) for batch in chunk_batches) == COPY_MIN_RECORDS
+
+
+class TestStoreChunksGreen:
+    """store_chunks Green Phase テスト"""
+
+    @staticmethod
+    def _chunks(count):
+        return [
+            {"content": f"保存テスト{i}", "filename": "store.pdf", "embedding": [0.1] * 1536}
+            for i in range(count)
+        ]
+
+    @patch("services.vector_store.STORE_CHUNKS_BATCH_ROWS", 2)
+    def test_store_chunks_batches_rows_with_minimal_return(self, mock_supabase_client):
+        """TDD Green: 行数上限ごとにまとめて挿入し、レスポンス本文を要求しないテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key")
+
+        mock_table = Mock()
+        mock_supabase_client.table.side_effect = None
+        mock_supabase_client.table.return_value = mock_table
+
+        chunk_ids = store.store_chunks(self._chunks(5), "store-doc")
+
+        assert len(chunk_ids) == 5
+        calls = mock_table.upsert.call_args_list
+        assert [len(call.args[0]) for call in calls] == [2, 2, 1]
+        assert all(call.kwargs["returning"] == "minimal" for call in calls)
+        assert all(call.kwargs["on_conflict"] == "id" for call in calls)
+        assert [record["id"] for call in calls for record in call.args[0]] == chunk_ids
+
+    @patch("services.vector_store.time.sleep")
+    @patch("services.vector_store.STORE_CHUNKS_BATCH_ROWS", 2)
+    def test_store_chunks_retries_only_failed_batch_with_same_ids(self, mock_sleep, mock_supabase_client):
+        """TDD Green: 失敗したバッチのみを同じIDで再送し、重複レコードを作らないテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key")
+
+        mock_table = Mock()
+        mock_supabase_client.table.side_effect = None
+        mock_supabase_client.table.return_value = mock_table
+        mock_table.upsert.return_value.execute.side_effect = [Mock(), Exception("timeout"), Mock(), Mock()]
+
+        chunk_ids = store.store_chunks(self._chunks(5), "retry-doc")
+
+        batches = [call.args[0] for call in mock_table.upsert.call_args_list]
+        assert [len(batch) for batch in batches] == [2, 2, 2, 1]
+        assert [record["id"] for record in batches[1]] == [record["id"] for record in batches[2]]
+        sent_ids = [record["id"] for batch in batches[:1] + batches[2:] for record in batch]
+        assert sent_ids == chunk_ids
+
+    def test_store_chunks_uses_copy_when_database_url_set(self, mock_supabase_client):
+        """TDD Green: database_url設定時は同期呼び出しからもCOPYで挿入するテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key", database_url="postgresql://localhost:5432/postgres")
+
+        mock_table = Mock()
+        mock_supabase_client.table.side_effect = None
+        mock_supabase_client.table.return_value = mock_table
+
+        mock_conn = AsyncMock()
+        mock_asyncpg = Mock()
+        mock_asyncpg.connect = AsyncMock(return_value=mock_conn)
+
+        with patch.dict(sys.modules, {"asyncpg": mock_asyncpg}):
+            chunk_ids = store.store_chunks(self._chunks(COPY_MIN_RECORDS), "copy-doc")
+
+        assert len(chunk_ids) == COPY_MIN_RECORDS
+        copy_kwargs = mock_conn.copy_records_to_table.call_args.kwargs
+        assert [row[0] for row in copy_kwargs["records"]] == chunk_ids
+        mock_table.upsert.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_store_chunks_uses_copy_inside_running_loop(self, mock_supabase_client):
+        """TDD Green: イベントループ実行中の同期呼び出しでも専用スレッドでCOPYするテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key", database_url="postgresql://localhost:5432/postgres")
+
+        mock_table = Mock()
+        mock_supabase_client.table.side_effect = None
+        mock_supabase_client.table.return_value = mock_table
+
+        mock_conn = AsyncMock()
+        mock_asyncpg = Mock()
+        mock_asyncpg.connect = AsyncMock(return_value=mock_conn)
+
+        with patch.dict(sys.modules, {"asyncpg": mock_asyncpg}):
+            chunk_ids = store.store_chunks(self._chunks(COPY_MIN_RECORDS), "loop-doc")
+
+        assert len(chunk_ids) == COPY_MIN_RECORDS
+        mock_conn.copy_records_to_table.assert_awaited_once()
+        mock_table.upsert.assert_not_called()
+
+    def test_store_chunks_copy_data_error_is_not_retried_over_rest(self, mock_supabase_client):
+        """TDD Green: 接続以外のCOPYエラーはRESTへフォールバックせず送出するテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key", database_url="postgresql://localhost:5432/postgres")
+
+        mock_table = Mock()
+        mock_supabase_client.table.side_effect = None
+        mock_supabase_client.table.return_value = mock_table
+
+        mock_conn = AsyncMock()
+        mock_conn.copy_records_to_table.side_effect = ValueError("invalid input syntax")
+        mock_asyncpg = Mock()
+        mock_asyncpg.connect = AsyncMock(return_value=mock_conn)
+
+        with patch.dict(sys.modules, {"asyncpg": mock_asyncpg}):
+            with pytest.raises(VectorStoreError, match="invalid input syntax"):
+                store.store_chunks(self._chunks(COPY_MIN_RECORDS), "error-doc")
+
+        mock_conn.close.assert_awaited_once()
+        mock_table.upsert.assert_not_called()
+
+
+class TestStoreDocumentWithChunksGreen:
+    """store_document_with_chunks Green Phase テスト"""
+
+    def test_store_document_with_chunks_single_rpc(self, mock_supabase_client):
+        """TDD Green: 文書とチャンクを1回のRPCで保存するテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key")
+
+        chunks = TestStoreChunksGreen._chunks(3)
+        document_id, chunk_ids = store.store_document_with_chunks(
+            {"filename": "store.pdf", "file_size": 1024, "total_pages": 2}, chunks
+        )
+
+        mock_supabase_client.rpc.assert_called_once()
+        function_name, params = mock_supabase_client.rpc.call_args.args
+        assert function_name == "insert_document_with_chunks"
+        assert params["document"]["id"] == document_id
+        assert params["document"]["original_filename"] == "store.pdf"
+        assert [record["id"] for record in params["chunks"]] == chunk_ids
+        assert all(record["document_id"] == document_id for record in params["chunks"])
+        mock_supabase_client.table.assert_not_called()
+
+    @patch("services.vector_store.time.sleep")
+    def test_store_document_with_chunks_retry_reuses_ids(self, mock_sleep, mock_supabase_client):
+        """TDD Green: RPCの再試行では同じ文書ID・チャンクIDを再送するテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key")
+        mock_supabase_client.rpc.return_value.execute.side_effect = [Exception("timeout"), Mock()]
+
+        document_id, chunk_ids = store.store_document_with_chunks(
+            {"filename": "store.pdf"}, TestStoreChunksGreen._chunks(2)
+        )
+
+        assert mock_supabase_client.rpc.call_count == 2
+        first, second = (call.args[1] for call in mock_supabase_client.rpc.call_args_list)
+        assert first["document"]["id"] == second["document"]["id"] == document_id
+        assert [record["id"] for record in first["chunks"]] == chunk_ids
+        assert [record["id"] for record in second["chunks"]] == chunk_ids
+
+    def test_store_document_with_chunks_invalid_chunk(self, mock_supabase_client):
+        """TDD Green: 無効なチャンクはRPC前にエラーとするテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key")
+
+        with pytest.raises(VectorStoreError, match="チャンク 0 の検証エラー"):
+            store.store_document_with_chunks({"filename": "store.pdf"}, [{"content": "内容"}])
+
+        mock_supabase_client.rpc.assert_not_called()
+
+
+class TestStoreChunksColumnarGreen:
+    """store_chunks_columnar Green Phase テスト"""
+
+    def test_store_chunks_columnar_success(self, mock_supabase_client):
+        """TDD Green: 埋め込み行列を行ごとの辞書なしで保存するテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key")
+
+        mock_table = Mock()
+        mock_supabase_client.table.side_effect = None
+        mock_supabase_client.table.return_value = mock_table
+
+        embeddings = np.full((3, 1536), 0.1, dtype=np.float32)
+        embeddings[2] = 0.3
+
+        chunk_ids = store.store_chunks_columnar(
+            "columnar-doc", "columnar.pdf",
+            ["列形式0", "列形式1", "列形式2"], embeddings,
+            page_numbers=[1, 1, 2], token_counts=np.array([5, 6, 7]),
+        )
+
+        records = mock_table.upsert.call_args.args[0]
+        assert [record["id"] for record in records] == chunk_ids
+        assert [record["page_number"] for record in records] == [1, 1, 2]
+        assert [record["token_count"] for record in records] == [5, 6, 7]
+        assert all(type(record["token_count"]) is int for record in records)
+        assert all(record["filename"] == "columnar.pdf" for record in records)
+        assert isinstance(records[2]["embedding"], list)
+        assert records[2]["embedding"][0] == pytest.approx(0.3)
+
+    def test_store_chunks_columnar_reports_invalid_rows(self, mock_supabase_client):
+        """TDD Green: NaNを含む行と空コンテンツを一括で報告するテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key")
+
+        embeddings = np.full((3, 1536), 0.1, dtype=np.float32)
+        embeddings[1, 10] = np.nan
+
+        with pytest.raises(VectorStoreError, match=r"NaN・無限大・異常に大きな値が含まれています: インデックス \[1\]"):
+            store.store_chunks_columnar("doc", "nan.pdf", ["a", "b", "c"], embeddings)
+
+        with pytest.raises(VectorStoreError, match=r"contentは空でない文字列である必要があります: インデックス \[0, 2\]"):
+            store.store_chunks_columnar("doc", "empty.pdf", ["", "b", " "], np.zeros((3, 1536)))
+
+    def test_store_chunks_columnar_shape_mismatch(self, mock_supabase_client):
+        """TDD Green: 行数・次元数が一致しない埋め込み行列のテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key")
+
+        with pytest.raises(VectorStoreError, match=r"\(2, 1536\)の形状である必要があります"):
+            store.store_chunks_columnar("doc", "shape.pdf", ["a", "b"], np.zeros((2, 128)))
+
+
+class TestHybridSearchGreen:
+    """hybrid_search Green Phase テスト"""
+
+    @pytest.mark.asyncio
+    async def test_hybrid_search_fuses_keyword_and_dense_results(self, mock_supabase_client, mock_connection_pool):
+        """TDD Green: キーワード検索とベクトル検索の結果がRRFで統合されるテスト"""
+        store = VectorStore("https://test.supabase.co", "test-key")
+
+        def row(content, page_number, **score):
+            return {"content": content, "filename": "manual.pdf", "page_number": page_number, **score}
+
+        rpc_rows = {
+            "match_documents_keyword": [row("有給休暇の申請", 3, rank=0.8), row("休暇の種類", 4, rank=0.5)],
+            "match_documents": [row("休暇の種類", 4, distance=0.1), row("勤務時間", 2, distance=0.3)],
+        }
+        mock_supabase_client.rpc.side_effect = lambda name, params: Mock(
+            execute=Mock(return_value=Mock(data=rpc_rows[name]))
+        )
+
+        results = await store.hybrid_search([0.1] * 1536, "休暇", limit=2)
+
+        called = {call.args[0]: call.args[1] for call in mock_supabase_client.rpc.call_args_list}
+        assert called["match_documents_keyword"] == {"query_text": "休暇", "match_count": 4}
+        assert called["match_documents"]["match_count"] == 4
+
+        # 両検索に現れるチャンクが最上位
+        assert [r.content for r in results] == ["休暇の種類", "有給休暇の申請"]
+        assert results[0].similarity_score == pytest.approx(0.9)
+        assert results[0].metadata["rrf_score"] > results[1].metadata["rrf_score"]
+
+
+class TestReciprocalRankFusion:
+    """reciprocal_rank_fusion テスト"""
+
+    def test_fusion_merges_duplicates_and_limits(self):
+        """TDD Green: 同一チャンクは統合され、上位limit件が返るテスト"""
+        def result(content, score):
+            return SearchResult(content=content, filename="a.pdf", page_number=1, similarity_score=score, metadata={})
+
+        fused = reciprocal_rank_fusion(
+            [[result("A", 0.4), result("B", 0.3)], [result("B", 0.9), result("C", 0.8)]],
+            limit=2,
+        )
+
+        assert [r.content for r in fused] == ["B", "A"]
+        assert fused[0].similarity_score == 0.9
+        assert fused[0].metadata["rrf_score"] == pytest.approx(1 / 62 + 1 / 61)
+
+
+class TestSharedClient:
+    """共有Supabaseクライアントテスト"""
+
+    def test_vector_stores_share_client(self, mock_supabase_client):
+        """TDD Green: 同一URL・キーのVectorStoreはクライアントを共有するテスト"""
+        first = VectorStore("https://test.supabase.co", "test-key")
+        second = VectorStore("https://test.supabase.co", "test-key")
+
+        assert first.client is mock_supabase_client
+        assert second.client is first.client
+        assert get_shared_client("https://test.supabase.co", "test-key") is first.client
+
+    def test_clear_shared_clients_recreates_client(self, mock_supabase_client):
+        """TDD Green: 共有クライアント破棄後は再作成されるテスト"""
+        with patch('supabase.create_client', side_effect=[Mock(), Mock()]):
+            first = get_shared_client("https://other.supabase.co", "other-key")
+            clear_shared_clients()
+            second = get_shared_client("https://other.supabase.co", "other-key")
+
+        assert first is not second
+
+    def test_shared_client_falls_back_when_httpx_client_unsupported(self, mock_supabase_client):
+        """TDD Green: ClientOptionsがhttpx_client未対応の場合は既定のクライアントを作成するテスト"""
+        with patch('supabase.ClientOptions', side_effect=TypeError("unexpected keyword argument 'httpx_client'")), \
+             patch('supabase.create_client') as mock_create_client:
+            client = get_shared_client("https://legacy.supabase.co", "legacy-key")
+
+        assert client is mock_create_client.return_value
+        mock_create_client.assert_called_once_with("https://legacy.supabase.co", "legacy-key")
+
+
+class TestPgvectorBinaryFormat:
+    """pgvectorバイナリ形式変換テスト"""
+
+    def test_encode_decode_roundtrip(self):
+        """TDD Green: エンコード・デコードで元のベクトルに戻るテスト"""
+        encoded = encode_pgvector([0.5, 1.0, -2.0])
+
+        assert encoded[:4] == b"\x00\x03\x00\x00"  # 次元数3 + 予約領域
+        assert len(encoded) == 4 + 3 * 4
+        assert decode_pgvector(encoded).tolist() == [0.5, 1.0, -2.0]
+
 
 class TestSearchSimilarEmbeddingsGreen:
     """search_similar_embeddings Green Phase テスト"""
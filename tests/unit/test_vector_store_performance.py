@@ -57,7 +57,9 @@ class TestPerformanceRequirements:
         assert results[0].content == "高速検索結果"
     
     @pytest.mark.asyncio
-    async def test_bulk_insert_embeddings_large_dataset_performance(self, mock_supabase_client):
+    async def test_bulk_insert_embeddings_large_dataset_performance(
+        self, mock_supabase_client, ramp_embeddings
+    ):
         """大量データバルク処理性能テスト"""
         store = VectorStore("https://test.supabase.co", "test-key")
         
@@ -66,12 +68,13 @@ class TestPerformanceRequirements:
             await asyncio.sleep(0.2)  # 200ms処理時間
             return Mock()
         
-        mock_supabase_client.table.return_value.insert.return_value.execute = mock_execute
+        mock_supabase_client.table.return_value.upsert.return_value.execute = mock_execute
         
-        # 1000件のテストデータ生成
+        # 1000件のテストデータ生成（埋め込みは1つのfloat32行列の行ビュー）
+        embeddings = ramp_embeddings(1000, 0.001)
         embedding_results = [
-            Mock(embedding=[0.1] * 1536, metadata={"id": str(i)})
-            for i in range(1000)
+            Mock(embedding=embedding, metadata={"id": str(i)})
+            for i, embedding in enumerate(embeddings)
         ]
         document_chunks = [
             {
@@ -147,17 +150,20 @@ class TestPerformanceRequirements:
         assert execution_time < 300  # 十分に高速
     
     @pytest.mark.asyncio
-    async def test_memory_efficiency_large_embeddings(self, mock_supabase_client):
+    async def test_memory_efficiency_large_embeddings(
+        self, mock_supabase_client, ramp_embeddings
+    ):
         """大量埋め込みベクトルのメモリ効率テスト"""
         store = VectorStore("https://test.supabase.co", "test-key")
         
         # メモリ効率的な処理のモック設定
-        mock_supabase_client.table.return_value.insert.return_value.execute.return_value = Mock()
+        mock_supabase_client.table.return_value.upsert.return_value.execute.return_value = Mock()
         
-        # 5000件の大規模データセット
+        # 5000件の大規模データセット（埋め込みは1つのfloat32行列の行ビュー）
+        embeddings = ramp_embeddings(5000, 0.001, base=0.0)
         embedding_results = [
-            Mock(embedding=[0.001 * i] * 1536, metadata={"id": str(i)})
-            for i in range(5000)
+            Mock(embedding=embedding, metadata={"id": str(i)})
+            for i, embedding in enumerate(embeddings)
         ]
         document_chunks = [
             {
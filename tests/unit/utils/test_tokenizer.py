@@ -0,0 +1,56 @@
+"""
+トークンカウントユーティリティのテスト
+"""
+
+import pytest
+from utils.tokenizer import TokenCounter
+
+
+class ByteEncoding:
+    """UTF-8の1バイトを1トークンとして扱うテスト用エンコーディング"""
+
+    def encode(self, text):
+        return list(text.encode("utf-8"))
+
+    def decode_bytes(self, tokens):
+        return bytes(tokens)
+
+    def decode(self, tokens):
+        return bytes(tokens).decode("utf-8", errors="replace")
+
+
+@pytest.fixture
+def byte_counter():
+    """バイト単位エンコーディングを使うTokenCounter"""
+    counter = TokenCounter()
+    counter.encoding = ByteEncoding()
+    return counter
+
+
+class TestSplitIntoSpans:
+    """split_into_spansのテスト"""
+
+    def test_spans_do_not_split_multibyte_characters(self, byte_counter):
+        """正常: マルチバイト文字の途中で分割せずU+FFFDを生じない"""
+        text = "就業規則について説明します。" * 3
+
+        spans = byte_counter.split_into_spans(text, 8)
+
+        assert "".join(spans) == text
+        assert all("�" not in span for span in spans)
+        assert all(len(span.encode("utf-8")) <= 8 for span in spans)
+
+    def test_span_extends_when_single_character_exceeds_limit(self, byte_counter):
+        """正常: 1文字が上限を超えるトークン数の場合はその文字までを1スパンとする"""
+        spans = byte_counter.split_into_spans("日本", 2)
+
+        assert spans == ["日", "本"]
+
+    def test_short_text_is_returned_as_is(self, byte_counter):
+        """正常: 上限内のテキストはそのまま返す"""
+        assert byte_counter.split_into_spans("abc", 8) == ["abc"]
+
+    def test_invalid_max_tokens(self, byte_counter):
+        """異常: max_tokensが正でない場合はValueError"""
+        with pytest.raises(ValueError):
+            byte_counter.split_into_spans("abc", 0)
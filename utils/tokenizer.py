@@ -4,11 +4,22 @@
 OpenAI tiktoken ライブラリを使用した正確なトークン数計算
 """
 
+import asyncio
+import functools
 import logging
+import os
 from typing import List, Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# バッチエンコード時のtiktokenスレッド数
+BATCH_ENCODE_THREADS = os.cpu_count() or 1
+
+# トークン数キャッシュ設定（Streamlit Cloud 1GB制約を考慮）
+# 対象テキストを8192文字以下に限定し、最大でも数十MB程度に収める
+TOKEN_COUNT_CACHE_SIZE = 4096
+TOKEN_COUNT_CACHE_MAX_TEXT_LENGTH = 8192
+
 # tiktoken がインストールされていない場合の代替実装
 try:
     import tiktoken
@@ -18,6 +29,24 @@ except ImportError:
     logger.warning("tiktoken not installed. Using fallback token estimation.")
 
 
+@functools.lru_cache(maxsize=TOKEN_COUNT_CACHE_SIZE)
+def _cached_token_count(encoding: Any, text: str) -> int:
+    """
+    エンコーディングとテキストをキーにトークン数をキャッシュ
+
+    tiktokenのエンコーディングはモデル間で共有されるシングルトンのため、
+    同一エンコーディングを使う全TokenCounterでキャッシュを共有する
+
+    Args:
+        encoding: tiktokenエンコーディング
+        text: カウント対象テキスト
+
+    Returns:
+        int: トークン数
+    """
+    return len(encoding.encode(text))
+
+
 class TokenCounter:
     """トークンカウンタークラス"""
     
@@ -66,8 +95,9 @@ class TokenCounter:
         if self.encoding is not None:
             # tiktokenを使用した正確なカウント
             try:
-                tokens = self.encoding.encode(text)
-                return len(tokens)
+                if len(text) <= TOKEN_COUNT_CACHE_MAX_TEXT_LENGTH:
+                    return _cached_token_count(self.encoding, text)
+                return len(self.encoding.encode(text))
             except Exception as e:
                 logger.error(f"tiktoken encoding error: {str(e)}")
                 # フォールバックに切り替え
@@ -86,7 +116,45 @@ class TokenCounter:
         Returns:
             List[int]: 各テキストのトークン数
         """
-        return [self.count_tokens(text) for text in texts]
+        if self.encoding is None:
+            return [self.count_tokens(text) for text in texts]
+        
+        # 空テキストは0トークン（count_tokensと同じ扱い）
+        counts = [0] * len(texts)
+        target_indices = [i for i, text in enumerate(texts) if text and text.strip()]
+        if not target_indices:
+            return counts
+        
+        try:
+            # tiktokenのRust実装でまとめてエンコード（GIL解放・並列実行）
+            token_lists = self.encoding.encode_batch(
+                [texts[i] for i in target_indices],
+                num_threads=BATCH_ENCODE_THREADS
+            )
+        except Exception as e:
+            logger.warning(f"tiktoken batch encoding error: {str(e)}")
+            # 個別カウント（フォールバック推定を含む）に切り替え
+            return [self.count_tokens(text) for text in texts]
+        
+        for i, tokens in zip(target_indices, token_lists):
+            counts[i] = len(tokens)
+        return counts
+    
+    async def count_tokens_batch_async(self, texts: List[str]) -> List[int]:
+        """
+        バッチテキストのトークン数を非同期でカウント
+        
+        CPU負荷の高いエンコード処理をワーカースレッドに移し、イベントループを
+        ブロックしないようにします（tiktokenはエンコード中にGILを解放）。
+        
+        Args:
+            texts: カウント対象テキストリスト
+            
+        Returns:
+            List[int]: 各テキストのトークン数
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.count_tokens_batch, texts)
     
     def _estimate_tokens(self, text: str) -> int:
         """
@@ -180,6 +248,79 @@ class TokenCounter:
         
         return result
     
+    def split_into_spans(self, text: str, max_tokens: int) -> List[str]:
+        """
+        テキストを最大トークン数ごとのスパンに分割
+        
+        Args:
+            text: 分割対象テキスト
+            max_tokens: スパンあたりの最大トークン数
+            
+        Returns:
+            List[str]: 先頭から順のスパン（制限内の場合は元テキストのみ）
+            
+        Raises:
+            ValueError: max_tokensが正の整数でない場合
+        """
+        if max_tokens <= 0:
+            raise ValueError(f"max_tokensは正の整数である必要があります: {max_tokens}")
+        
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text)
+            if len(tokens) <= max_tokens:
+                return [text]
+            spans = []
+            start = 0
+            while start < len(tokens):
+                end = self._decodable_span_end(tokens, start, max_tokens)
+                spans.append(self.encoding.decode(tokens[start:end]))
+                start = end
+            return spans
+        
+        # フォールバック: 推定トークン数で先頭から切り出す
+        spans = []
+        remaining = text
+        while remaining and not self.validate_token_limit(remaining, max_tokens):
+            span = self.truncate_to_token_limit(remaining, max_tokens) or remaining[:1]
+            spans.append(span)
+            remaining = remaining[len(span):]
+        if remaining:
+            spans.append(remaining)
+        return spans
+    
+    def _decodable_span_end(self, tokens: List[int], start: int, max_tokens: int) -> int:
+        """
+        startから始まるスパンの終端位置を、文字の途中で切れない位置に決定
+        
+        マルチバイト文字は複数トークンにまたがることがあるため、
+        UTF-8として完結する位置まで終端を手前に戻します。
+        1トークンでも完結しない場合は完結する位置まで先へ延ばします。
+        
+        Args:
+            tokens: トークン列
+            start: スパンの開始位置（文字境界）
+            max_tokens: スパンあたりの最大トークン数
+            
+        Returns:
+            int: スパンの終端位置（排他的）
+        """
+        limit = min(start + max_tokens, len(tokens))
+        for end in range(limit, start, -1):
+            if self._is_decodable(tokens[start:end]):
+                return end
+        for end in range(limit + 1, len(tokens) + 1):
+            if self._is_decodable(tokens[start:end]):
+                return end
+        return len(tokens)
+    
+    def _is_decodable(self, tokens: List[int]) -> bool:
+        """トークン列のバイト列がUTF-8として完結しているか判定"""
+        try:
+            self.encoding.decode_bytes(tokens).decode("utf-8")
+        except UnicodeDecodeError:
+            return False
+        return True
+    
     def get_model_info(self) -> Dict[str, Any]:
         """
         モデル情報を取得